@@ -2,32 +2,233 @@ from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 from pathlib import Path
-from Utility import get_config
+from Utility import get_config, get_response_cache
+from Prompts import prompt_text, cached_prefix_text, is_conversation
 from icecream import ic
+import asyncio
+import atexit
+import hashlib
 import json
 import os
+import threading
+import time
+import ResponseCache
 
 # Load environment variables
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-# Create async clients
-openai_client = AsyncOpenAI()
-anthropic_client = AsyncAnthropic()
-
 role = "user"
 
-# Extract the main message content
+#region Event Loop
+
+# Every AI request runs on one long-lived event loop on its own thread, so the clients' connection
+# pools (and their TLS sessions) stay bound to a loop that lives as long as the app and are reused
+# from one request to the next.
+
+loop = None
+loop_thread = None
+loop_lock = threading.Lock()
+
+# Created on first use, on the loop (see get_openai_client / get_anthropic_client)
+openai_client = None
+anthropic_client = None
+
+def get_loop():
+    """The shared event loop, started on first use"""
+    global loop
+    global loop_thread
+
+    with loop_lock:
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            loop_thread = threading.Thread(target=loop.run_forever, name="AI Event Loop", daemon=True)
+            loop_thread.start()
+
+        return loop
+
+def submit(coroutine):
+    """
+    Run a coroutine on the shared event loop
+
+    Returns:
+        concurrent.futures.Future: Its result; cancel() cancels the coroutine
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+def run_request(message, on_chunk=None, use_cache=True):
+    """Send `message` with create_request on the shared loop and wait for the response"""
+    return submit(create_request(message, on_chunk, use_cache=use_cache)).result()
+
+def api_messages(message, text_only=False):
+    """
+    The API's messages for a message (a single user turn) or a conversation
+
+    Args:
+        text_only: Join each turn's prompt blocks into one string (OpenAI takes the text, Anthropic the blocks)
+    """
+    turns = message if is_conversation(message) else [{"role": role, "content": message}]
+
+    if text_only:
+        return [{"role": turn["role"], "content": prompt_text(turn["content"])} for turn in turns]
+    return turns
+
+def get_openai_client():
+    global openai_client
+
+    if openai_client is None:
+        openai_client = AsyncOpenAI()
+    return openai_client
+
+def get_anthropic_client():
+    global anthropic_client
+
+    if anthropic_client is None:
+        anthropic_client = AsyncAnthropic()
+    return anthropic_client
+
+async def close_clients():
+    """Cancel any requests still running, then close the clients"""
+    global openai_client
+    global anthropic_client
+
+    running = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+
+    for client in (openai_client, anthropic_client):
+        if client is not None:
+            await client.close()
+
+    openai_client = None
+    anthropic_client = None
+
+def stop_loop():
+    """Close the clients and stop the shared loop"""
+    global loop
+
+    with loop_lock:
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"Could not close the API clients\n{e}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(timeout=5)
+        loop = None
+
+atexit.register(stop_loop)
+
+#endregion
+
+#region Prompt Caching
+
+def log_usage(model, input_tokens, cache_read_tokens, cache_write_tokens, output_tokens):
+    """Print how much of a request's input was read from or written to the prompt cache"""
+    total_input = input_tokens + cache_read_tokens + cache_write_tokens
+    hit_rate = cache_read_tokens / total_input * 100 if total_input else 0
+
+    print(f"{model} tokens: {total_input} in ({cache_read_tokens} cache hit, {cache_write_tokens} cache write, "
+          f"{input_tokens} uncached, {hit_rate:.0f}% hit), {output_tokens} out")
+
+def openai_cache_key(message):
+    """Routing key for OpenAI's prompt cache, shared by requests with the same cached prefix"""
+    prefix = cached_prefix_text(message)
+    if not prefix:
+        return None
+    return "resume-tailor-" + hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+
+def log_openai_usage(model, usage):
+    if usage is None:
+        return
+
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = (getattr(details, 'cached_tokens', None) or 0) if details is not None else 0
 
+    # OpenAI caches automatically, so there are no separate cache writes
+    log_usage(model, usage.prompt_tokens - cached, cached, 0, usage.completion_tokens)
+
+def log_claude_usage(model, usage):
+    log_usage(
+        model,
+        usage.input_tokens,
+        usage.cache_read_input_tokens or 0,
+        usage.cache_creation_input_tokens or 0,
+        usage.output_tokens
+    )
+
+#endregion
+
+#region Response Cache
+
+# Characters per on_chunk call when replaying a saved response
+REPLAY_CHUNK_SIZE = 200
+
+def response_settings(model, settings):
+    """The settings besides the message that change what `model` responds with"""
+    if "claude" in model:
+        anthropic_settings = settings.get('Anthropic', {})
+        return {
+            'Thinking Type': anthropic_settings.get('Thinking Type', 'adaptive'),
+            'Effort': anthropic_settings.get('Effort', 'medium'),
+        }
+    return {}
+
+def is_json(text):
+    try:
+        json.loads(text)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+async def replay_response(response, on_chunk):
+    """Stream a saved response through `on_chunk` like a live one"""
+    for start in range(0, len(response), REPLAY_CHUNK_SIZE):
+        on_chunk(response[start:start + REPLAY_CHUNK_SIZE])
+        await asyncio.sleep(0)
+
+#endregion
+
+#region Timing
+
+class FirstChunkTimer:
+    """Wraps on_chunk to time how long a request takes to start streaming its response"""
+
+    def __init__(self, on_chunk):
+        self.on_chunk = on_chunk
+        self.started = time.perf_counter()
+        self.first_chunk = None
+
+    def __call__(self, text):
+        if self.first_chunk is None:
+            self.first_chunk = time.perf_counter() - self.started
+        self.on_chunk(text)
+
+    def log(self, model):
+        total = time.perf_counter() - self.started
+        first_chunk = f"{self.first_chunk:.2f}s" if self.first_chunk is not None else "never"
+        print(f"{model}: first token after {first_chunk}, response after {total:.2f}s")
+
+#endregion
+
+async def create_gpt_request(model, message, on_chunk=None, read_timeout=None):
+    # Same order as the Claude blocks, so the stable prefix comes first and hits OpenAI's cache
+    messages = api_messages(message, text_only=True)
+    cache_key = openai_cache_key(message)
+    cache_options = {"prompt_cache_key": cache_key} if cache_key else {}
 
-async def create_gpt_request(model, message, on_chunk=None):
     if on_chunk is None:
-        response = await openai_client.chat.completions.create(
+        response = await get_openai_client().chat.completions.create(
             model=model,
-            messages=[
-                {"role": role, "content": message}
-            ]
+            messages=messages,
+            timeout=read_timeout,
+            **cache_options
         )
+        log_openai_usage(model, response.usage)
         content = response.choices[0].message.content
         if not content:
             ic(response.choices[0].finish_reason, response.usage, response)
@@ -35,21 +236,33 @@ async def create_gpt_request(model, message, on_chunk=None):
 
     content_parts = []
     finish_reason = None
-    stream = await openai_client.chat.completions.create(
+    usage = None
+    stream = await get_openai_client().chat.completions.create(
         model=model,
-        messages=[
-            {"role": role, "content": message}
-        ],
-        stream=True
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True},
+        timeout=read_timeout,
+        **cache_options
     )
-    async for event in stream:
-        choice = event.choices[0]
-        if choice.finish_reason:
-            finish_reason = choice.finish_reason
-        delta = choice.delta.content
-        if delta:
-            content_parts.append(delta)
-            on_chunk(delta)
+    # Closing the stream (also on cancellation) closes the connection, which stops the generation
+    async with stream:
+        async for event in stream:
+            # The usage arrives in a last chunk with no choices
+            if event.usage is not None:
+                usage = event.usage
+            if not event.choices:
+                continue
+
+            choice = event.choices[0]
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+            delta = choice.delta.content
+            if delta:
+                content_parts.append(delta)
+                on_chunk(delta)
+
+    log_openai_usage(model, usage)
 
     content = "".join(content_parts)
     if not content:
@@ -66,25 +279,26 @@ def strip_markdown_code_fence(text):
     return text.strip()
 
 
-async def create_claude_request(model, message, on_chunk=None):
+async def create_claude_request(model, message, on_chunk=None, idle_timeout=None):
     anthropic_settings = get_config()['Settings'].get('Anthropic', {})
     thinking_type = anthropic_settings.get('Thinking Type', 'adaptive')
     effort = anthropic_settings.get('Effort', 'medium')
 
-    async with anthropic_client.messages.stream(
+    async with get_anthropic_client().messages.stream(
         model=model,
         max_tokens=32000,
         thinking={"type": thinking_type},
         output_config={"effort": effort},
-        messages=[
-            {"role": role, "content": message}
-        ]
+        messages=api_messages(message),
+        timeout=idle_timeout
     ) as stream:
         if on_chunk is not None:
             async for text in stream.text_stream:
                 on_chunk(text)
         response = await stream.get_final_message()
 
+    log_claude_usage(model, response.usage)
+
     message_content = next(
         (block.text for block in response.content if block.type == "text"), ""
     )
@@ -93,11 +307,79 @@ async def create_claude_request(model, message, on_chunk=None):
     return strip_markdown_code_fence(message_content)
 
 
-async def create_request(message, on_chunk=None):
+async def create_request(message, on_chunk=None, timeout=None, use_cache=True):
+    """
+    Send `message` to the current model and return the response text
+
+    Args:
+        message: Message to send (or a conversation, see Prompts.continue_conversation)
+        on_chunk: Optional function called with each piece of the response as it streams in
+        timeout: Seconds the whole request may take (default: Settings.Request Timeout)
+        use_cache: Use the response cache if Settings.Response Cache is enabled
+
+    Raises:
+        TimeoutError: The request took longer than `timeout`, or the API went quiet for longer than
+                      Settings.Stream Idle Timeout
+
+    A response to the same message with the same model and settings is returned from the response
+    cache (Settings.Response Cache) when there is one, streamed through `on_chunk` all the same.
+    """
     config = get_config()
-    model = config['Settings']['Current Model']
+    settings = config['Settings']
+    model = settings['Current Model']
+
+    timeout = timeout or settings.get('Request Timeout', 600)
+    idle_timeout = settings.get('Stream Idle Timeout', 120)
+
+    # Streamed requests log how long the first token took
+    timer = FirstChunkTimer(on_chunk) if on_chunk is not None else None
+
+    # Claude requests always stream. A GPT request without on_chunk doesn't, and then nothing arrives
+    # until the whole response is done, so it only gets the overall timeout instead of the idle one
+    streamed = on_chunk is not None or "claude" in model
+    read_timeout = idle_timeout if streamed else timeout
 
     if "claude" in model:
-        return await create_claude_request(model, message, on_chunk)
+        request = create_claude_request(model, message, timer, idle_timeout)
     elif "gpt" in model:
-        return await create_gpt_request(model, message, on_chunk)
+        request = create_gpt_request(model, message, timer, read_timeout)
+    else:
+        raise ValueError(f"Unknown model: {model}")
+
+    cache_settings = settings.get('Response Cache', {})
+    use_cache = use_cache and cache_settings.get('Enabled', True)
+    max_age = cache_settings.get('Max Age Days', 30) * 24 * 60 * 60
+    max_size = cache_settings.get('Max Size MB', 50) * 1024 * 1024
+
+    if use_cache:
+        get_response_cache()
+        key = ResponseCache.request_key(model, response_settings(model, settings), message)
+        cached = ResponseCache.get(key, max_age)
+
+        if cached is not None:
+            request.close()
+            print(f"{model}: cached response ({ResponseCache.stats_text()})")
+            if on_chunk is not None:
+                await replay_response(cached, on_chunk)
+            return cached
+
+    try:
+        response = await asyncio.wait_for(request, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"No complete response from {model} after {timeout:g}s")
+    except Exception as e:
+        # Both SDKs raise APITimeoutError when a read takes longer than their timeout
+        if type(e).__name__ == "APITimeoutError":
+            if not streamed:
+                raise TimeoutError(f"No complete response from {model} after {timeout:g}s") from e
+            raise TimeoutError(f"Nothing received from {model} for {idle_timeout:g}s") from e
+        raise
+
+    if timer is not None:
+        timer.log(model)
+
+    # Only complete answers are saved: every request asks for JSON, so anything else is cut off or off track
+    if use_cache and is_json(response):
+        ResponseCache.put(key, model, response, max_size, max_age)
+
+    return response
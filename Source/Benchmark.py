@@ -0,0 +1,306 @@
+from Utility import get_base_resumes, get_docx_text, resume_template, cover_letter_template
+import Utility
+import argparse
+import json
+import statistics
+import threading
+import time
+
+# Manual performance checks. Run from the Source folder:
+#   python Benchmark.py docx-text
+#   python Benchmark.py history-items
+#   python Benchmark.py history-search
+#   python Benchmark.py template-render
+#   python Benchmark.py resume-corpus
+#   python Benchmark.py generation-continuation   (sends real requests to the current model)
+
+
+def time_call(func, repeat):
+    """Run `func` `repeat` times and return the individual timings in milliseconds"""
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+#region Docx Text Backends
+
+def benchmark_docx_text(repeat=5):
+    """Compare the python-docx and raw xml text backends across the BaseResumes corpus"""
+    get_base_resumes()
+    resumes = Utility.base_resumes
+
+    print(f"{'-'*50}\nDocx text backends ({len(resumes)} resumes, {repeat} runs each)\n{'-'*50}")
+
+    totals = {"python-docx": 0.0, "xml": 0.0}
+
+    for resume in resumes:
+        expected = get_docx_text(resume, "python-docx")
+        actual = get_docx_text(resume, "xml")
+        matches = "same text" if expected == actual else "TEXT DIFFERS"
+
+        row = []
+        for backend in totals:
+            median = statistics.median(time_call(lambda: get_docx_text(resume, backend), repeat))
+            totals[backend] += median
+            row.append(f"{backend}: {median:7.2f} ms")
+
+        print(f"{resume.name:<30} {' | '.join(row)} ({matches})")
+
+    speedup = totals["python-docx"] / totals["xml"] if totals["xml"] else 0
+    print(f"{'Total':<30} python-docx: {totals['python-docx']:7.2f} ms | xml: {totals['xml']:7.2f} ms ({speedup:.1f}x)")
+
+#endregion
+
+#region History Items
+
+def sample_history_data(index):
+    """A made-up history record shaped like the ones in Resources/Json Data"""
+    return {
+        "Meta": {"File Name": f"Engineer {index} Company{index}", "Date Created": "2025-01-01T12:00:00", "Favorite": index % 7 == 0},
+        "Job": {
+            "Company Name": f"Company{index}",
+            "Position Title": f"Engineer {index}",
+            "Salary": "$100k - $120k",
+            "Description": "Build and maintain backend services. " * 20,
+            "Tech Stack": ["Python", "SQL", "AWS", "React"],
+            "Responsibilities": ["Design services", "Review code", "Mentor engineers", "Own deployments"],
+            "Company Size": "250",
+            "Match Rating": index % 10 + 1,
+            "Match Rating Description": "Strong overlap with backend experience. " * 5,
+            "Job Quality": (index * 3) % 10 + 1,
+            "Job Quality Description": "Good pay and benefits. " * 5,
+            "Motive": "Interesting product and growth. " * 5,
+            "Date Applied": "01/01/25",
+            "Expected Response Date": "01/15/25",
+            "Save Submission": index % 5 == 0,
+            "Application Link": "https://example.com" if index % 2 else "",
+        }
+    }
+
+def benchmark_history_items(count=200):
+    """Compare building History page items with their details up front against building them on first expand"""
+    import os
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PySide6.QtWidgets import QApplication, QWidget
+    from Pages.History.HistoryItem import HistoryItem
+
+    app = QApplication.instance() or QApplication([])
+    datas = [sample_history_data(index) for index in range(count)]
+
+    print(f"{'-'*50}\nHistory items ({count} items)\n{'-'*50}")
+
+    results = {}
+    for label, lazy_details in (("eager", False), ("lazy", True)):
+        start = time.perf_counter()
+        items = [HistoryItem(data, None, lazy_details=lazy_details) for data in datas]
+        elapsed = (time.perf_counter() - start) * 1000
+
+        widget_count = sum(len(item.findChildren(QWidget)) + 1 for item in items)
+        results[label] = elapsed
+        print(f"{label:<12} build: {elapsed:8.2f} ms | widgets: {widget_count}")
+
+        for item in items:
+            item.deleteLater()
+        app.processEvents()
+
+    # Cost of the first expand that lazy items pay instead
+    item = HistoryItem(datas[0], None)
+    start = time.perf_counter()
+    item.set_expanded(True)
+    print(f"{'first expand':<12} build: {(time.perf_counter() - start) * 1000:8.2f} ms | widgets: {len(item.findChildren(QWidget)) + 1}")
+
+    speedup = results["eager"] / results["lazy"] if results["lazy"] else 0
+    print(f"Lazy details build {speedup:.1f}x faster")
+
+def benchmark_history_search(count=2000, repeat=50):
+    """Full-text search latency over a throwaway store of made-up records"""
+    import json
+    import random
+    import tempfile
+    import HistoryStore
+
+    random.seed(1)
+
+    # A few common words every posting uses plus a long tail of rarer ones
+    words = ["kubernetes", "payments", "latency", "graphics", "compiler", "python", "rust", "unity"]
+    words += ["".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(4, 10))) for _ in range(3000)]
+    weights = [50] * 8 + [1] * 3000
+
+    # Swap in a throwaway store, holding the lock so nothing else in the app uses it meanwhile, and
+    # put the app's own store back afterwards
+    with HistoryStore.store_lock, tempfile.TemporaryDirectory() as folder:
+        saved = (HistoryStore.connection, HistoryStore.full_text_available, HistoryStore.record_cache)
+        HistoryStore.connection = None
+        HistoryStore.record_cache = {0: {}, 1: {}}
+
+        try:
+            HistoryStore.open_store(f"{folder}/History.db")
+
+            start = time.perf_counter()
+            for index in range(count):
+                data = sample_history_data(index)
+                data['Job']['Description'] = " ".join(random.choices(words, weights, k=200))
+                data['Resume'] = {"File Name": f"R_{index}", "Summary": " ".join(random.choices(words, weights, k=60))}
+
+                path = f"{folder}/Engineer {index}.json"
+                with open(path, 'w', encoding='utf-8') as file:
+                    json.dump(data, file)
+                HistoryStore.upsert_file(path, archived=False)
+            print(f"{'-'*50}\nHistory search ({count} records, full text: {HistoryStore.full_text_available})\n{'-'*50}")
+            print(f"{'indexing':<24} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+            for query in ["kube", "kubernetes payments", "engineer 12", "rust unity graphics", words[100][:3], words[200], "zzzz"]:
+                results = HistoryStore.search(query, archived=False)
+                ranked = statistics.median(time_call(lambda: HistoryStore.search(query, archived=False, limit=50), repeat))
+                unranked = statistics.median(time_call(lambda: HistoryStore.search(query, archived=False, ranked=False), repeat))
+                print(f"{query!r:<24} ranked top 50: {ranked:8.3f} ms | all matches: {unranked:8.3f} ms ({len(results)} results)")
+        finally:
+            if HistoryStore.connection is not None:
+                HistoryStore.connection.close()
+            HistoryStore.connection, HistoryStore.full_text_available, HistoryStore.record_cache = saved
+
+#endregion
+
+#region Template Rendering
+
+def benchmark_template_render(repeat=20):
+    """Compare filling a template from scratch (modify_docx) against rendering from its cached plan"""
+    from Utility import modify_docx, render_template, get_template_plan, placeholder_replacer
+
+    print(f"{'-'*50}\nTemplate rendering ({repeat} runs each)\n{'-'*50}")
+
+    for template in (resume_template, cover_letter_template):
+        plan = get_template_plan(template)
+        data = {key: f"Value for {key}" for key in plan['Placeholders']}
+
+        fill = lambda text: Utility.fill_template(text, data)
+        full = statistics.median(time_call(lambda: modify_docx(template, fill), repeat))
+        planned = statistics.median(time_call(lambda: render_template(template, placeholder_replacer(data)), repeat))
+        paragraph_count = sum(len(indexes) for indexes in plan['Paragraphs'].values())
+
+        print(f"{template.name:<30} modify_docx: {full:7.2f} ms | render_template: {planned:7.2f} ms ({paragraph_count} planned paragraphs)")
+
+#endregion
+
+#region Resume Corpus
+
+SAMPLE_JOB_DESCRIPTION = """
+Software Engineer. You will build and test features across our web and mobile apps with a small agile team.
+Requirements: 2+ years with C#, .NET or Python, JavaScript/React, SQL, Git and CI/CD pipelines (Azure DevOps or Jenkins).
+Experience writing automated tests (unit, UI, integration) and working with REST APIs. AWS or Azure a plus.
+"""
+
+def benchmark_resume_corpus(repeat=5):
+    """Tokens of the full base resume text against the deduplicated corpus, and how long it takes to build"""
+    import Corpus
+
+    texts = Utility.get_base_resume_texts()
+    resumes = [(resume.name, text) for resume, text in zip(Utility.base_resumes, texts)]
+    resumes = Corpus.newest_first(resumes)
+
+    print(f"{'-'*50}\nResume corpus ({len(resumes)} resumes, {repeat} runs)\n{'-'*50}")
+
+    corpus = Corpus.build_corpus(resumes)
+    build = statistics.median(time_call(lambda: Corpus.build_corpus(resumes), repeat))
+
+    print(Corpus.corpus_report(corpus))
+    print(f"Built in {build:.2f} ms")
+
+    for token_budget in (1000, 2000, 3000):
+        relevant = Corpus.select_relevant(corpus, SAMPLE_JOB_DESCRIPTION, token_budget)
+        select = statistics.median(time_call(lambda: Corpus.select_relevant(corpus, SAMPLE_JOB_DESCRIPTION, token_budget), repeat))
+        print(f"Relevant to sample job, budget {token_budget}: ~{relevant['Tokens']} tokens, "
+              f"{relevant['Selected']} of {len(corpus['Lines'])} lines ({select:.2f} ms)")
+
+#endregion
+
+
+#region Generation Continuation
+
+def first_token_seconds(message, timeout=300):
+    """Seconds until the response to `message` starts streaming, bypassing the response cache. The request is cancelled then"""
+    from Agent import submit, create_request
+
+    first_chunk = threading.Event()
+    start = time.perf_counter()
+    future = submit(create_request(message, on_chunk=lambda text: first_chunk.set(), use_cache=False))
+
+    try:
+        if not first_chunk.wait(timeout):
+            raise TimeoutError(f"No response after {timeout}s")
+        return time.perf_counter() - start
+    finally:
+        future.cancel()
+
+def uncached_tokens(message):
+    """Estimated tokens of a message after its cached prefix (what the provider reads fresh)"""
+    import Corpus
+    from Prompts import prompt_text, cached_prefix_text, is_conversation
+
+    turns = message if is_conversation(message) else [{"content": message}]
+    total = sum(Corpus.estimate_tokens(prompt_text(turn["content"])) for turn in turns)
+
+    return total - Corpus.estimate_tokens(cached_prefix_text(message))
+
+def benchmark_generation_continuation(repeat=3):
+    """Time to first token of a new generation prompt against continuing the rating conversation (real requests)"""
+    from Agent import run_request
+    from Prompts import build_rating_prompt, build_generation_prompt, build_continued_generation_prompt, RATING_KEYS
+
+    Utility.get_templates()
+    model = Utility.get_config()['Settings']['Current Model']
+    resume_context = Utility.get_resume_context(SAMPLE_JOB_DESCRIPTION)
+
+    print(f"{'-'*50}\nGeneration after a rating ({model}, {repeat} runs each)\n{'-'*50}")
+
+    rating_message = build_rating_prompt(resume_context, "Sample Company", "Software Engineer", SAMPLE_JOB_DESCRIPTION, cache_job=True)
+    rating_response = run_request(rating_message, use_cache=False)
+    rating = {key: json.loads(rating_response)[key] for key in RATING_KEYS}
+
+    prompts = {
+        "New prompt": build_generation_prompt(resume_context, "Sample Company", "Software Engineer", SAMPLE_JOB_DESCRIPTION, rating),
+        "Continued conversation": build_continued_generation_prompt(rating_message, rating_response),
+    }
+    timings = {name: [] for name in prompts}
+
+    # Alternate, so both see the same prompt cache state and API load
+    for _ in range(repeat):
+        for name, message in prompts.items():
+            timings[name].append(first_token_seconds(message))
+
+    for name, message in prompts.items():
+        print(f"{name:<24} first token: {statistics.median(timings[name]):6.2f} s median "
+              f"({', '.join(f'{seconds:.2f}' for seconds in timings[name])}) | ~{uncached_tokens(message)} tokens after the cached prefix")
+
+#endregion
+
+
+benchmarks = {
+    "docx-text": benchmark_docx_text,
+    "history-items": benchmark_history_items,
+    "history-search": benchmark_history_search,
+    "template-render": benchmark_template_render,
+    "resume-corpus": benchmark_resume_corpus,
+    "generation-continuation": benchmark_generation_continuation,
+}
+
+live_benchmarks = ("generation-continuation",)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume Tailor performance checks")
+    parser.add_argument("benchmark", choices=list(benchmarks) + ["all"])
+    args = parser.parse_args()
+
+    # "all" leaves out the benchmarks that send real requests
+    if args.benchmark == "all":
+        selected = [benchmark for name, benchmark in benchmarks.items() if name not in live_benchmarks]
+    else:
+        selected = [benchmarks[args.benchmark]]
+
+    for benchmark in selected:
+        benchmark()
@@ -0,0 +1,507 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import atexit
+import importlib.util
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import xmlrpc.client
+
+# .docx -> .pdf conversion backends. Each backend converts a batch of files, writing every PDF
+# next to its .docx. Batches run on a small worker pool so the resume and cover letter convert
+# at the same time.
+#
+#   docx2pdf     Microsoft Word through docx2pdf (Windows / macOS), one file at a time
+#   libreoffice  Headless LibreOffice (soffice --convert-to pdf), works anywhere LibreOffice is installed
+#
+# Starting Word or LibreOffice is most of the cost of a conversion, so by default conversions go to
+# warm engines (one per worker, so files still convert at the same time) instead (see Warm Services below) and only fall back to the cold backends above
+# when the warm engine isn't available or fails.
+
+LIBREOFFICE_TIMEOUT = 120
+WARM_START_TIMEOUT = 60
+
+# After a warm engine fails to start, use the cold backends for this long before trying again
+WARM_RETRY_DELAY = 300
+
+# Where LibreOffice usually lives when it isn't on PATH
+SOFFICE_LOCATIONS = [
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+]
+
+
+def find_soffice():
+    """Path to the LibreOffice executable, or None if it isn't installed"""
+    for name in ("soffice", "libreoffice"):
+        found = shutil.which(name)
+        if found:
+            return found
+
+    for location in SOFFICE_LOCATIONS:
+        if Path(location).exists():
+            return location
+
+    return None
+
+def resolve_converter(name):
+    """Turn a 'PDF Converter' setting into a backend name ('auto' picks Word where it exists, else LibreOffice)"""
+    if name in converters:
+        return name
+
+    if name != "auto":
+        print(f"Unknown PDF converter '{name}', picking one automatically")
+
+    if sys.platform in ("win32", "darwin"):
+        return "docx2pdf"
+
+    return "libreoffice"
+
+#region Backends
+
+# docx2pdf drives the shared Word application and quits it after every file, which would kill a
+# conversion running on another thread, so only one docx2pdf conversion runs at a time
+docx2pdf_lock = threading.Lock()
+
+def convert_with_docx2pdf(docx_paths, worker_index, profile_root):
+    """Convert through Word, one file at a time. Each worker thread needs its own COM initialization on Windows"""
+    from docx2pdf import convert
+
+    com_initialized = False
+    if sys.platform == "win32":
+        import pythoncom
+        pythoncom.CoInitialize()
+        com_initialized = True
+
+    try:
+        for docx_path in docx_paths:
+            with docx2pdf_lock:
+                convert(str(docx_path), str(docx_path.with_suffix(".pdf")))
+    finally:
+        if com_initialized:
+            pythoncom.CoUninitialize()
+
+def convert_with_libreoffice(docx_paths, worker_index, profile_root):
+    """Convert with one headless LibreOffice run for the whole batch.
+
+    Two LibreOffice processes can't share a user profile, so each worker gets its own under `profile_root`
+    (kept between runs, which makes later startups faster).
+    """
+    soffice = find_soffice()
+    if soffice is None:
+        raise RuntimeError("LibreOffice (soffice) was not found. Install it or pick another PDF converter")
+
+    profile_dir = Path(profile_root) / f"Worker {worker_index}"
+    profile_dir.mkdir(parents=True, exist_ok=True)
+
+    # Files from different folders need separate runs, since --outdir applies to the whole run
+    by_folder = {}
+    for docx_path in docx_paths:
+        by_folder.setdefault(docx_path.parent, []).append(docx_path)
+
+    for folder, folder_paths in by_folder.items():
+        subprocess.run(
+            [soffice, f"-env:UserInstallation={profile_dir.resolve().as_uri()}",
+             "--headless", "--norestore", "--nologo", "--nodefault",
+             "--convert-to", "pdf", "--outdir", str(folder), *[str(path) for path in folder_paths]],
+            check=True, capture_output=True, timeout=LIBREOFFICE_TIMEOUT
+        )
+
+    missing = [path.name for path in docx_paths if not path.with_suffix(".pdf").exists()]
+    if missing:
+        raise RuntimeError(f"LibreOffice didn't produce a PDF for {', '.join(missing)}")
+
+converters = {
+    "docx2pdf": convert_with_docx2pdf,
+    "libreoffice": convert_with_libreoffice,
+}
+
+#endregion
+
+#region Warm Services
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class WordEngine:
+    """A private, invisible Word instance. Must be started and used from the same thread (COM)"""
+
+    @staticmethod
+    def available():
+        return sys.platform == "win32" and importlib.util.find_spec("win32com") is not None
+
+    def __init__(self, profile_root, index):
+        self.word = None
+
+    def start(self):
+        import pythoncom
+        import win32com.client
+
+        pythoncom.CoInitialize()
+
+        # DispatchEx starts a separate Word instead of borrowing the one the user has open
+        self.word = win32com.client.DispatchEx("Word.Application")
+        self.word.Visible = False
+        self.word.DisplayAlerts = 0
+
+    def is_healthy(self):
+        try:
+            self.word.Version
+            return True
+        except Exception:
+            return False
+
+    def convert(self, docx_path, pdf_path):
+        doc = self.word.Documents.Open(str(docx_path), ReadOnly=True, AddToRecentFiles=False, Visible=False)
+        try:
+            doc.SaveAs2(str(pdf_path), FileFormat=17)  # wdFormatPDF
+        finally:
+            doc.Close(0)
+
+    def stop(self):
+        import pythoncom
+
+        try:
+            self.word.Quit()
+        except Exception:
+            pass
+
+        self.word = None
+        pythoncom.CoUninitialize()
+
+class UnoserverEngine:
+    """A LibreOffice kept running by unoserver, driven over its XML-RPC interface"""
+
+    @staticmethod
+    def available():
+        return shutil.which("unoserver") is not None and find_soffice() is not None
+
+    def __init__(self, profile_root, index):
+        # Each running LibreOffice needs its own profile
+        self.profile_dir = Path(profile_root) / f"Warm {index}"
+        self.process = None
+        self.port = None
+
+    def proxy(self, timeout=None):
+        transport = TimeoutTransport(timeout) if timeout else None
+        return xmlrpc.client.ServerProxy(f"http://127.0.0.1:{self.port}", allow_none=True, transport=transport)
+
+    def start(self):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.port = free_port()
+
+        self.process = subprocess.Popen(
+            [shutil.which("unoserver"), "--port", str(self.port), "--uno-port", str(free_port()),
+             "--executable", find_soffice(), "--user-installation", self.profile_dir.resolve().as_uri()],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        # Ready once LibreOffice itself answers, not just the XML-RPC server in front of it
+        deadline = time.monotonic() + WARM_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"unoserver exited during startup (code {self.process.returncode})")
+            try:
+                self.proxy(timeout=5).info()
+                return
+            except (OSError, xmlrpc.client.Error):
+                time.sleep(0.25)
+
+        self.stop()
+        raise RuntimeError(f"unoserver didn't become ready within {WARM_START_TIMEOUT} s")
+
+    def is_healthy(self):
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            self.proxy(timeout=2).system.listMethods()
+            return True
+        except (OSError, xmlrpc.client.Error):
+            return False
+
+    def convert(self, docx_path, pdf_path):
+        # inpath, indata, outpath, convert_to, filtername, filter_options, update_index, infiltername
+        self.proxy(timeout=LIBREOFFICE_TIMEOUT).convert(str(docx_path), None, str(pdf_path), "pdf", None, [], True, None)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+        self.process = None
+
+class TimeoutTransport(xmlrpc.client.Transport):
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+class ConverterService:
+    """Warm conversion engines, each on its own thread. Conversions are queued and every worker takes
+    the next one, so the resume and cover letter convert at the same time on separate engines.
+
+    A worker starts its engine on its first request, checks it before every request and restarts it
+    when it stops responding (including when a conversion fails because it died).
+    """
+
+    def __init__(self, engine_class, profile_root, name, workers=1):
+        self.engine_class = engine_class
+        self.profile_root = profile_root
+        self.name = name
+        self.disabled_until = 0
+        self.requests = queue.Queue()
+        self.threads = []
+        self.threads_lock = threading.Lock()
+
+        self.add_workers(workers)
+
+    def add_workers(self, count):
+        """Start worker threads until there are `count` of them"""
+        with self.threads_lock:
+            while len(self.threads) < count:
+                worker = WarmWorker(self, len(self.threads))
+                thread = threading.Thread(target=worker.run, name=f"{self.name} converter {worker.index}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, docx_path):
+        """Queue a conversion. Returns a Future with the seconds it took"""
+        future = Future()
+        self.requests.put((Path(docx_path), future))
+        return future
+
+    def stop(self):
+        with self.threads_lock:
+            for _ in self.threads:
+                self.requests.put(None)
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    @property
+    def usable(self):
+        return time.monotonic() >= self.disabled_until
+
+class WarmWorker:
+    """One thread of a ConverterService and the engine it owns"""
+
+    def __init__(self, service, index):
+        self.service = service
+        self.index = index
+        self.name = service.name
+        self.engine = None
+
+    def run(self):
+        while True:
+            request = self.service.requests.get()
+
+            if request is None:
+                self._stop_engine()
+                return
+
+            docx_path, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._convert(docx_path))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _convert(self, docx_path):
+        pdf_path = docx_path.with_suffix(".pdf")
+
+        for attempt in range(2):
+            self._ensure_engine()
+
+            start = time.perf_counter()
+            try:
+                self.engine.convert(docx_path, pdf_path)
+                return time.perf_counter() - start
+            except Exception as e:
+                # A healthy engine that can't convert the file won't do better after a restart
+                if attempt == 1 or self.engine.is_healthy():
+                    raise
+
+                print(f"Warm {self.name} converter {self.index} failed on {docx_path.name}, restarting it\n{e}")
+                self._stop_engine()
+
+    def _ensure_engine(self):
+        if self.engine is not None and self.engine.is_healthy():
+            return
+
+        if self.engine is not None:
+            print(f"Warm {self.name} converter {self.index} stopped responding, restarting it")
+            self._stop_engine()
+
+        if not self.service.usable:
+            raise RuntimeError(f"Warm {self.name} converter is disabled after a failed start")
+
+        start = time.perf_counter()
+        engine = self.service.engine_class(self.service.profile_root, self.index)
+        try:
+            engine.start()
+        except Exception:
+            self.service.disabled_until = time.monotonic() + WARM_RETRY_DELAY
+            raise
+
+        self.engine = engine
+        print(f"Warm {self.name} converter {self.index} started in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _stop_engine(self):
+        if self.engine is None:
+            return
+
+        try:
+            self.engine.stop()
+        except Exception as e:
+            print(f"Could not stop warm {self.name} converter {self.index}\n{e}")
+
+        self.engine = None
+
+warm_engines = {
+    "docx2pdf": WordEngine,
+    "libreoffice": UnoserverEngine,
+}
+
+services = {}
+services_lock = threading.Lock()
+
+def get_service(name, profile_root, workers=1):
+    """The warm service for a backend with at least `workers` engines, created on first use. None if its
+    engine isn't installed or is disabled"""
+    engine_class = warm_engines.get(name)
+    if engine_class is None or not engine_class.available():
+        return None
+
+    with services_lock:
+        service = services.get(name)
+        if service is None:
+            service = ConverterService(engine_class, profile_root, name, workers)
+            services[name] = service
+        else:
+            service.add_workers(workers)
+
+    return service if service.usable else None
+
+def stop_services():
+    with services_lock:
+        for service in services.values():
+            service.stop()
+            service.join(timeout=15)
+        services.clear()
+
+atexit.register(stop_services)
+
+#endregion
+
+def convert_files(docx_paths, converter="auto", workers=2, profile_root=None, warm=True):
+    """
+    Convert .docx files to PDFs next to them
+
+    Args:
+        docx_paths: Paths of the .docx files
+        converter: Backend name, or 'auto'
+        workers: How many files convert at the same time (cold: batches the files are split evenly
+                 between, warm: engines kept running)
+        profile_root: Folder for per-worker converter state (LibreOffice profiles)
+        warm: Use the backend's warm service when it's available, falling back to a cold conversion
+              for any file it couldn't convert
+
+    Returns:
+        list: One dict per file with 'File', 'Seconds' (time for the batch it was in), 'Batch Size',
+              'Converter' and 'Error' (None when it converted)
+    """
+    docx_paths = [Path(path) for path in docx_paths]
+    if not docx_paths:
+        return []
+
+    name = resolve_converter(converter)
+    profile_root = Path(profile_root) if profile_root else Path.cwd() / "Converter Profiles"
+
+    results = []
+
+    service = get_service(name, profile_root, max(1, int(workers))) if warm else None
+    if service is not None:
+        futures = [(path, service.submit(path)) for path in docx_paths]
+        cold_paths = []
+
+        for path, future in futures:
+            try:
+                seconds = future.result()
+                results.append({'File': path.name, 'Seconds': seconds, 'Batch Size': 1, 'Error': None, 'Converter': f"{name} (warm)"})
+            except Exception as e:
+                print(f"Falling back to a cold {name} conversion for {path.name}\n{e}")
+                cold_paths.append(path)
+
+        docx_paths = cold_paths
+
+    if docx_paths:
+        results += convert_files_cold(docx_paths, name, workers, profile_root)
+
+    return results
+
+# Worker indexes (and so LibreOffice profiles) held by running cold conversions. Conversions for
+# different jobs can run at once (see JobQueue), so each batch claims an index no other batch has
+profile_slots_lock = threading.Lock()
+profile_slots_in_use = set()
+
+def claim_profile_slot():
+    """Lowest worker index no running batch is using"""
+    with profile_slots_lock:
+        index = 0
+        while index in profile_slots_in_use:
+            index += 1
+        profile_slots_in_use.add(index)
+        return index
+
+def release_profile_slot(index):
+    with profile_slots_lock:
+        profile_slots_in_use.discard(index)
+
+def convert_files_cold(docx_paths, name, workers, profile_root):
+    """Convert with a fresh Word / LibreOffice per batch (see convert_files)"""
+    backend = converters[name]
+
+    worker_count = max(1, min(int(workers), len(docx_paths)))
+    batches = [docx_paths[index::worker_count] for index in range(worker_count)]
+
+    def run_batch(batch):
+        start = time.perf_counter()
+        error = None
+        worker_index = claim_profile_slot()
+
+        try:
+            backend(batch, worker_index, profile_root)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            release_profile_slot(worker_index)
+
+        seconds = time.perf_counter() - start
+
+        return [
+            {'File': path.name, 'Seconds': seconds, 'Batch Size': len(batch), 'Error': error, 'Converter': name}
+            for path in batch
+        ]
+
+    with ThreadPoolExecutor(max_workers=worker_count) as pool:
+        futures = [pool.submit(run_batch, batch) for batch in batches]
+        results = [result for future in futures for result in future.result()]
+
+    return results
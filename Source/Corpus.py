@@ -0,0 +1,324 @@
+import re
+import numpy as np
+
+# Compact resume context: the base resumes are mostly versions of one another, so sending all of them
+# repeats the same bullets many times. The corpus keeps each line once (the wording from the newest
+# resume that has it), remembers which resumes it came from, and drops the repeats from older ones.
+
+# Lines whose word sets overlap at least this much (Jaccard) are the same line reworded
+SIMILARITY_THRESHOLD = 0.8
+
+# A line that contains at least this share of another line's words (and has CONTAINMENT_MIN_WORDS+)
+# is an extended or trimmed version of it
+CONTAINMENT_THRESHOLD = 0.9
+CONTAINMENT_MIN_WORDS = 6
+
+# Short, dated or parenthesized lines are headings (sections, jobs, schools, projects); a repeated
+# heading is brought back when a new line under it is kept, so the line keeps its context
+HEADING_MAX_WORDS = 5
+HEADING_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+MAX_PENDING_HEADINGS = 2
+
+# Rough characters per token for English text (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+WORD_PATTERN = re.compile(r"[a-z0-9#+]+")
+
+# Relevance selection: corpus lines are ranked against the job description with BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# The first lines of the newest resume (name and contact details) are always kept
+PROFILE_LINES = 2
+
+# Words too common in job descriptions to say anything about a line
+STOP_WORDS = frozenset("""
+a about an and are as at be by can for from has have in is it of on or our that the their this
+to we will with you your who what which while within all any other such may must etc
+""".split())
+
+
+def estimate_tokens(text):
+    """Approximate token count of `text`"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def line_words(line):
+    """Lowercase words of a line, ignoring punctuation, bullets and spacing"""
+    return frozenset(WORD_PATTERN.findall(line.lower()))
+
+def is_heading(line, words):
+    return len(words) <= HEADING_MAX_WORDS or line.endswith(")") or HEADING_YEAR.search(line) is not None
+
+def is_same_line(words, other_words):
+    """Whether two lines (as word sets) say the same thing"""
+    if words == other_words:
+        return True
+
+    # Very short lines only match exactly
+    if min(len(words), len(other_words)) < 3:
+        return False
+
+    shared = len(words & other_words)
+    if shared / len(words | other_words) >= SIMILARITY_THRESHOLD:
+        return True
+
+    smaller = min(len(words), len(other_words))
+    return smaller >= CONTAINMENT_MIN_WORDS and shared / smaller >= CONTAINMENT_THRESHOLD
+
+
+def newest_first(resumes):
+    """
+    Order (name, text) resumes newest first, by the latest year each one mentions
+
+    File dates aren't reliable (a copy or checkout resets them), but a resume's newest job or
+    graduation date is. Ties keep the name order, descending.
+    """
+    def recency(resume):
+        years = [int(match.group(0)) for match in HEADING_YEAR.finditer(resume[1])]
+        return max(years, default=0), resume[0]
+
+    return sorted(resumes, key=recency, reverse=True)
+
+def build_corpus(resumes):
+    """
+    Deduplicate the lines of several resumes
+
+    Args:
+        resumes: List of (name, text) tuples, newest first. A line's wording comes from the first
+                 resume that has it
+
+    Returns:
+        Dictionary containing:
+            'Lines': Every kept line as a dictionary with 'Text', 'Resume' (where the wording came from),
+                     'Sources' (every resume the line appears in) and 'Headings' (positions of the
+                     headings it sits under there)
+            'Document': The compact text, one section per resume with only the lines it adds
+            'Tokens': Estimated tokens of 'Document'
+            'Full Tokens': Estimated tokens of all the resumes as they are
+            'Duplicates': Number of lines left out as repeats
+            'Added': Dictionary of resume name -> number of lines it added
+    """
+    lines = []
+    kept_words = []
+
+    # Words -> kept line positions, so a line is only compared with lines it shares a word with
+    word_index = {}
+
+    sections = []
+    duplicates = 0
+    added = {}
+    full_text = []
+
+    for name, text in resumes:
+        full_text.append(text)
+        section = []
+        pending_headings = []
+        added[name] = 0
+
+        # Positions of the headings the current line sits under: consecutive headings stack
+        # ("Professional Experience" then a job), a heading after other lines starts over
+        current_headings = []
+        previous_heading = False
+
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            words = line_words(line)
+            if not words:
+                continue
+
+            candidates = set()
+            for word in words:
+                candidates.update(word_index.get(word, ()))
+
+            match = next((position for position in sorted(candidates) if is_same_line(words, kept_words[position])), None)
+
+            heading = is_heading(line, words)
+            line_headings = current_headings if previous_heading or not heading else []
+
+            if match is not None:
+                if name not in lines[match]['Sources']:
+                    lines[match]['Sources'].append(name)
+                duplicates += 1
+
+                if heading:
+                    pending_headings = (pending_headings + [line])[-MAX_PENDING_HEADINGS:]
+                    current_headings = (line_headings + [match])[-MAX_PENDING_HEADINGS:]
+                previous_heading = heading
+                continue
+
+            # New line: bring back the headings it sits under first
+            section.extend(pending_headings)
+            pending_headings = []
+            section.append(line)
+
+            position = len(lines)
+            lines.append({'Text': line, 'Resume': name, 'Sources': [name], 'Headings': list(line_headings)})
+            kept_words.append(words)
+            for word in words:
+                word_index.setdefault(word, []).append(position)
+
+            if heading:
+                current_headings = (line_headings + [position])[-MAX_PENDING_HEADINGS:]
+            previous_heading = heading
+
+            added[name] += 1
+
+        if section:
+            sections.append(f"{'-'*50}\n{name}\n{'-'*50}\n" + "\n".join(section))
+
+    document = ("Each resume below only lists the lines it adds to the resumes before it (newest first).\n"
+                + "\n".join(sections))
+
+    return {
+        'Lines': lines,
+        'Document': document,
+        'Tokens': estimate_tokens(document),
+        'Full Tokens': estimate_tokens("\n".join(full_text)),
+        'Duplicates': duplicates,
+        'Added': added,
+    }
+
+def corpus_report(corpus):
+    """Readable summary of a corpus: token sizes before and after, and what each resume added"""
+    full_tokens = corpus['Full Tokens']
+    tokens = corpus['Tokens']
+    saved = (1 - tokens / full_tokens) * 100 if full_tokens else 0
+
+    report = [
+        f"Resume context: ~{full_tokens} tokens -> ~{tokens} tokens ({saved:.0f}% smaller)",
+        f"{len(corpus['Lines'])} unique lines, {corpus['Duplicates']} repeated lines left out",
+    ]
+
+    for name, count in corpus['Added'].items():
+        report.append(f"  {name}: {count} new lines")
+
+    shared = sorted(corpus['Lines'], key=lambda line: len(line['Sources']), reverse=True)[:5]
+    if shared and len(shared[0]['Sources']) > 1:
+        report.append("Most repeated lines:")
+        for line in shared:
+            report.append(f"  [{len(line['Sources'])} resumes] {line['Text'][:80]}")
+
+    return "\n".join(report)
+
+#region Relevance Selection
+
+def line_terms(text):
+    """Words of `text` for ranking, with repeats and without stop words"""
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+
+def bm25_scores(documents, query):
+    """
+    BM25 score of each document for a query
+
+    Args:
+        documents: List of term lists
+        query: List of query terms (repeats don't count twice)
+
+    Returns:
+        np.ndarray: One score per document
+    """
+    vocabulary = {term: column for column, term in enumerate(sorted(set(query)))}
+    counts = np.zeros((len(documents), len(vocabulary)), dtype=np.float64)
+    lengths = np.zeros(len(documents), dtype=np.float64)
+
+    for row, terms in enumerate(documents):
+        lengths[row] = len(terms)
+        for term in terms:
+            column = vocabulary.get(term)
+            if column is not None:
+                counts[row, column] += 1
+
+    if not vocabulary or not lengths.any():
+        return np.zeros(len(documents), dtype=np.float64)
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+    term_scores = counts * (BM25_K1 + 1) / (counts + length_norm[:, np.newaxis])
+
+    return term_scores @ idf
+
+def section_header(name):
+    return f"{'-'*50}\n{name}\n{'-'*50}\n"
+
+def line_entries(lines, position):
+    """(resume, line position) pairs a line is written as: its headings, then itself, in its resume's section"""
+    line = lines[position]
+    return [(line['Resume'], heading) for heading in line['Headings']] + [(line['Resume'], position)]
+
+def render_lines(lines, positions, preamble):
+    """Document of the lines at `positions` (in corpus order), one section per resume, each under its headings"""
+    sections = {}
+
+    for position in sorted(positions):
+        for resume, entry in line_entries(lines, position):
+            section = sections.setdefault(resume, [])
+            if entry not in section:
+                section.append(entry)
+
+    return preamble + "\n" + "\n".join(
+        section_header(name) + "\n".join(lines[entry]['Text'] for entry in section) for name, section in sections.items()
+    )
+
+def select_relevant(corpus, job_description, token_budget):
+    """
+    The corpus lines most relevant to a job, within a token budget
+
+    Lines are ranked against the job description with BM25 and taken best first, each with the
+    headings it sits under, until the budget is spent. The name and contact lines always stay.
+
+    Args:
+        corpus: Result of build_corpus
+        job_description: Text of the job posting
+        token_budget: Most estimated tokens for the selected document
+
+    Returns:
+        Dictionary with 'Document', 'Tokens' and 'Selected' (number of lines), or None when the job
+        description matches nothing (use the whole corpus then). The whole corpus is returned as it
+        is if it already fits the budget.
+    """
+    lines = corpus['Lines']
+    if corpus['Tokens'] <= token_budget:
+        return {'Document': corpus['Document'], 'Tokens': corpus['Tokens'], 'Selected': len(lines)}
+
+    scores = bm25_scores([line_terms(line['Text']) for line in lines], line_terms(job_description))
+    if not scores.any():
+        return None
+
+    preamble = "The lines of my resumes most relevant to this job, each under its section (newest resume first)."
+    selected = set()
+    written = set()
+    used = estimate_tokens(preamble)
+
+    def add(position, force=False):
+        """Select a line if what it adds to the document fits the budget"""
+        nonlocal used
+        entries = [entry for entry in dict.fromkeys(line_entries(lines, position)) if entry not in written]
+        cost = sum(estimate_tokens(lines[entry]['Text']) + 1 for _, entry in entries)
+        cost += sum(estimate_tokens(section_header(resume)) for resume in {resume for resume, _ in entries}
+                    if resume not in {resume for resume, _ in written})
+
+        if not force and used + cost > token_budget:
+            return
+
+        selected.add(position)
+        written.update(entries)
+        used += cost
+
+    for position in range(min(PROFILE_LINES, len(lines))):
+        add(position, force=True)
+
+    for position in np.argsort(-scores, kind='stable'):
+        if scores[position] <= 0:
+            break
+        add(int(position))
+
+    document = render_lines(lines, selected, preamble)
+
+    return {'Document': document, 'Tokens': estimate_tokens(document), 'Selected': len(selected)}
+
+#endregion
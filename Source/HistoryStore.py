@@ -0,0 +1,395 @@
+from datetime import datetime
+from pathlib import Path
+import json
+import re
+import sqlite3
+import threading
+
+# Indexed copy of the history JSON files in Resources/Json Data (and its Archived folder).
+# The JSON files stay the source of truth: every read first syncs the store against the folder
+# by size + modified time, so only new or edited files are parsed and deleted files are dropped.
+
+SCHEMA_VERSION = 1
+FULL_TEXT_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    file_name TEXT NOT NULL,
+    archived INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    modified INTEGER NOT NULL,
+    date_created TEXT,
+    match_rating REAL,
+    job_quality REAL,
+    favorite INTEGER NOT NULL DEFAULT 0,
+    save_submission INTEGER NOT NULL DEFAULT 0,
+    expected_response_date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (archived, file_name)
+);
+CREATE INDEX IF NOT EXISTS history_date_created ON history (archived, date_created);
+CREATE INDEX IF NOT EXISTS history_match_rating ON history (archived, match_rating);
+CREATE INDEX IF NOT EXISTS history_job_quality ON history (archived, job_quality);
+CREATE INDEX IF NOT EXISTS history_favorite ON history (archived, favorite);
+CREATE INDEX IF NOT EXISTS history_save_submission ON history (archived, save_submission);
+CREATE INDEX IF NOT EXISTS history_expected_response_date ON history (archived, expected_response_date);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Full-text index over the longer text of each record. Its rowids are the history table's rowids.
+# Prefix indexes keep "pyth*" style queries from scanning every term. '#' and '+' are part of a word
+# so "c#" and "c++" are searchable instead of turning into "c"
+FULL_TEXT_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5 (
+    position, company, tech_stack, description, responsibilities, motive, match_rating_description, resume,
+    prefix = '2 3',
+    tokenize = "unicode61 tokenchars '#+'"
+);
+"""
+
+# Column weights for ranking (same order as the columns): title and company hits rank highest
+FULL_TEXT_WEIGHTS = (5.0, 5.0, 3.0, 1.0, 1.0, 1.0, 1.0, 0.5)
+
+connection = None
+store_lock = threading.RLock()
+
+# False when this SQLite build doesn't include FTS5 (search falls back to LIKE over the JSON)
+full_text_available = False
+
+# Parsed JSON of each record ({archived: {file_name: (modified, data)}}), so unchanged records
+# aren't parsed again on every read
+record_cache = {0: {}, 1: {}}
+
+
+def open_store(db_path):
+    """Open (or create) the store at `db_path`. Safe to call more than once"""
+    global connection
+
+    with store_lock:
+        if connection is not None:
+            return connection
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(SCHEMA)
+
+        open_full_text_index()
+
+        return connection
+
+def open_full_text_index():
+    """Create the full-text index if SQLite supports it, filling it from the stored records once"""
+    global full_text_available
+
+    try:
+        connection.executescript(FULL_TEXT_SCHEMA)
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search isn't available, falling back to plain text search\n{e}")
+        full_text_available = False
+        return
+
+    full_text_available = True
+
+    if get_meta("Full Text Version") != str(FULL_TEXT_VERSION):
+        # Recreated rather than emptied, the tokenizer may have changed
+        connection.execute("DROP TABLE history_fts")
+        connection.executescript(FULL_TEXT_SCHEMA)
+
+        for row in connection.execute("SELECT rowid, data FROM history").fetchall():
+            index_full_text(row['rowid'], json.loads(row['data']))
+
+        set_meta("Full Text Version", FULL_TEXT_VERSION)
+        connection.commit()
+
+def get_meta(key, default=None):
+    row = connection.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+
+    return default if row is None else row['value']
+
+def set_meta(key, value):
+    connection.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+#region Records
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def to_iso_date(date_text):
+    """Convert a mm/dd/yy date to yyyy-mm-dd so it sorts and compares as text"""
+    try:
+        return datetime.strptime(date_text, "%m/%d/%y").date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+def record_values(data):
+    """The indexed column values for a history JSON object"""
+    meta = data.get('Meta', {})
+    job = data.get('Job', {})
+
+    return {
+        'date_created': meta.get('Date Created'),
+        'match_rating': to_float(job.get('Match Rating')),
+        'job_quality': to_float(job.get('Job Quality')),
+        'favorite': int(bool(meta.get('Favorite', False))),
+        'save_submission': int(bool(job.get('Save Submission', False))),
+        'expected_response_date': to_iso_date(job.get('Expected Response Date')),
+    }
+
+def full_text_values(data):
+    """The searchable text of a history JSON object, in FULL_TEXT_SCHEMA column order"""
+    job = data.get('Job', {})
+
+    def text(value):
+        if isinstance(value, list):
+            return "\n".join(str(item) for item in value)
+        return "" if value is None else str(value)
+
+    resume = data.get('Resume', {})
+    resume_text = "\n".join(text(value) for key, value in resume.items() if key != 'File Name')
+
+    return (
+        text(job.get('Position Title')),
+        text(job.get('Company Name')),
+        text(job.get('Tech Stack')),
+        text(job.get('Description')),
+        text(job.get('Responsibilities')),
+        text(job.get('Motive')),
+        text(job.get('Match Rating Description')),
+        resume_text,
+    )
+
+def index_full_text(rowid, data):
+    connection.execute("""
+        INSERT INTO history_fts (rowid, position, company, tech_stack, description, responsibilities,
+                                 motive, match_rating_description, resume)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (rowid, *full_text_values(data)))
+
+def unindex_full_text(file_name, archived):
+    row = connection.execute(
+        "SELECT rowid FROM history WHERE archived = ? AND file_name = ?", (int(archived), file_name)
+    ).fetchone()
+
+    if row is not None:
+        connection.execute("DELETE FROM history_fts WHERE rowid = ?", (row['rowid'],))
+
+def upsert_file(path, archived):
+    """Read a history JSON file into the store. Returns False if the file couldn't be read"""
+    path = Path(path)
+
+    try:
+        stat = path.stat()
+        with open(path, 'r', encoding='utf-8') as file:
+            text = file.read()
+        data = json.loads(text)
+    except (OSError, ValueError) as e:
+        print(f"Could not index {path.name}\n{e}")
+        return False
+
+    values = record_values(data)
+
+    with store_lock:
+        if full_text_available:
+            unindex_full_text(path.stem, archived)
+
+        cursor = connection.execute("""
+            INSERT OR REPLACE INTO history (file_name, archived, size, modified, date_created, match_rating,
+                                           job_quality, favorite, save_submission, expected_response_date, data)
+            VALUES (:file_name, :archived, :size, :modified, :date_created, :match_rating,
+                    :job_quality, :favorite, :save_submission, :expected_response_date, :data)
+        """, {
+            'file_name': path.stem,
+            'archived': int(archived),
+            'size': stat.st_size,
+            'modified': stat.st_mtime_ns,
+            'data': text,
+            **values
+        })
+
+        if full_text_available:
+            index_full_text(cursor.lastrowid, data)
+
+        connection.commit()
+
+    return True
+
+def remove_record(file_name, archived):
+    with store_lock:
+        if full_text_available:
+            unindex_full_text(file_name, archived)
+
+        connection.execute("DELETE FROM history WHERE archived = ? AND file_name = ?", (int(archived), file_name))
+        connection.commit()
+
+#endregion
+
+#region Sync
+
+def import_json_files(folder, archived):
+    """One-time import of every JSON file in `folder`"""
+    count = 0
+
+    with store_lock:
+        for path in Path(folder).glob("*.json"):
+            if path.is_file() and upsert_file(path, archived):
+                count += 1
+
+    return count
+
+def sync_folder(folder, archived):
+    """Bring the store in line with the JSON files in `folder`, only reading files that changed.
+
+    Returns:
+        tuple: (file names added or updated, file names removed)
+    """
+    folder = Path(folder)
+
+    with store_lock:
+        import_key = f"Imported {'Archived' if archived else 'History'}"
+        if get_meta(import_key) != str(SCHEMA_VERSION):
+            import_json_files(folder, archived)
+            set_meta(import_key, SCHEMA_VERSION)
+            connection.commit()
+
+        known = {
+            row['file_name']: (row['size'], row['modified'])
+            for row in connection.execute("SELECT file_name, size, modified FROM history WHERE archived = ?", (int(archived),))
+        }
+
+        changed = []
+        seen = set()
+
+        for path in folder.glob("*.json"):
+            if not path.is_file():
+                continue
+
+            seen.add(path.stem)
+            stat = path.stat()
+
+            if known.get(path.stem) != (stat.st_size, stat.st_mtime_ns) and upsert_file(path, archived):
+                changed.append(path.stem)
+
+        removed = [file_name for file_name in known if file_name not in seen]
+        for file_name in removed:
+            remove_record(file_name, archived)
+
+        return changed, removed
+
+#endregion
+
+#region Queries
+
+def get_records(archived):
+    """Every record in the store, newest first, as dicts with 'file_name', 'modified' and 'data'.
+
+    Records whose modified time hasn't changed since the last call reuse the already parsed JSON.
+    """
+    archived = int(archived)
+
+    with store_lock:
+        cache = record_cache[archived]
+        rows = connection.execute(
+            "SELECT file_name, modified FROM history WHERE archived = ? ORDER BY date_created DESC", (archived,)
+        ).fetchall()
+
+        stale = [row['file_name'] for row in rows if cache.get(row['file_name'], (None,))[0] != row['modified']]
+
+        # Stay under SQLite's bound parameter limit
+        for start in range(0, len(stale), 500):
+            chunk = stale[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+
+            for row in connection.execute(
+                f"SELECT file_name, modified, data FROM history WHERE archived = ? AND file_name IN ({placeholders})",
+                (archived, *chunk)
+            ):
+                cache[row['file_name']] = (row['modified'], json.loads(row['data']))
+
+        current = {row['file_name'] for row in rows}
+        for file_name in set(cache) - current:
+            del cache[file_name]
+
+        return [
+            {'file_name': row['file_name'], 'modified': row['modified'], 'data': cache[row['file_name']][1]}
+            for row in rows
+        ]
+
+def get_datas(archived):
+    """Every history JSON object in the store, newest first"""
+    return [record['data'] for record in get_records(archived)]
+
+def get_expired_file_names(include_favorites, today=None):
+    """File names of active applications whose expected response date has been reached"""
+    today = (today or datetime.now().date()).isoformat()
+
+    with store_lock:
+        rows = connection.execute("""
+            SELECT file_name FROM history
+            WHERE archived = 0 AND expected_response_date <= ? AND (favorite = 0 OR ?)
+        """, (today, int(include_favorites))).fetchall()
+
+    return [row['file_name'] for row in rows]
+
+def search_terms(query):
+    """Words in a search query (letters, digits, underscores, '#' and '+', lowercase)"""
+    return re.findall(r"[\w#+]+", query.lower())
+
+def search(query, archived, limit=None, ranked=True):
+    """
+    File names of records matching every word of `query`, best match first
+
+    Each word matches as a prefix ("pyth" finds "python") anywhere in the position, company, tech stack,
+    description, responsibilities, motive, match rating description or resume text. Results are ranked
+    by bm25 when full-text search is available, otherwise they come back newest first.
+
+    Args:
+        query: Search text as typed
+        archived: Search the archived records instead of the active ones
+        limit: Maximum number of results (default: all)
+        ranked: Sort by relevance (pass False when only the set of matches matters, it's faster)
+
+    Returns:
+        list: Matching file names
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    limit = -1 if limit is None else int(limit)
+
+    with store_lock:
+        if full_text_available:
+            match = " ".join(f'"{term}"*' for term in terms)
+            weights = ", ".join(str(weight) for weight in FULL_TEXT_WEIGHTS)
+            order = f"ORDER BY bm25(history_fts, {weights})" if ranked else ""
+
+            # CROSS JOIN keeps SQLite from walking the history table and running the MATCH once per row
+
+            rows = connection.execute(f"""
+                SELECT history.file_name FROM history_fts
+                CROSS JOIN history ON history.rowid = history_fts.rowid
+                WHERE history_fts MATCH ? AND history.archived = ?
+                {order}
+                LIMIT ?
+            """, (match, int(archived), limit)).fetchall()
+        else:
+            conditions = " AND ".join("lower(data) LIKE ?" for _ in terms)
+
+            rows = connection.execute(f"""
+                SELECT file_name FROM history
+                WHERE archived = ? AND {conditions}
+                ORDER BY date_created DESC
+                LIMIT ?
+            """, (int(archived), *(f"%{term}%" for term in terms), limit)).fetchall()
+
+    return [row['file_name'] for row in rows]
+
+#endregion
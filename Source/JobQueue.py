@@ -0,0 +1,355 @@
+import asyncio
+import csv
+import json
+import random
+import re
+import time
+from pathlib import Path
+from Agent import create_request
+from Prompts import build_generation_prompt, build_rating_prompt, build_continued_generation_prompt, RATING_KEYS
+from Utility import get_config, save_generated_data, render_documents, get_resume_context, continue_rating_enabled
+
+# Batch tailoring: importing many job postings and working through them with a bounded number of
+# requests in flight, a per-provider request rate and retries for transient API errors.
+#
+# A job is a dictionary with the posting ('Company Name', 'Job Title', 'Job Description',
+# 'Application Link', 'Source') and its progress ('Status', 'Rating', 'Attempts', 'Error', 'File Name').
+
+BATCH_MODES = ("Rate then Generate", "Rate Only", "Generate Only")
+
+# Header lines a pasted or .txt posting may start with, before the description
+HEADER_KEYS = {
+    "company": "Company Name",
+    "company name": "Company Name",
+    "title": "Job Title",
+    "job title": "Job Title",
+    "position": "Job Title",
+    "link": "Application Link",
+    "url": "Application Link",
+    "application link": "Application Link",
+}
+
+# CSV column names (lowercase) for each job field
+CSV_COLUMNS = {
+    "Company Name": ("company name", "company"),
+    "Job Title": ("job title", "title", "position"),
+    "Job Description": ("job description", "description"),
+    "Application Link": ("application link", "link", "url"),
+}
+
+# Pasted postings are separated by a line of three or more dashes
+POSTING_SEPARATOR = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+HEADER_LINE = re.compile(r"^\s*([A-Za-z ]+?)\s*:\s*(.*)$")
+
+# Status codes worth retrying (timeouts, conflicts, rate limits and server errors)
+RETRY_STATUS_CODES = {408, 409, 429}
+
+
+#region Importing
+
+def new_job(description, company_name="", job_title="", application_link="", source=""):
+    """A queued job for a posting"""
+    return {
+        'Company Name': company_name.strip(),
+        'Job Title': job_title.strip(),
+        'Job Description': description.strip(),
+        'Application Link': application_link.strip(),
+        'Source': source,
+        'Status': "Queued",
+        'Rating': None,
+        'Attempts': 0,
+        'Error': "",
+        'File Name': "",
+    }
+
+def job_label(job):
+    """Short name for a job in logs"""
+    return job['Job Title'] or job['Company Name'] or job['Source']
+
+def parse_posting(text, source=""):
+    """
+    Job for one posting, reading any "Company:", "Title:" or "Link:" lines at the top
+
+    Returns:
+        dict: The job, or None if there's no description
+    """
+    fields = {}
+    lines = text.strip().splitlines()
+
+    while lines:
+        header = HEADER_LINE.match(lines[0])
+        if header is None or header.group(1).lower() not in HEADER_KEYS:
+            break
+
+        fields[HEADER_KEYS[header.group(1).lower()]] = header.group(2)
+        lines.pop(0)
+
+    description = "\n".join(lines).strip()
+    if not description:
+        return None
+
+    return new_job(
+        description,
+        company_name=fields.get('Company Name', ""),
+        job_title=fields.get('Job Title', ""),
+        application_link=fields.get('Application Link', ""),
+        source=source
+    )
+
+def jobs_from_text(text):
+    """Jobs from pasted postings, separated by lines of dashes (---)"""
+    jobs = [parse_posting(posting, source="Pasted") for posting in POSTING_SEPARATOR.split(text)]
+
+    return [job for job in jobs if job is not None]
+
+def jobs_from_folder(folder):
+    """Jobs from every .txt file in `folder`, one posting per file"""
+    jobs = []
+
+    for file in sorted(Path(folder).glob("*.txt")):
+        job = parse_posting(file.read_text(encoding="utf-8", errors="replace"), source=file.name)
+        if job is not None:
+            jobs.append(job)
+
+    return jobs
+
+def jobs_from_csv(csv_path):
+    """Jobs from a CSV file with a header row (Company, Title, Description and Link columns)"""
+    jobs = []
+
+    with open(csv_path, 'r', encoding="utf-8-sig", newline="") as file:
+        reader = csv.DictReader(file)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+        field_columns = {
+            field: next((columns[alias] for alias in aliases if alias in columns), None)
+            for field, aliases in CSV_COLUMNS.items()
+        }
+
+        if field_columns['Job Description'] is None:
+            raise ValueError(f"{Path(csv_path).name} has no Description column")
+
+        for row_number, row in enumerate(reader, start=2):
+            values = {field: (row.get(column) or "") if column else "" for field, column in field_columns.items()}
+            if not values['Job Description'].strip():
+                continue
+
+            jobs.append(new_job(
+                values['Job Description'],
+                company_name=values['Company Name'],
+                job_title=values['Job Title'],
+                application_link=values['Application Link'],
+                source=f"{Path(csv_path).name}:{row_number}"
+            ))
+
+    return jobs
+
+#endregion
+
+#region Scheduling
+
+def provider_for_model(model):
+    """API provider a model is served by ("Anthropic" or "OpenAI")"""
+    return "Anthropic" if "claude" in model else "OpenAI"
+
+def is_retryable(error):
+    """Whether a failed request is worth trying again (rate limits, timeouts, server errors, bad JSON)"""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code in RETRY_STATUS_CODES or status_code >= 500
+
+    if isinstance(error, (json.JSONDecodeError, asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    # Both SDKs name their network errors the same way
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def retry_after(error):
+    """Seconds the provider asked to wait before retrying (None if it didn't say)"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Spaces out request starts so a provider sees at most `per_minute` requests a minute"""
+
+    def __init__(self, per_minute):
+        self.interval = 60 / per_minute if per_minute else 0
+        self.next_start = 0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def back_off(self, seconds):
+        """Hold every request back for `seconds` (after the provider reports a rate limit)"""
+        self.next_start = max(self.next_start, time.monotonic() + seconds)
+
+
+class JobScheduler:
+    """Runs jobs concurrently, at most `parallelism` at a time, with rate limiting and retries"""
+
+    def __init__(self, parallelism=3, requests_per_minute=None, retries=3, backoff=2.0, request=create_request, on_update=None):
+        """
+        Args:
+            parallelism: Most jobs worked on at once
+            requests_per_minute: Dictionary of provider -> most requests started a minute (missing means no limit)
+            retries: Extra attempts for a request that fails with a retryable error
+            backoff: Seconds before the first retry, doubling after each one
+            request: Async function that sends a message and returns the response text
+            on_update: Function called with a job whenever its progress changes
+        """
+        self.parallelism = max(1, int(parallelism))
+        self.requests_per_minute = requests_per_minute or {}
+        self.retries = retries
+        self.backoff = backoff
+        self.request = request
+        self.on_update = on_update
+        self.limiters = {}
+        self.stopped = False
+
+    def update(self, job, **changes):
+        job.update(changes)
+        if self.on_update is not None:
+            self.on_update(job)
+
+    def stop(self):
+        """Don't start any more jobs (jobs already running finish)"""
+        self.stopped = True
+
+    def limiter_for(self, provider):
+        if provider not in self.limiters:
+            self.limiters[provider] = RateLimiter(self.requests_per_minute.get(provider))
+        return self.limiters[provider]
+
+    async def request_json(self, job, message, status):
+        """
+        Send `message` for `job` and parse the JSON response, retrying transient failures
+
+        Args:
+            job: Job the request is for (its status and attempts are updated)
+            message: Message to send
+            status: Status to show while the request runs ("Rating", "Generating", ...)
+        """
+        model = get_config()['Settings']['Current Model']
+        limiter = self.limiter_for(provider_for_model(model))
+
+        for attempt in range(self.retries + 1):
+            await limiter.wait()
+            self.update(job, Status=status, Attempts=job['Attempts'] + 1)
+
+            try:
+                response = json.loads(await self.request(message))
+            except Exception as e:
+                if attempt == self.retries or not is_retryable(e):
+                    raise
+
+                delay = retry_after(e)
+                if delay is not None:
+                    limiter.back_off(delay)
+                else:
+                    delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+
+                print(f"{job_label(job)}: {type(e).__name__}, retrying in {delay:.1f}s")
+                self.update(job, Status=f"Retrying ({attempt + 1}/{self.retries})", Error=str(e))
+                await asyncio.sleep(delay)
+                continue
+
+            if job['Error']:
+                self.update(job, Error="")
+
+            return response
+
+    async def run(self, jobs, process):
+        """
+        Work through `jobs`, calling `process(scheduler, job)` for each with at most `parallelism` running
+
+        A job that raises is marked "Failed" with the error; the others carry on.
+        """
+        semaphore = asyncio.Semaphore(self.parallelism)
+
+        async def run_job(job):
+            async with semaphore:
+                if self.stopped:
+                    self.update(job, Status="Cancelled")
+                    return
+
+                try:
+                    await process(self, job)
+                except Exception as e:
+                    self.update(job, Status="Failed", Error=f"{type(e).__name__}: {e}")
+
+        await asyncio.gather(*(run_job(job) for job in jobs))
+
+#endregion
+
+#region Processing
+
+def tailoring_process(resume_context=get_resume_context, mode="Rate then Generate", min_rating=0, save_submission=False):
+    """
+    The work for each job in a batch, for JobScheduler.run
+
+    Args:
+        resume_context: Function returning the base resume text for a job description
+        mode: One of BATCH_MODES
+        min_rating: With "Rate then Generate", only generate for jobs rated at least this
+        save_submission: Save the generated data without writing documents
+    """
+    continue_rating = continue_rating_enabled()
+
+    async def process(scheduler, job):
+        loop = asyncio.get_running_loop()
+        base_resume_text = resume_context(job['Job Description'])
+        rating = None
+
+        if mode != "Generate Only":
+            rating_message = build_rating_prompt(
+                base_resume_text, job['Company Name'], job['Job Title'], job['Job Description'],
+                cache_job=continue_rating and mode == "Rate then Generate"
+            )
+            response = await scheduler.request_json(job, rating_message, "Rating")
+            rating = {key: response[key] for key in RATING_KEYS}
+            scheduler.update(job, Rating=rating)
+
+            if mode == "Rate Only":
+                scheduler.update(job, Status="Rated")
+                return
+
+            if float(rating['Match Rating']) < min_rating:
+                scheduler.update(job, Status="Skipped")
+                return
+
+        if rating is not None and continue_rating:
+            message = build_continued_generation_prompt(rating_message, json.dumps(response))
+        else:
+            message = build_generation_prompt(base_resume_text, job['Company Name'], job['Job Title'], job['Job Description'], rating)
+        data = await scheduler.request_json(job, message, "Generating")
+
+        if rating is None:
+            scheduler.update(job, Rating={key: data['Job'].get(key) for key in RATING_KEYS})
+
+        # Saving and rendering block, so they run on a thread to keep other jobs' requests moving
+        resume_data, cover_letter_data = await loop.run_in_executor(
+            None, save_generated_data, data, save_submission, job['Application Link']
+        )
+        scheduler.update(job, **{'File Name': data['Meta']['File Name']})
+
+        if not save_submission:
+            scheduler.update(job, Status="Writing Documents")
+            await loop.run_in_executor(None, render_documents, resume_data, cover_letter_data)
+
+        scheduler.update(job, Status="Done")
+
+    return process
+
+#endregion
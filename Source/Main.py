@@ -1,10 +1,12 @@
 import sys
+import time
+import threading
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QLabel, QLineEdit, QTextEdit,
                                QPushButton, QStackedWidget, QScrollArea, QComboBox, QCheckBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QIcon
-from Utility import paths, get_config, update_config
+from Utility import paths, get_config, update_config, record_startup_timing, run_deferred_startup
 
 
 class ResumeApp(QMainWindow):
@@ -42,6 +44,12 @@ class ResumeApp(QMainWindow):
         # Create the settings page
         self.create_settings_page()
 
+        # Create the batch page
+        self.create_batch_page()
+
+        # Refresh the history and archive pages when their folders change on disk
+        self.create_history_watcher()
+
     #region Pages
 
     def create_sidebar(self, parent_layout):
@@ -66,6 +74,10 @@ class ResumeApp(QMainWindow):
         self.resume_btn = SideBarButton("📄", "Resume Generator", lambda: self.stacked_widget.setCurrentIndex(0))
         sidebar_layout.addWidget(self.resume_btn)
 
+        # Batch button
+        self.batch_btn = SideBarButton("🧾", "Batch", lambda: self.stacked_widget.setCurrentWidget(self.batch_page))
+        sidebar_layout.addWidget(self.batch_btn)
+
         self.files_btn = SideBarButton("🗂️", "History", self.show_files_page)
         sidebar_layout.addWidget(self.files_btn)
 
@@ -81,7 +93,7 @@ class ResumeApp(QMainWindow):
         sidebar_layout.addStretch()
 
         # Settings button
-        self.settings_btn = SideBarButton("⚙️", "Settings", lambda: self.stacked_widget.setCurrentIndex(4))
+        self.settings_btn = SideBarButton("⚙️", "Settings", self.show_settings_page)
         sidebar_layout.addWidget(self.settings_btn)
 
         parent_layout.addWidget(sidebar)
@@ -97,6 +109,17 @@ class ResumeApp(QMainWindow):
 
     #endregion
 
+    #region Batch Page
+
+    def create_batch_page(self):
+        """Create the batch page and add it to the stacked widget"""
+        from Pages.Batch.Index import BatchPage
+
+        self.batch_page = BatchPage()
+        self.stacked_widget.addWidget(self.batch_page)
+
+    #endregion
+
     #region History Page
 
     def create_files_page(self):
@@ -137,6 +160,8 @@ class ResumeApp(QMainWindow):
         self.archive_min_rating_combo = filters['min_rating']
         self.archive_min_quality_combo = filters['min_quality']
         self.archive_date_filter_combo = filters['date_filter']
+        self.cancel_archive_search = filters['cancel']
+        self.incremental_archive_search = filters['incremental']
 
         # Create scroll area for archived items
         scroll_area = QScrollArea()
@@ -158,38 +183,76 @@ class ResumeApp(QMainWindow):
         scroll_area.setWidget(self.archive_container)
         page_layout.addWidget(scroll_area)
 
+        # Archive items currently shown, by file name -> (file modified time, widget)
+        self.archive_widgets_by_name = {}
+        self.archive_items = []
+
+        from Pages.History.FilterIndex import HistoryFilterIndex
+        self.archive_filter_index = HistoryFilterIndex(self.archive_items)
+
         # Add page to stacked widget
         self.stacked_widget.addWidget(self.archive_page)
 
     def show_archive_page(self):
         """Refresh and show the archive page"""
-        from Utility import get_archived_datas
+        # Navigating here checks the folder for files that were edited by hand
+        self.refresh_archive_page(sync=True)
+
+        # Clear search bar and reset filters
+        self.archive_search_bar.clear()
+        self.archive_min_rating_combo.setCurrentIndex(0)
+        self.archive_min_quality_combo.setCurrentIndex(0)
+        self.archive_date_filter_combo.setCurrentIndex(0)
+
+        # Apply the cleared search now rather than after the typing delay
+        self.cancel_archive_search()
+        self.filter_archive_items()
+
+        # Switch to archive page
+        self.stacked_widget.setCurrentIndex(2)
+
+    def refresh_archive_page(self, sync=False):
+        """Update the archive items in place, only rebuilding the ones whose files changed.
+
+        Args:
+            sync: Also check the folder for files added, edited or removed outside the app
+        """
+        from Utility import get_history_records
+        from Pages.History.HistorySync import sync_history_widgets
+        from Pages.History.FilterIndex import HistoryFilterIndex
+
+        def create_archive_item(data):
+            try:
+                return self.create_archive_item(data)
+            except Exception as e:
+                name = data['Meta']['File Name']
+                print(f"{'-'*50}\nCould not create archived item\n{name}\n{e}\n{'-'*50}\n")
+                return None
 
-        # Clear existing items
-        while self.archive_layout.count():
-            item = self.archive_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        records = get_history_records(archived=True, sync=sync)
 
-        # Load archived data
-        archived_datas = sorted(get_archived_datas(), key=lambda data: data['Meta']['Date Created'], reverse=True )
+        self.archive_widgets_by_name, _, _ = sync_history_widgets(
+            self.archive_layout, self.archive_widgets_by_name, records, create_archive_item
+        )
 
         # Update title with count
-        self.archive_title_label.setText(f"Archive ({len(archived_datas)} Results)")
+        self.archive_title_label.setText(f"Archive ({len(records)} Results)")
 
         # Store archive items with searchable data for filtering
         self.archive_items = []
 
-        # Create archive items
-        for data in archived_datas:
+        for record in records:
+            if record['file_name'] not in self.archive_widgets_by_name:
+                continue
+
+            data = record['data']
             try:
                 job_data = data['Job']
-                archive_item = self.create_archive_item(data)
-                self.archive_layout.addWidget(archive_item)
 
                 # Store item with its searchable data
                 self.archive_items.append({
-                    'widget': archive_item,
+                    'widget': self.archive_widgets_by_name[record['file_name']][1],
+                    'file_name': record['file_name'],
                     'position': job_data['Position Title'].lower(),
                     'company': job_data['Company Name'].lower(),
                     'tech_stack': ' '.join(job_data.get('Tech Stack', [])).lower(),
@@ -201,86 +264,38 @@ class ResumeApp(QMainWindow):
                 name = data['Meta']['File Name']
                 print(f"{'-'*50}\nCould not create archived item\n{name}\n{'-'*50}\n")
 
-        # Clear search bar and reset filters
-        self.archive_search_bar.clear()
-        self.archive_min_rating_combo.setCurrentIndex(0)
-        self.archive_min_quality_combo.setCurrentIndex(0)
-        self.archive_date_filter_combo.setCurrentIndex(0)
+        # Parse dates, ratings and search text once for every filter run until the next refresh
+        self.archive_filter_index = HistoryFilterIndex(self.archive_items)
 
-        # Switch to archive page
-        self.stacked_widget.setCurrentIndex(2)
+        # Re-apply the current filters to the updated items
+        self.filter_archive_items()
+
+    def on_history_folder_changed(self, archived):
+        """Pick up files added, removed or renamed outside the page's own actions while it's showing"""
+        if archived and self.stacked_widget.currentWidget() is self.archive_page:
+            self.refresh_archive_page(sync=True)
+        elif not archived and self.stacked_widget.currentWidget() is self.files_page:
+            self.files_page.refresh_files_page(sync=True)
 
     def filter_archive_items(self):
         """Filter archive items based on search query, minimum rating, minimum job quality, and date range"""
-        from datetime import datetime, timedelta
-
-        query = self.archive_search_bar.text().lower()
-
-        # Get minimum rating filter
-        rating_text = self.archive_min_rating_combo.currentText()
-        if rating_text == "All Ratings":
-            min_rating = 0
-        else:
-            # Extract number from "X+" format
-            min_rating = int(rating_text.rstrip('+'))
-
-        # Get minimum job quality filter
-        quality_text = self.archive_min_quality_combo.currentText()
-        if quality_text == "All Quality":
-            min_quality = 0
-        else:
-            # Extract number from "X+" format
-            min_quality = int(quality_text.rstrip('+'))
-
-        # Get date filter
-        date_filter_text = self.archive_date_filter_combo.currentText()
-        if date_filter_text == "Any day":
-            date_cutoff = None
-        elif date_filter_text == "Today":
-            date_cutoff = datetime.now().date()
-        elif date_filter_text == "Last 3 Days":
-            date_cutoff = (datetime.now() - timedelta(days=3)).date()
-        elif date_filter_text == "Last 7 Days":
-            date_cutoff = (datetime.now() - timedelta(days=7)).date()
-        elif date_filter_text == "Last 30 Days":
-            date_cutoff = (datetime.now() - timedelta(days=30)).date()
-
-        # Count visible items
-        visible_count = 0
-
-        for item_data in self.archive_items:
-            # Check if query matches position, company, or tech stack
-            text_match = (query in item_data['position'] or
-                         query in item_data['company'] or
-                         query in item_data['tech_stack'])
-
-            # Check if rating meets minimum
-            rating_match = item_data['match_rating'] >= min_rating
-
-            # Check if job quality meets minimum
-            quality_match = item_data['job_quality'] >= min_quality
-
-            # Check if date matches filter
-            if date_cutoff is None:
-                date_match = True  # "Any day" - show all
-            else:
-                item_date = datetime.fromisoformat(item_data['date_created']).date()
-                if date_filter_text == "Today":
-                    date_match = item_date == date_cutoff
-                else:
-                    # "Last X Days" - show items from cutoff date onwards
-                    date_match = item_date >= date_cutoff
-
-            # Show item only if all conditions are met
-            is_visible = text_match and rating_match and quality_match and date_match
-            item_data['widget'].setVisible(is_visible)
+        from Utility import search_history
+        from Pages.History.FilterIndex import parse_minimum
+
+        mask = self.archive_filter_index.match(
+            query=self.archive_search_bar.text().lower(),
+            min_rating=parse_minimum(self.archive_min_rating_combo.currentText()),
+            min_quality=parse_minimum(self.archive_min_quality_combo.currentText()),
+            date_filter=self.archive_date_filter_combo.currentText(),
+            refine=self.incremental_archive_search,
+            full_text=lambda query: search_history(query, archived=True, ranked=False)
+        )
 
-            # Update counts
-            if is_visible:
-                visible_count += 1
+        # Only show / hide the items whose visibility changed
+        self.archive_filter_index.apply(mask, lambda item_data, is_visible: item_data['widget'].setVisible(is_visible))
 
         # Update title label with filtered count
-        self.archive_title_label.setText(f"Archive ({visible_count} Results)")
+        self.archive_title_label.setText(f"Archive ({int(mask.sum())} Results)")
 
     def create_archive_item(self, data):
         """Create a simplified archive item widget showing company, match rate, job quality, and applied date"""
@@ -427,14 +442,12 @@ class ResumeApp(QMainWindow):
             # Restore the JSON file
             restore_archive_data(file_name)
 
-            # Refresh the archive page
-            self.show_archive_page()
+            # Drop the restored item from the page
+            self.refresh_archive_page()
 
     def delete_archive_item(self, data):
         """Delete an archived item permanently"""
-        from Utility import paths
         from PySide6.QtWidgets import QMessageBox
-        import os
 
         file_name = f"{data['Meta']['File Name']}"
 
@@ -451,17 +464,26 @@ class ResumeApp(QMainWindow):
 
         if result == QMessageBox.StandardButton.Yes:
             # Delete the JSON file from archive folder
-            archived_path = paths['json_data'] / 'Archived'
-            json_file_path = archived_path / f"{file_name}.json"
-            if json_file_path.exists():
-                os.remove(json_file_path)
-                print(f"Deleted archived item: {file_name}")
+            from Utility import delete_json_data
+            delete_json_data(file_name, archived=True)
 
-            # Refresh the archive page
-            self.show_archive_page()
+            # Drop the deleted item from the page
+            self.refresh_archive_page()
 
     #endregion
 
+    def create_history_watcher(self):
+        """Watch the history folders so the visible page picks up files changed outside the app"""
+        from Utility import ensure_path_exists
+        from Pages.History.HistorySync import HistoryWatcher
+
+        archive_folder = paths['json_data'] / 'Archived'
+        ensure_path_exists(paths['json_data'])
+        ensure_path_exists(archive_folder)
+
+        self.history_watcher = HistoryWatcher(paths['json_data'], archive_folder, parent=self)
+        self.history_watcher.changed.connect(self.on_history_folder_changed)
+
     #region Statistics Page
 
     def create_statistics_page(self):
@@ -532,6 +554,66 @@ class ResumeApp(QMainWindow):
             tooltip="When enabled, a modal shows the AI's response streaming in live while generating a resume or checking a rating"
         )
 
+        self.virtualized_history_checkbox = SettingsCheckbox(
+            "Virtualized History List",
+            main_layout,
+            is_checked=self.config_data['Settings'].get('Virtualized History List', True),
+            on_change=self.save_settings,
+            tooltip="When enabled, the History page paints its rows on demand instead of building a widget per application, which keeps large histories fast. Takes effect after restarting"
+        )
+
+        self.free_history_details_checkbox = SettingsCheckbox(
+            "Free Collapsed History Details",
+            main_layout,
+            is_checked=self.config_data['Settings'].get('Free Collapsed History Details', False),
+            on_change=self.save_settings,
+            tooltip="When enabled, an application's details are deleted when it's collapsed instead of kept hidden, which uses less memory but rebuilds them on every expand"
+        )
+
+        self.response_cache_checkbox = SettingsCheckbox(
+            "Reuse Cached AI Responses",
+            main_layout,
+            is_checked=self.config_data['Settings'].get('Response Cache', {}).get('Enabled', True),
+            on_change=self.save_settings,
+            tooltip="When enabled, asking again for the same posting with the same model and settings returns the saved response instantly instead of sending another request. Turn off to always get a fresh response"
+        )
+
+        self.speculative_rating_checkbox = SettingsCheckbox(
+            "Rate Jobs While Typing",
+            main_layout,
+            is_checked=self.config_data['Settings'].get('Speculative Rating', False),
+            on_change=self.save_settings,
+            tooltip="When enabled, the rating request starts on its own once the job description stops changing for a few seconds, so Check Rating shows the result right away. Uses a request for every posting you paste. Needs Reuse Cached AI Responses",
+            indent=20
+        )
+
+        # Response cache usage and a button to empty it
+        cache_layout = QHBoxLayout()
+        cache_layout.setContentsMargins(12, 0, 0, 0)
+
+        self.response_cache_label = QLabel()
+        self.response_cache_label.setStyleSheet("font-size: 10pt; color: #666;")
+        cache_layout.addWidget(self.response_cache_label)
+
+        clear_cache_button = QPushButton("Clear Cached Responses")
+        clear_cache_button.setStyleSheet("""
+            QPushButton {
+                padding: 6px 12px;
+                font-size: 10pt;
+                border: 1px solid #ccc;
+                border-radius: 6px;
+                background-color: white;
+            }
+            QPushButton:hover {
+                background-color: #f0f0f0;
+            }
+        """)
+        clear_cache_button.clicked.connect(self.clear_response_cache)
+        cache_layout.addWidget(clear_cache_button)
+        cache_layout.addStretch()
+
+        main_layout.addLayout(cache_layout)
+
         # GPT Model Setting
         model_layout = QVBoxLayout()
         model_layout.setSpacing(8)
@@ -641,13 +723,42 @@ class ResumeApp(QMainWindow):
         # Add page to stacked widget
         self.stacked_widget.addWidget(page)
 
+    def show_settings_page(self):
+        """Show the settings page with the response cache usage up to date"""
+        self.update_response_cache_label()
+        self.stacked_widget.setCurrentIndex(4)
+
+    def update_response_cache_label(self):
+        import ResponseCache
+        from Utility import get_response_cache
+
+        get_response_cache()
+        self.response_cache_label.setText(ResponseCache.stats_text())
+
+    def clear_response_cache(self):
+        """Delete every saved AI response"""
+        import ResponseCache
+        from Utility import get_response_cache
+
+        get_response_cache()
+        ResponseCache.clear()
+        self.update_response_cache_label()
+        print("Response cache cleared")
+
     def save_settings(self):
         """Save settings to Config.json using update_config"""
+        # Start from the file, other pages (Batch) save their own settings to it too
+        self.config_data = get_config()
+
         # Update config data
         self.config_data['Settings']['Auto Archive Expired Applications'] = self.auto_archive_checkbox.isChecked()
         self.config_data['Settings']['Auto Archive Expired Favorite Applications'] = self.auto_archive_favorites_checkbox.isChecked()
         self.config_data['Settings']['Show AI Response Stream'] = self.show_ai_stream_checkbox.isChecked()
+        self.config_data['Settings']['Virtualized History List'] = self.virtualized_history_checkbox.isChecked()
+        self.config_data['Settings']['Free Collapsed History Details'] = self.free_history_details_checkbox.isChecked()
         self.config_data['Settings']['Current Model'] = self.model_combo.currentText()
+        self.config_data['Settings'].setdefault('Response Cache', {})['Enabled'] = self.response_cache_checkbox.isChecked()
+        self.config_data['Settings']['Speculative Rating'] = self.speculative_rating_checkbox.isChecked()
 
         self.config_data['Settings'].setdefault('Anthropic', {})
         self.config_data['Settings']['Anthropic']['Thinking Type'] = self.thinking_type_combo.currentText()
@@ -656,17 +767,31 @@ class ResumeApp(QMainWindow):
         # Save to file using Utility function
         update_config(self.config_data)
 
-        print(f"Settings saved: Auto Archive = {self.auto_archive_checkbox.isChecked()}, Auto Archive Favorites = {self.auto_archive_favorites_checkbox.isChecked()}, Show AI Stream = {self.show_ai_stream_checkbox.isChecked()}, Model = {self.model_combo.currentText()}, Thinking Type = {self.thinking_type_combo.currentText()}, Effort = {self.effort_combo.currentText()}")
+        from Pages.History.HistoryItem import HistoryItem
+        HistoryItem.free_details_on_collapse = self.free_history_details_checkbox.isChecked()
+
+        print(f"Settings saved: Auto Archive = {self.auto_archive_checkbox.isChecked()}, Auto Archive Favorites = {self.auto_archive_favorites_checkbox.isChecked()}, Show AI Stream = {self.show_ai_stream_checkbox.isChecked()}, Virtualized History = {self.virtualized_history_checkbox.isChecked()}, Free Collapsed Details = {self.free_history_details_checkbox.isChecked()}, Reuse Cached Responses = {self.response_cache_checkbox.isChecked()}, Rate While Typing = {self.speculative_rating_checkbox.isChecked()}, Model = {self.model_combo.currentText()}, Thinking Type = {self.thinking_type_combo.currentText()}, Effort = {self.effort_combo.currentText()}")
 
     #endregion
 
     #endregion
 
+    def start_deferred_startup(self):
+        """Load base resumes and tidy up history in the background now that the window is visible"""
+        thread = threading.Thread(target=run_deferred_startup, name="Deferred Startup", daemon=True)
+        thread.start()
 
     
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+
+    window_start = time.perf_counter()
     window = ResumeApp()
     window.show()
+    record_startup_timing("Main Window", time.perf_counter() - window_start)
+
+    # Run the expensive startup work once the event loop has painted the window
+    QTimer.singleShot(0, window.start_deferred_startup)
+
     sys.exit(app.exec())
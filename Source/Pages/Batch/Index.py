@@ -0,0 +1,396 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QSpinBox,
+                               QCheckBox, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from JobQueue import BATCH_MODES, jobs_from_text, jobs_from_folder, jobs_from_csv, tailoring_process
+from Pages.History.FilterIndex import parse_minimum
+from Utility import get_config, update_config, get_templates, get_resume_context, play_notification_sound
+from Workers import BatchWorker
+
+COLUMNS = ["Company", "Job Title", "Status", "Match", "Quality", "Attempts", "Details"]
+
+# Text color for each status (anything else, like "Rating" or "Retrying (1/3)", is in progress)
+STATUS_COLORS = {
+    "Queued": "#757575",
+    "Done": "#2e7d32",
+    "Rated": "#2e7d32",
+    "Skipped": "#ef6c00",
+    "Cancelled": "#757575",
+    "Failed": "#c62828",
+}
+IN_PROGRESS_COLOR = "#1565c0"
+
+BUTTON_STYLE = """
+    QPushButton {{
+        background-color: {background};
+        color: {color};
+        font-size: 11pt;
+        font-weight: bold;
+        border: {border};
+        border-radius: 6px;
+        padding: 8px 16px;
+    }}
+    QPushButton:hover {{
+        background-color: {hover};
+    }}
+    QPushButton:disabled {{
+        background-color: #e0e0e0;
+        color: #9e9e9e;
+    }}
+"""
+
+CONTROL_STYLE = """
+    QComboBox, QSpinBox {
+        padding: 6px;
+        font-size: 11pt;
+        border: 2px solid #e0e0e0;
+        border-radius: 8px;
+        background-color: white;
+    }
+    QComboBox:focus, QSpinBox:focus {
+        border: 2px solid #4CAF50;
+    }
+"""
+
+
+class BatchPage(QWidget):
+    """Batch page: a queue of imported job postings rated and tailored concurrently."""
+
+    def __init__(self):
+        super().__init__()
+        self.jobs = []
+        self.worker = None
+        self._build_ui()
+
+    def _build_ui(self):
+        """Create the batch page"""
+        page_layout = QVBoxLayout(self)
+        page_layout.setSpacing(12)
+        page_layout.setContentsMargins(20, 20, 20, 20)
+
+        self.title_label = QLabel("Batch (0 Jobs)")
+        self.title_label.setStyleSheet("font-size: 18pt; font-weight: bold;")
+        page_layout.addWidget(self.title_label)
+
+        #region Import Row
+
+        import_row = QHBoxLayout()
+        import_row.setSpacing(10)
+
+        secondary_style = BUTTON_STYLE.format(background="#f5f5f5", color="#333", border="1px solid #e0e0e0", hover="#e0e0e0")
+
+        self.paste_button = QPushButton("Paste Jobs")
+        self.paste_button.setToolTip("Paste postings separated by a line of dashes (---).\n"
+                                     "Each can start with Company:, Title: and Link: lines.")
+        self.paste_button.clicked.connect(self.on_paste_jobs)
+
+        self.folder_button = QPushButton("Import Folder")
+        self.folder_button.setToolTip("Import every .txt file in a folder, one posting per file")
+        self.folder_button.clicked.connect(self.on_import_folder)
+
+        self.csv_button = QPushButton("Import CSV")
+        self.csv_button.setToolTip("Import a CSV with Company, Title, Description and Link columns")
+        self.csv_button.clicked.connect(self.on_import_csv)
+
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.setToolTip("Remove every job from the queue")
+        self.clear_button.clicked.connect(self.on_clear_jobs)
+
+        for button in (self.paste_button, self.folder_button, self.csv_button, self.clear_button):
+            button.setMinimumHeight(40)
+            button.setStyleSheet(secondary_style)
+            import_row.addWidget(button)
+
+        import_row.addStretch()
+        page_layout.addLayout(import_row)
+
+        #endregion
+
+        #region Options Row
+
+        batch_settings = get_config()['Settings'].get('Batch', {})
+
+        options_row = QHBoxLayout()
+        options_row.setSpacing(10)
+
+        options_row.addWidget(QLabel("Mode:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(BATCH_MODES)
+        self.mode_combo.setMinimumHeight(36)
+        self.mode_combo.setStyleSheet(CONTROL_STYLE)
+        self.mode_combo.currentTextChanged.connect(self.update_option_states)
+        options_row.addWidget(self.mode_combo)
+
+        options_row.addWidget(QLabel("Generate if rated:"))
+        self.min_rating_combo = QComboBox()
+        self.min_rating_combo.addItems(["All Ratings", "5+", "6+", "7+", "8+", "9+"])
+        self.min_rating_combo.setMinimumHeight(36)
+        self.min_rating_combo.setStyleSheet(CONTROL_STYLE)
+        self.min_rating_combo.setToolTip("Only generate documents for jobs whose match rating is at least this")
+        options_row.addWidget(self.min_rating_combo)
+
+        options_row.addWidget(QLabel("Parallel:"))
+        self.parallelism_spin = QSpinBox()
+        self.parallelism_spin.setRange(1, 10)
+        self.parallelism_spin.setValue(batch_settings.get('Parallelism', 3))
+        self.parallelism_spin.setMinimumHeight(36)
+        self.parallelism_spin.setStyleSheet(CONTROL_STYLE)
+        self.parallelism_spin.setToolTip("How many jobs are worked on at once")
+        self.parallelism_spin.valueChanged.connect(self.save_batch_settings)
+        options_row.addWidget(self.parallelism_spin)
+
+        self.save_submission_checkbox = QCheckBox("Save Submission (no documents)")
+        self.save_submission_checkbox.setStyleSheet("QCheckBox { font-size: 11pt; color: #333; }")
+        options_row.addWidget(self.save_submission_checkbox)
+
+        options_row.addStretch()
+
+        self.start_button = QPushButton("Start")
+        self.start_button.setMinimumHeight(40)
+        self.start_button.setStyleSheet(BUTTON_STYLE.format(background="#4CAF50", color="white", border="none", hover="#45a049"))
+        self.start_button.clicked.connect(self.on_start)
+        options_row.addWidget(self.start_button)
+
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setMinimumHeight(40)
+        self.stop_button.setEnabled(False)
+        self.stop_button.setToolTip("Let the jobs in progress finish and cancel the rest")
+        self.stop_button.setStyleSheet(BUTTON_STYLE.format(background="#c62828", color="white", border="none", hover="#b71c1c"))
+        self.stop_button.clicked.connect(self.on_stop)
+        options_row.addWidget(self.stop_button)
+
+        page_layout.addLayout(options_row)
+
+        #endregion
+
+        #region Queue Table
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setStyleSheet("""
+            QTableWidget {
+                font-size: 10pt;
+                border: 1px solid #e0e0e0;
+                border-radius: 8px;
+                background-color: white;
+                gridline-color: #f0f0f0;
+            }
+            QHeaderView::section {
+                background-color: #f5f5f5;
+                font-weight: bold;
+                padding: 6px;
+                border: none;
+                border-bottom: 1px solid #e0e0e0;
+            }
+        """)
+
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(COLUMNS.index("Job Title"), QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(COLUMNS.index("Details"), QHeaderView.ResizeMode.Stretch)
+
+        page_layout.addWidget(self.table)
+
+        #endregion
+
+        self.update_option_states()
+
+    #region Importing
+
+    def add_jobs(self, jobs):
+        """Add jobs to the end of the queue"""
+        if not jobs:
+            print("No job postings found to import")
+            return
+
+        for job in jobs:
+            self.jobs.append(job)
+            self.table.insertRow(self.table.rowCount())
+            self.update_job_row(len(self.jobs) - 1, job)
+
+        self.update_title()
+
+    def on_paste_jobs(self):
+        """Show a dialog to paste postings into the queue"""
+        from PySide6.QtWidgets import QDialog, QTextEdit
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Paste Jobs")
+        dialog.setMinimumSize(640, 480)
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: white;
+            }
+        """)
+
+        layout = QVBoxLayout(dialog)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+
+        hint = QLabel("Separate postings with a line of dashes (---). A posting can start with "
+                      "Company:, Title: and Link: lines; everything after them is the description.")
+        hint.setWordWrap(True)
+        hint.setStyleSheet("font-size: 10pt; color: #555;")
+        layout.addWidget(hint)
+
+        text_edit = QTextEdit()
+        text_edit.setAcceptRichText(False)
+        text_edit.setPlaceholderText("Company: Example Corp\nTitle: Software Engineer\nLink: https://...\n\n"
+                                     "Job description...\n---\nNext posting...")
+        layout.addWidget(text_edit)
+
+        add_button = QPushButton("Add to Queue")
+        add_button.setMinimumHeight(40)
+        add_button.setStyleSheet(BUTTON_STYLE.format(background="#4CAF50", color="white", border="none", hover="#45a049"))
+        add_button.clicked.connect(dialog.accept)
+        layout.addWidget(add_button)
+
+        if dialog.exec():
+            self.add_jobs(jobs_from_text(text_edit.toPlainText()))
+
+    def on_import_folder(self):
+        """Import every .txt posting in a chosen folder"""
+        from PySide6.QtWidgets import QFileDialog
+
+        folder = QFileDialog.getExistingDirectory(self, "Import Job Postings Folder")
+        if folder:
+            self.add_jobs(jobs_from_folder(folder))
+
+    def on_import_csv(self):
+        """Import the postings in a chosen CSV file"""
+        from PySide6.QtWidgets import QFileDialog, QMessageBox
+
+        csv_path, _ = QFileDialog.getOpenFileName(self, "Import Job Postings CSV", "", "CSV Files (*.csv)")
+        if not csv_path:
+            return
+
+        try:
+            self.add_jobs(jobs_from_csv(csv_path))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Import CSV", f"Could not import the CSV:\n{e}")
+
+    def on_clear_jobs(self):
+        """Remove every job from the queue"""
+        self.jobs = []
+        self.table.setRowCount(0)
+        self.update_title()
+
+    #endregion
+
+    #region Running
+
+    def on_start(self):
+        """Run the queued jobs (and any that failed or were cancelled) through the scheduler"""
+        self.running_positions = [row for row, job in enumerate(self.jobs) if job['Status'] in ("Queued", "Failed", "Cancelled")]
+        jobs = [self.jobs[row] for row in self.running_positions]
+        if not jobs:
+            return
+
+        for row, job in zip(self.running_positions, jobs):
+            job.update(Status="Queued", Error="", Attempts=0)
+            self.update_job_row(row, job)
+
+        # Reload templates and prompts, like a single generation does, and read the base resumes here
+        # rather than on the first job
+        get_templates()
+        get_resume_context()
+        process = tailoring_process(
+            get_resume_context,
+            mode=self.mode_combo.currentText(),
+            min_rating=parse_minimum(self.min_rating_combo.currentText()),
+            save_submission=self.save_submission_checkbox.isChecked()
+        )
+
+        batch_settings = get_config()['Settings'].get('Batch', {})
+        self.worker = BatchWorker(
+            jobs, process,
+            parallelism=self.parallelism_spin.value(),
+            requests_per_minute=batch_settings.get('Requests Per Minute', {}),
+            retries=batch_settings.get('Retries', 3)
+        )
+        self.worker.job_updated.connect(self.on_job_updated)
+        self.worker.finished.connect(self.on_batch_finished)
+        self.worker.error.connect(self.on_batch_error)
+        self.worker.start()
+
+        self.set_running(True)
+
+    def on_stop(self):
+        """Cancel the jobs that haven't started yet"""
+        if self.worker is not None:
+            self.worker.stop()
+            self.stop_button.setEnabled(False)
+            self.stop_button.setText("Stopping...")
+
+    def on_job_updated(self, position, job):
+        """Show a job's progress (`position` is its place in the running batch)"""
+        row = self.running_positions[position]
+        self.update_job_row(row, job)
+
+    def on_batch_finished(self, jobs):
+        """Handle every job in the batch being finished"""
+        counts = {}
+        for job in jobs:
+            counts[job['Status']] = counts.get(job['Status'], 0) + 1
+
+        print("Batch finished: " + ", ".join(f"{count} {status.lower()}" for status, count in counts.items()))
+        play_notification_sound()
+        self.set_running(False)
+
+    def on_batch_error(self, error_msg):
+        """Handle an error that stopped the whole batch"""
+        print(f"Error: {error_msg}")
+        self.set_running(False)
+
+    def set_running(self, running):
+        for button in (self.start_button, self.paste_button, self.folder_button, self.csv_button, self.clear_button):
+            button.setEnabled(not running)
+
+        self.stop_button.setEnabled(running)
+        self.stop_button.setText("Stop")
+        self.start_button.setText("Running..." if running else "Start")
+
+        if not running:
+            self.worker = None
+
+    #endregion
+
+    def update_job_row(self, row, job):
+        """Fill a table row from a job (or a copy of one sent by the worker)"""
+        rating = job['Rating'] or {}
+        values = [
+            job['Company Name'] or "—",
+            job['Job Title'] or job['Source'],
+            job['Status'],
+            f"{rating['Match Rating']}/10" if rating.get('Match Rating') is not None else "",
+            f"{rating['Job Quality']}/10" if rating.get('Job Quality') is not None else "",
+            str(job['Attempts']),
+            job['Error'] or job['File Name'],
+        ]
+
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            item.setToolTip(job['Error'] if column == COLUMNS.index("Details") and job['Error'] else value)
+
+            if column == COLUMNS.index("Status"):
+                item.setForeground(QColor(STATUS_COLORS.get(job['Status'], IN_PROGRESS_COLOR)))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+
+            self.table.setItem(row, column, item)
+
+    def update_title(self):
+        self.title_label.setText(f"Batch ({len(self.jobs)} Job{'' if len(self.jobs) == 1 else 's'})")
+
+    def update_option_states(self, *_):
+        # The rating threshold only matters when rating before generating
+        self.min_rating_combo.setEnabled(self.mode_combo.currentText() == "Rate then Generate")
+
+    def save_batch_settings(self):
+        """Save the parallelism to Config.json"""
+        config = get_config()
+        config['Settings'].setdefault('Batch', {})
+        config['Settings']['Batch']['Parallelism'] = self.parallelism_spin.value()
+        update_config(config)
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+# Filter engine behind the History and Archive filter bars. Everything a filter looks at is
+# prepared once when the items are loaded (dates parsed and sorted, ratings in arrays, search
+# text joined), so a keystroke is a few vectorized passes instead of a walk over every item.
+
+DATE_FILTER_DAYS = {
+    "Today": 0,
+    "Last 3 Days": 3,
+    "Last 7 Days": 7,
+    "Last 30 Days": 30,
+}
+
+
+def parse_minimum(text):
+    """Minimum value for a rating / quality filter ("All Ratings" -> 0, "7+" -> 7, "10" -> 10)"""
+    try:
+        return int(text.rstrip('+'))
+    except ValueError:
+        return 0
+
+def date_ordinal(date_created):
+    """Day number of an ISO 'Date Created' value (0 if it can't be parsed)"""
+    try:
+        return datetime.fromisoformat(date_created).date().toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+class HistoryFilterIndex:
+    """Precomputed filter data for a list of history items.
+
+    Items are the dicts built by the History and Archive pages ('file_name', 'position', 'company', 'tech_stack',
+    'match_rating', 'job_quality', 'date_created' and optionally 'favorite' / 'save_submission').
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.positions = {item['file_name']: position for position, item in enumerate(items)}
+
+        ordinals = np.array([date_ordinal(item['date_created']) for item in items], dtype=np.int64)
+
+        # Item positions sorted by date, so a date range is two binary searches
+        self.date_order = np.argsort(ordinals, kind='stable')
+        self.sorted_dates = ordinals[self.date_order]
+
+        self.match_ratings = np.array([item['match_rating'] for item in items], dtype=np.float64)
+        self.job_qualities = np.array([item['job_quality'] for item in items], dtype=np.float64)
+        self.favorites = np.array([bool(item.get('favorite', False)) for item in items], dtype=bool)
+        self.saved = np.array([bool(item.get('save_submission', False)) for item in items], dtype=bool)
+
+        # One lowercase string per item; the newlines keep a query from matching across fields
+        self.search_texts = np.array(
+            [f"{item['position']}\n{item['company']}\n{item['tech_stack']}" for item in items], dtype=str
+        )
+
+        # Visibility last applied to the items (None until the first apply)
+        self.visible = None
+
+        # Last text search: items whose text was checked against `text_query`, and which of them matched
+        self.text_query = None
+        self.text_checked = np.zeros(len(items), dtype=bool)
+        self.text_matches = np.zeros(len(items), dtype=bool)
+
+    def set_flag(self, file_name, key, value):
+        """Update an item's 'favorite' or 'save_submission' flag after it's toggled, so the filters see it"""
+        position = self.positions.get(file_name)
+        if position is None:
+            return
+
+        self.items[position][key] = value
+        flags = {'favorite': self.favorites, 'save_submission': self.saved}[key]
+        flags[position] = bool(value)
+
+    def date_range_mask(self, first_ordinal, last_ordinal=None):
+        """Mask of items dated between the two day numbers (inclusive, open ended if `last_ordinal` is None)"""
+        start = np.searchsorted(self.sorted_dates, first_ordinal, side='left')
+        end = len(self.sorted_dates) if last_ordinal is None else np.searchsorted(self.sorted_dates, last_ordinal, side='right')
+
+        mask = np.zeros(len(self.items), dtype=bool)
+        mask[self.date_order[start:end]] = True
+
+        return mask
+
+    def match(self, query="", min_rating=0, min_quality=0, date_filter="Any day", favorites_only=False, saved_only=False, today=None, refine=True, full_text=None):
+        """
+        Work out which items pass the filters
+
+        Args:
+            query: Lowercase text to look for in the position, company or tech stack
+            min_rating: Minimum match rating
+            min_quality: Minimum job quality
+            date_filter: Date filter option ("Any day", "Today", "Last 3 Days", ...)
+            favorites_only: Only keep favorites
+            saved_only: Only keep saved submissions
+            today: Date to filter relative to (default: today)
+            refine: When `query` extends the previous query, skip the items the previous query already ruled out
+            full_text: Function that takes `query` and returns the file names it matches in the full-text
+                       index, which pass the text filter too (default: only position, company and tech stack)
+
+        Returns:
+            numpy bool array, True for the items that pass
+        """
+        mask = (self.match_ratings >= min_rating) & (self.job_qualities >= min_quality)
+
+        if favorites_only:
+            mask &= self.favorites
+
+        if saved_only:
+            mask &= self.saved
+
+        if date_filter in DATE_FILTER_DAYS:
+            today = today or datetime.now().date()
+            first = (today - timedelta(days=DATE_FILTER_DAYS[date_filter])).toordinal()
+
+            # "Today" is that one day, "Last X Days" is everything from the cutoff onwards
+            mask &= self.date_range_mask(first, today.toordinal() if date_filter == "Today" else None)
+
+        if query:
+            mask &= self.text_mask(query, mask, refine, full_text)
+        else:
+            self.text_query = None
+
+        return mask
+
+    def text_mask(self, query, candidates, refine=True, full_text=None):
+        """
+        Mask of items whose search text contains `query`, only checking the items in `candidates`
+
+        Text is the slowest check, so it only runs on the items the other filters kept. When `query`
+        continues the previous query (typing more at the end), anything the previous query ruled out
+        can't match either and isn't checked again.
+        """
+        checked = np.zeros(len(self.items), dtype=bool)
+        ruled_out = np.zeros(len(self.items), dtype=bool)
+
+        if refine and self.text_query is not None and query.startswith(self.text_query):
+            ruled_out = self.text_checked & ~self.text_matches
+            checked = ruled_out.copy()
+
+        to_check = np.flatnonzero(candidates & ~ruled_out)
+        matches = np.zeros(len(self.items), dtype=bool)
+        matches[to_check] = np.char.find(self.search_texts[to_check], query) >= 0
+
+        # Anything the full-text index found (description, responsibilities, resume text, ...)
+        if full_text is not None and len(to_check):
+            found = [self.positions[name] for name in full_text(query) if name in self.positions]
+            hits = np.zeros(len(self.items), dtype=bool)
+            hits[found] = True
+            matches[to_check] |= hits[to_check]
+
+        checked[to_check] = True
+
+        self.text_query = query
+        self.text_checked = checked
+        self.text_matches = matches
+
+        return matches
+
+    def count_on(self, mask, day):
+        """How many items in `mask` are dated `day`"""
+        return int(np.count_nonzero(mask & self.date_range_mask(day.toordinal(), day.toordinal())))
+
+    def apply(self, mask, set_visible):
+        """
+        Show the items in `mask` and hide the rest, only touching items whose visibility changed
+
+        Args:
+            mask: Result of match()
+            set_visible: Function that takes an item and whether it should be visible
+
+        Returns:
+            int: Number of items whose visibility was changed
+        """
+        if self.visible is None:
+            changed = np.arange(len(self.items))
+        else:
+            changed = np.flatnonzero(mask != self.visible)
+
+        for position in changed:
+            set_visible(self.items[position], bool(mask[position]))
+
+        self.visible = mask.copy()
+
+        return len(changed)
@@ -6,13 +6,21 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBu
 class HistoryItem(QWidget):
     """A single expandable job-application entry on the History page."""
 
-    def __init__(self, data, page):
+    # Delete the details subtree when an item collapses, rather than just hiding it
+    free_details_on_collapse = False
+
+    def __init__(self, data, page, lazy_details=True):
         super().__init__()
         self.data = data
         self.page = page
         self.is_expanded = False
+        self.details_widget = None
         self._build_ui()
 
+        if not lazy_details:
+            self._build_details()
+            self.details_widget.setVisible(False)
+
     def _build_ui(self):
         data = self.data
         job_data = data['Job']
@@ -26,7 +34,6 @@ class HistoryItem(QWidget):
         match_rating = float(job_data.get('Match Rating', 0))
         job_quality = float(job_data.get('Job Quality', 5))
         save_submission = job_data.get('Save Submission', False)
-        application_link = job_data.get('Application Link', '')
 
         current_date = datetime.now()
 
@@ -46,6 +53,7 @@ class HistoryItem(QWidget):
         item_layout = QVBoxLayout(self)
         item_layout.setSpacing(12)
         item_layout.setContentsMargins(20, 16, 20, 16)
+        self.item_layout = item_layout
 
         # Header with position, company, salary, match rating, and date
         header_layout = QHBoxLayout()
@@ -211,6 +219,7 @@ class HistoryItem(QWidget):
         save_submission_badge.setToolTip("This is a saved submission (not applying)")
         save_submission_badge.setVisible(save_submission)
         header_layout.addWidget(save_submission_badge)
+        self.save_submission_badge = save_submission_badge
 
         # Archive button with file-box icon
         archive_btn = QPushButton("📦")
@@ -269,9 +278,27 @@ class HistoryItem(QWidget):
 
         #endregion
 
+        # Add click event to toggle expansion
+        def toggle_expand(event):
+            # Collapse all other items first
+            self.page.collapse_all_history_items(except_widget=self)
+
+            # Toggle this item
+            self.set_expanded(not self.is_expanded)
+            self.page.on_history_item_toggled(self)
+
+        self.mousePressEvent = toggle_expand
+
+    def _build_details(self):
         #region Expandable details
 
-        # Expandable details section (initially hidden)
+        # Expandable details section, built the first time the item is expanded
+
+        data = self.data
+        job_data = data['Job']
+        application_link = job_data.get('Application Link', '')
+        save_submission_badge = self.save_submission_badge
+        item_layout = self.item_layout
 
         description = job_data['Description']
         responsibilities = "\n- ".join(job_data['Responsibilities'])
@@ -281,7 +308,6 @@ class HistoryItem(QWidget):
         match_rating_reasoning = job_data.get("Match Rating Description", "NA")
 
         details_widget = QWidget()
-        details_widget.setVisible(False)
         details_layout = QVBoxLayout(details_widget)
         details_layout.setSpacing(10)
         details_layout.setContentsMargins(0, 10, 0, 0)
@@ -362,10 +388,7 @@ class HistoryItem(QWidget):
             update_favorite_style(data['Meta']['Favorite'])
 
             # Update the history item data for filtering
-            for item_data in self.page.history_items:
-                if item_data['widget'] == self:
-                    item_data['favorite'] = data['Meta']['Favorite']
-                    break
+            self.page.set_history_flag(data, 'favorite', data['Meta']['Favorite'])
 
             print(f"{'Favorited' if data['Meta']['Favorite'] else 'Unfavorited'}: {data['Job']['Position Title']} at {data['Job']['Company Name']}")
 
@@ -397,6 +420,9 @@ class HistoryItem(QWidget):
             # Update badge visibility in header
             save_submission_badge.setVisible(data['Job']['Save Submission'])
 
+            # Update the history item data for filtering
+            self.page.set_history_flag(data, 'save_submission', data['Job']['Save Submission'])
+
             print(f"{'Save Submission enabled' if data['Job']['Save Submission'] else 'Save Submission disabled'}: {data['Job']['Position Title']} at {data['Job']['Company Name']}")
 
         save_submission_btn.mousePressEvent = on_save_submission_click
@@ -445,18 +471,25 @@ class HistoryItem(QWidget):
 
         #endregion
 
-        # Store reference to details widget for toggling
+        #endregion
+
         self.details_widget = details_widget
 
-        # Add click event to toggle expansion
-        def toggle_expand(event):
-            # Collapse all other items first
-            self.page.collapse_all_history_items(except_widget=self)
+    def set_expanded(self, expanded):
+        """Show or hide the details section, building it the first time it's shown"""
+        self.is_expanded = expanded
 
-            # Toggle this item
-            self.is_expanded = not self.is_expanded
-            details_widget.setVisible(self.is_expanded)
+        if expanded and self.details_widget is None:
+            self._build_details()
 
-        self.mousePressEvent = toggle_expand
+        if self.details_widget is None:
+            return
 
-        #endregion
+        if not expanded and self.free_details_on_collapse:
+            # Give the details subtree back instead of keeping it hidden
+            self.item_layout.removeWidget(self.details_widget)
+            self.details_widget.deleteLater()
+            self.details_widget = None
+            return
+
+        self.details_widget.setVisible(expanded)
@@ -0,0 +1,285 @@
+from datetime import datetime
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+
+# Virtualized History list: one painted row per application instead of a widget tree per application.
+# Only the rows in view are painted, and the full HistoryItem (with its details) is created on demand
+# for the single expanded row.
+
+DATA_ROLE = Qt.ItemDataRole.UserRole + 1
+
+ITEM_SPACING = 15
+CARD_PADDING_X = 20
+CARD_PADDING_Y = 16
+HEADER_HEIGHT = 36
+TAGS_HEIGHT = 30
+ROW_GAP = 12
+BADGE_GAP = 16
+ARCHIVE_BUTTON_SIZE = 36
+
+
+def rating_colors(value):
+    """(text color, background color) for a match rating or job quality badge"""
+    if value >= 8:
+        return "#2e7d32", "#e8f5e9"
+    elif value >= 5:
+        return "#ef6c00", "#fff3e0"
+    else:
+        return "#c62828", "#ffebee"
+
+def date_range_colors(start_date, end_date):
+    """(text color, background color) for the applied - expected response date badge, by how much time has passed"""
+    try:
+        start_date_obj = datetime.strptime(start_date, "%m/%d/%y")
+        end_date_obj = datetime.strptime(end_date, "%m/%d/%y")
+    except (TypeError, ValueError):
+        return "#757575", "#f5f5f5"
+
+    total_duration = (end_date_obj - start_date_obj).total_seconds()
+    elapsed_time = (datetime.now() - start_date_obj).total_seconds()
+    progress_ratio = elapsed_time / total_duration if total_duration > 0 else 0
+
+    if progress_ratio < 0:
+        return "#757575", "#f5f5f5"
+    elif progress_ratio < 1/3:
+        return "white", "#4CAF50"
+    elif progress_ratio < 2/3:
+        return "white", "#FF9800"
+    elif progress_ratio <= 1:
+        return "white", "#f44336"
+    else:
+        return "white", "#c62828"
+
+
+class HistoryListModel(QAbstractListModel):
+    """List model over history records (dicts with 'file_name', 'modified' and 'data')."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.records):
+            return None
+
+        data = self.records[index.row()]['data']
+
+        if role == DATA_ROLE:
+            return data
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{data['Job']['Position Title']} at {data['Job']['Company Name']}"
+
+        return None
+
+    def set_records(self, records):
+        """Replace the records, only signalling rows that changed when the list itself is the same.
+
+        Returns:
+            list: Rows that were updated in place (empty if the model was reset)
+        """
+        if [record['file_name'] for record in records] != [record['file_name'] for record in self.records]:
+            self.beginResetModel()
+            self.records = list(records)
+            self.endResetModel()
+            return []
+
+        updated = [row for row, record in enumerate(records) if record['modified'] != self.records[row]['modified']]
+        self.records = list(records)
+
+        for row in updated:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+        return updated
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    """Paints a collapsed history row to look like a collapsed HistoryItem."""
+
+    def __init__(self, view, on_archive_click, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.on_archive_click = on_archive_click
+
+    def _fonts(self):
+        base = self.view.font()
+
+        title_font = QFont(base)
+        title_font.setPointSize(15)
+        title_font.setBold(True)
+
+        badge_font = QFont(base)
+        badge_font.setPointSize(10)
+        badge_font.setWeight(QFont.Weight.DemiBold)
+
+        small_font = QFont(base)
+        small_font.setPointSize(9)
+        small_font.setWeight(QFont.Weight.DemiBold)
+
+        icon_font = QFont(base)
+        icon_font.setPointSize(16)
+
+        return title_font, badge_font, small_font, icon_font
+
+    def card_rect(self, option_rect):
+        return option_rect.adjusted(0, 0, -20, -ITEM_SPACING)
+
+    def archive_button_rect(self, option_rect):
+        card = self.card_rect(option_rect)
+        top = card.top() + CARD_PADDING_Y + (HEADER_HEIGHT - ARCHIVE_BUTTON_SIZE) // 2
+        return QRect(card.right() - CARD_PADDING_X - ARCHIVE_BUTTON_SIZE, top, ARCHIVE_BUTTON_SIZE, ARCHIVE_BUTTON_SIZE)
+
+    def sizeHint(self, option, index):
+        width = self.view.viewport().width()
+        widget = self.view.indexWidget(index)
+
+        if widget is not None:
+            layout = widget.layout()
+            if layout is not None and layout.hasHeightForWidth():
+                height = layout.totalHeightForWidth(width - 20)
+            else:
+                height = widget.sizeHint().height()
+            return QSize(width, height + ITEM_SPACING)
+
+        data = index.data(DATA_ROLE)
+        height = CARD_PADDING_Y * 2 + HEADER_HEIGHT
+        if data and data['Job'].get('Tech Stack'):
+            height += ROW_GAP + TAGS_HEIGHT
+
+        return QSize(width, height + ITEM_SPACING)
+
+    def paint(self, painter, option, index):
+        # The expanded row is covered by its HistoryItem widget
+        if self.view.indexWidget(index) is not None:
+            return
+
+        data = index.data(DATA_ROLE)
+        if data is None:
+            return
+
+        job_data = data['Job']
+        title_font, badge_font, small_font, icon_font = self._fonts()
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        card = self.card_rect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#fafafa" if hovered else "white"))
+        painter.drawRoundedRect(card, 12, 12)
+
+        header = QRect(card.left() + CARD_PADDING_X, card.top() + CARD_PADDING_Y,
+                       card.width() - CARD_PADDING_X * 2, HEADER_HEIGHT)
+
+        # Archive button, then the badges right to left
+        archive_rect = self.archive_button_rect(option.rect)
+        painter.setPen(QPen(QColor("#e0e0e0"), 2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(archive_rect.adjusted(1, 1, -1, -1), 8, 8)
+        painter.setFont(icon_font)
+        painter.setPen(QColor("#1a1a1a"))
+        painter.drawText(archive_rect, Qt.AlignmentFlag.AlignCenter, "📦")
+
+        right = archive_rect.left() - BADGE_GAP
+
+        badges = []
+        if job_data.get('Salary'):
+            badges.append((f"💰 {job_data['Salary']}", badge_font, "#2e7d32", "#e8f5e9", None))
+
+        job_quality = float(job_data.get('Job Quality', 5))
+        badges.append((f"💎 {job_quality}/10", badge_font, *rating_colors(job_quality), None))
+
+        match_rating = float(job_data.get('Match Rating', 0))
+        badges.append((f"⭐ {match_rating}/10", badge_font, *rating_colors(match_rating), None))
+
+        start_date = job_data.get('Date Applied', "N/A")
+        end_date = job_data.get('Expected Response Date', "N/A")
+        badges.append((f"{start_date} - {end_date}", small_font, *date_range_colors(start_date, end_date), None))
+
+        if job_data.get('Save Submission', False):
+            badges.append(("📋 Saved", small_font, "#ff6f00", "#fff3e0", "#ff9800"))
+
+        for text, font, color, background, border in reversed(badges):
+            metrics = QFontMetrics(font)
+            badge_width = metrics.horizontalAdvance(text) + 20
+            badge_height = metrics.height() + 8
+            badge_rect = QRect(right - badge_width, header.center().y() - badge_height // 2, badge_width, badge_height)
+
+            painter.setPen(QPen(QColor(border), 2) if border else Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(background))
+            painter.drawRoundedRect(badge_rect, 6, 6)
+            painter.setFont(font)
+            painter.setPen(QColor(color))
+            painter.drawText(badge_rect, Qt.AlignmentFlag.AlignCenter, text)
+
+            right = badge_rect.left() - BADGE_GAP
+
+        # Position and company, elided to the space left by the badges
+        title_rect = QRect(header.left(), header.top(), max(0, right - header.left()), HEADER_HEIGHT)
+        painter.setFont(title_font)
+        painter.setPen(QColor("#1a1a1a"))
+        title = QFontMetrics(title_font).elidedText(index.data(), Qt.TextElideMode.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, title)
+
+        # Tech stack tags
+        tags = job_data.get('Tech Stack') or []
+        left = header.left()
+        tags_top = header.bottom() + 1 + ROW_GAP
+        metrics = QFontMetrics(small_font)
+        painter.setFont(small_font)
+
+        for tag in tags:
+            tag_width = metrics.horizontalAdvance(tag) + 28
+            if left + tag_width > header.right():
+                break
+
+            tag_rect = QRect(left, tags_top, tag_width, TAGS_HEIGHT - 2)
+            painter.setPen(QPen(QColor("#bbdefb"), 1))
+            painter.setBrush(QColor("#e3f2fd"))
+            painter.drawRoundedRect(tag_rect, 14, 14)
+            painter.setPen(QColor("#1565c0"))
+            painter.drawText(tag_rect, Qt.AlignmentFlag.AlignCenter, tag)
+
+            left += tag_width + 6
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        # The painted archive button acts like the real one
+        if event.type() == QEvent.Type.MouseButtonPress and self.archive_button_rect(option.rect).contains(event.position().toPoint()):
+            self.on_archive_click(index.data(DATA_ROLE))
+            return True
+
+        return super().editorEvent(event, model, option, index)
+
+
+def HistoryListView(on_archive_click):
+    """
+    Create a virtualized list view for history records
+
+    Args:
+        on_archive_click: Callback that takes a record's data when its archive button is clicked
+
+    Returns:
+        tuple: (view, model, delegate)
+    """
+    view = QListView()
+    view.setStyleSheet("QListView { border: none; background: transparent; }")
+    view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+    view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+    view.setMouseTracking(True)
+    view.setResizeMode(QListView.ResizeMode.Adjust)
+
+    model = HistoryListModel(view)
+    delegate = HistoryItemDelegate(view, on_archive_click, view)
+
+    view.setModel(model)
+    view.setItemDelegate(delegate)
+
+    return view, model, delegate
@@ -0,0 +1,88 @@
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+
+class HistoryWatcher(QObject):
+    """Watches the history and archive folders and reports when files are added, removed or renamed."""
+    changed = Signal(bool)  # Emits whether the archive folder (True) or the history folder (False) changed
+
+    def __init__(self, history_folder, archive_folder, delay_ms=250, parent=None):
+        super().__init__(parent)
+        self.folders = {str(history_folder): False, str(archive_folder): True}
+        self.pending = set()
+
+        # A single save or move produces a burst of events, so wait for it to settle
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self._emit_pending)
+
+        self.watcher = QFileSystemWatcher(list(self.folders), self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+
+    def _on_directory_changed(self, path):
+        if path in self.folders:
+            self.pending.add(self.folders[path])
+            self.timer.start()
+
+    def _emit_pending(self):
+        pending, self.pending = self.pending, set()
+        for archived in sorted(pending):
+            self.changed.emit(archived)
+
+
+def sync_history_widgets(layout, widgets, records, create_widget):
+    """Bring a layout of history widgets in line with `records` by only applying the differences.
+
+    Args:
+        layout: QBoxLayout holding the widgets (anything after them, like a stretch, is left alone)
+        widgets: Dictionary of file name -> (modified, widget) currently in the layout
+        records: Records from get_history_records, in display order
+        create_widget: Function that takes a record's data and returns its widget (or None to skip it)
+
+    Returns:
+        tuple: (new file name -> (modified, widget) dictionary, number of widgets created, number removed)
+    """
+    current = {record['file_name'] for record in records}
+    removed = 0
+    created = 0
+
+    # Removed records
+    for file_name in [name for name in widgets if name not in current]:
+        _, widget = widgets.pop(file_name)
+        layout.removeWidget(widget)
+        widget.deleteLater()
+        removed += 1
+
+    # Added and updated records
+    for record in records:
+        existing = widgets.get(record['file_name'])
+        if existing is not None and existing[0] == record['modified']:
+            continue
+
+        if existing is not None:
+            layout.removeWidget(existing[1])
+            existing[1].deleteLater()
+            removed += 1
+
+        widgets.pop(record['file_name'], None)
+
+        widget = create_widget(record['data'])
+        if widget is None:
+            continue
+
+        widgets[record['file_name']] = (record['modified'], widget)
+        created += 1
+
+    # Put everything in display order, only moving widgets that are out of place
+    index = 0
+    for record in records:
+        if record['file_name'] not in widgets:
+            continue
+
+        widget = widgets[record['file_name']][1]
+        if layout.indexOf(widget) != index:
+            layout.removeWidget(widget)
+            layout.insertWidget(index, widget)
+        index += 1
+
+    return widgets, created, removed
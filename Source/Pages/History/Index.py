@@ -1,10 +1,10 @@
 import sys
-from datetime import datetime
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea
-from Utility import (paths, expand_list_to_keys, write_to_docx, clear_temp,
-                      save_document_temp, copy_temp_to_results, convert_temp_to_pdf,
-                      resume_template, cover_letter_template)
+from Utility import paths, expand_list_to_keys
 from Pages.History.HistoryItem import HistoryItem
+from Pages.History.FilterIndex import HistoryFilterIndex
+from Workers import DocumentWorker
+from Utility import get_config
 
 
 class FilesPage(QWidget):
@@ -13,6 +13,7 @@ class FilesPage(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.document_workers = []
         self._build_ui()
 
     def _build_ui(self):
@@ -21,17 +22,8 @@ class FilesPage(QWidget):
         page_layout.setSpacing(0)
         page_layout.setContentsMargins(20, 20, 20, 0)
 
-        # Title
-        from Utility import get_json_datas
-
-        datas = get_json_datas()
-        count = len(datas)
-
-        # Filter datas where Date Created is today
-        today = datetime.now().date()
-        datas_today = [data for data in datas if datetime.fromisoformat(data['Meta']['Date Created']).date() == today]
-
-        self.history_title_label = QLabel(f"History ({count} Results) ({len(datas_today)} Today)")
+        # Title (counts are filled in by show_files_page, so building the page doesn't read any history files)
+        self.history_title_label = QLabel("History (0 Results) (0 Today)")
         self.history_title_label.setStyleSheet("font-size: 18pt; font-weight: bold;")
         page_layout.addWidget(self.history_title_label)
 
@@ -48,6 +40,31 @@ class FilesPage(QWidget):
         self.date_filter_combo = filters['date_filter']
         self.favorite_filter_checkbox = filters['favorites']
         self.show_saved_checkbox = filters['saved']
+        self.cancel_search = filters['cancel']
+        self.incremental_search = filters['incremental']
+
+        # History items currently shown, by file name -> (file modified time, widget)
+        self.history_widgets_by_name = {}
+        self.history_items = []
+        self.history_widgets = []
+        self.filter_index = HistoryFilterIndex(self.history_items)
+
+        # Virtualized list (painted rows) or one HistoryItem widget per application
+        settings = get_config()['Settings']
+        self.virtualized = settings.get('Virtualized History List', True)
+        HistoryItem.free_details_on_collapse = settings.get('Free Collapsed History Details', False)
+
+        if self.virtualized:
+            from Pages.History.HistoryList import HistoryListView
+
+            self.history_view, self.history_model, self.history_delegate = HistoryListView(self.archive_history_item)
+            self.history_view.clicked.connect(self.toggle_history_row)
+            page_layout.addWidget(self.history_view)
+
+            # Row (and file name) of the row currently expanded into a HistoryItem
+            self.expanded_row = None
+            self.expanded_file_name = None
+            return
 
         # Scrollable area for history items
         scroll_area = QScrollArea()
@@ -60,45 +77,84 @@ class FilesPage(QWidget):
         self.files_layout.setSpacing(15)
         self.files_layout.setContentsMargins(0, 0, 20, 20)
 
+        # Add stretch to push content to top (history items are inserted above it)
+        self.files_layout.addStretch()
+
         scroll_area.setWidget(scroll_content)
         page_layout.addWidget(scroll_area)
 
     def show_files_page(self):
         """Refresh and show the files page"""
-        from Utility import get_json_datas
+        # Navigating here checks the folder for files that were edited by hand
+        self.refresh_files_page(sync=True)
 
-        # Clear existing history items (keep the title and search bar)
-        while self.files_layout.count() > 0:
-            item = self.files_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        # Clear search bar and reset filters
+        self.search_bar.clear()
+        self.min_rating_combo.setCurrentIndex(0)
+        self.min_quality_combo.setCurrentIndex(0)
+        self.date_filter_combo.setCurrentIndex(0)
+        self.favorite_filter_checkbox.setChecked(False)
+        self.show_saved_checkbox.setChecked(False)
+
+        # Apply the cleared search now rather than after the typing delay
+        self.cancel_search()
+        self.filter_history_items()
+
+        # Switch to files page
+        self.stacked_widget.setCurrentWidget(self)
+
+    def refresh_files_page(self, sync=False):
+        """Update the history items in place, only rebuilding the ones whose files changed.
+
+        Args:
+            sync: Also check the folder for files added, edited or removed outside the app
+        """
+        from Utility import get_history_records
+        from Pages.History.HistorySync import sync_history_widgets
 
-        # Load fresh data
-        datas = get_json_datas()
-        datas = sorted(datas, key=lambda data: data['Meta']['Date Created'], reverse=True)
+        records = get_history_records(archived=False, sync=sync)
 
-        today = datetime.now().date()
-        datas_today = [data for data in datas if datetime.fromisoformat(data['Meta']['Date Created']).date() == today]
+        if self.virtualized:
+            # The expanded row's HistoryItem goes away if its record changed or the rows shift
+            expanded = next((record for record in records if record['file_name'] == self.expanded_file_name), None)
+            if self.expanded_row is not None:
+                old_record = self.history_model.records[self.expanded_row]
+                if expanded is None or expanded['modified'] != old_record['modified'] or \
+                        [r['file_name'] for r in records] != [r['file_name'] for r in self.history_model.records]:
+                    self.collapse_all_history_items()
 
-        # Update title with current count
-        self.history_title_label.setText(f"History ({len(datas)} Results) ({len(datas_today)} Today)")
+            self.history_model.set_records(records)
+        else:
+            self.history_widgets_by_name, created, removed = sync_history_widgets(
+                self.files_layout, self.history_widgets_by_name, records, lambda data: HistoryItem(data, self)
+            )
+
+            if created or removed:
+                print(f"History refreshed: {created} item(s) built, {removed} removed, {len(records) - created} reused")
+
+            records = [record for record in records if record['file_name'] in self.history_widgets_by_name]
 
         # Store history items with their data for filtering
         self.history_items = []
         self.history_widgets = []  # Track all widget instances for expansion management
 
-        # Add history items
-        for data in datas:
+        for row, record in enumerate(records):
+            data = record['data']
             job_data = data['Job']
-            history_item = HistoryItem(data, self)
-            self.files_layout.addWidget(history_item)
+            history_item = None
+
+            if not self.virtualized:
+                history_item = self.history_widgets_by_name[record['file_name']][1]
 
-            # Store widget reference
-            self.history_widgets.append(history_item)
+                # Store widget reference
+                self.history_widgets.append(history_item)
 
             # Store item with its searchable data
             self.history_items.append({
                 'widget': history_item,
+                'row': row,
+                'file_name': record['file_name'],
+                'data': data,
                 'position': job_data['Position Title'].lower(),
                 'company': job_data['Company Name'].lower(),
                 'tech_stack': ' '.join(job_data['Tech Stack']).lower(),
@@ -109,127 +165,98 @@ class FilesPage(QWidget):
                 'save_submission': job_data.get('Save Submission', False)
             })
 
-        # Add stretch to push content to top
-        self.files_layout.addStretch()
+        # Parse dates, ratings and search text once for every filter run until the next refresh
+        self.filter_index = HistoryFilterIndex(self.history_items)
 
-        # Clear search bar and reset filters
-        self.search_bar.clear()
-        self.min_rating_combo.setCurrentIndex(0)
-        self.min_quality_combo.setCurrentIndex(0)
-        self.date_filter_combo.setCurrentIndex(0)
-        self.favorite_filter_checkbox.setChecked(False)
-        self.show_saved_checkbox.setChecked(False)
-
-        # Switch to files page
-        self.stacked_widget.setCurrentWidget(self)
+        # Re-apply the current filters to the updated items (this also updates the title counts)
+        self.filter_history_items()
 
     #region Filter History Item
 
+    def set_history_flag(self, data, key, value):
+        """Record a toggled 'favorite' or 'save_submission' flag of the item showing `data` for filtering"""
+        for item_data in self.history_items:
+            if item_data['data'] is data:
+                self.filter_index.set_flag(item_data['file_name'], key, value)
+                break
+
     def filter_history_items(self):
         """Filter history items based on search query, minimum rating, minimum job quality, date range, and favorites"""
-        from datetime import datetime, timedelta
+        from datetime import datetime
+        from Utility import search_history
+        from Pages.History.FilterIndex import parse_minimum
+
+        mask = self.filter_index.match(
+            query=self.search_bar.text().lower(),
+            min_rating=parse_minimum(self.min_rating_combo.currentText()),
+            min_quality=parse_minimum(self.min_quality_combo.currentText()),
+            date_filter=self.date_filter_combo.currentText(),
+            favorites_only=self.favorite_filter_checkbox.isChecked(),
+            saved_only=self.show_saved_checkbox.isChecked(),
+            refine=self.incremental_search,
+            full_text=lambda query: search_history(query, archived=False, ranked=False)
+        )
+
+        # Only show / hide the items whose visibility changed
+        self.filter_index.apply(mask, self.set_history_item_visible)
 
-        query = self.search_bar.text().lower()
+        # Update title label with filtered counts
+        visible_count = int(mask.sum())
+        visible_today_count = self.filter_index.count_on(mask, datetime.now().date())
+        self.history_title_label.setText(f"History ({visible_count} Results) ({visible_today_count} Today)")
 
-        # Get minimum rating filter
-        rating_text = self.min_rating_combo.currentText()
-        if rating_text == "All Ratings":
-            min_rating = 0
-        else:
-            # Extract number from "X+" format
-            min_rating = int(rating_text.rstrip('+'))
+    #endregion
 
-        # Get minimum job quality filter
-        quality_text = self.min_quality_combo.currentText()
-        if quality_text == "All Quality":
-            min_quality = 0
+    def set_history_item_visible(self, item_data, is_visible):
+        if self.virtualized:
+            self.history_view.setRowHidden(item_data['row'], not is_visible)
         else:
-            # Extract number from "X+" format
-            min_quality = int(quality_text.rstrip('+'))
-
-        # Get date filter
-        date_filter_text = self.date_filter_combo.currentText()
-        if date_filter_text == "Any day":
-            date_cutoff = None
-        elif date_filter_text == "Today":
-            date_cutoff = datetime.now().date()
-        elif date_filter_text == "Last 3 Days":
-            date_cutoff = (datetime.now() - timedelta(days=3)).date()
-        elif date_filter_text == "Last 7 Days":
-            date_cutoff = (datetime.now() - timedelta(days=7)).date()
-        elif date_filter_text == "Last 30 Days":
-            date_cutoff = (datetime.now() - timedelta(days=30)).date()
-
-        # Get favorite filter
-        favorites_only = self.favorite_filter_checkbox.isChecked()
-
-        # Get show saved filter
-        show_saved_only = self.show_saved_checkbox.isChecked()
-
-        # Count visible items
-        visible_count = 0
-        visible_today_count = 0
-        today = datetime.now().date()
-
-        for item_data in self.history_items:
-            # Check if query matches position, company, or tech stack
-            text_match = (query in item_data['position'] or
-                         query in item_data['company'] or
-                         query in item_data['tech_stack'])
-
-            # Check if rating meets minimum
-            rating_match = item_data['match_rating'] >= min_rating
-
-            # Check if job quality meets minimum
-            quality_match = item_data['job_quality'] >= min_quality
-
-            # Check if date matches filter
-            if date_cutoff is None:
-                date_match = True  # "Any day" - show all
-            else:
-                item_date = datetime.fromisoformat(item_data['date_created']).date()
-                if date_filter_text == "Today":
-                    date_match = item_date == date_cutoff
-                else:
-                    # "Last X Days" - show items from cutoff date onwards
-                    date_match = item_date >= date_cutoff
-
-            # Check if favorite filter matches
-            if favorites_only:
-                favorite_match = item_data['favorite']
-            else:
-                favorite_match = True  # Show all if not filtering by favorites
-
-            # Check if save submission filter matches
-            if show_saved_only:
-                saved_match = item_data['save_submission']
-            else:
-                saved_match = True  # Show all if not filtering by saved submissions
-
-            # Show item only if all conditions are met
-            is_visible = text_match and rating_match and quality_match and date_match and favorite_match and saved_match
             item_data['widget'].setVisible(is_visible)
 
-            # Update counts
-            if is_visible:
-                visible_count += 1
-                # Check if item was created today
-                item_date = datetime.fromisoformat(item_data['date_created']).date()
-                if item_date == today:
-                    visible_today_count += 1
+    def collapse_all_history_items(self, except_widget=None):
+        """Collapse all history items except the specified one"""
+        if self.virtualized:
+            if self.expanded_row is None:
+                return
 
-        # Update title label with filtered counts
-        self.history_title_label.setText(f"History ({visible_count} Results) ({visible_today_count} Today)")
+            index = self.history_model.index(self.expanded_row)
+            if self.history_view.indexWidget(index) is except_widget:
+                return
 
-    #endregion
+            # Back to a painted row (the view deletes the HistoryItem)
+            self.expanded_row = None
+            self.expanded_file_name = None
+            self.history_view.setIndexWidget(index, None)
+            self.history_delegate.sizeHintChanged.emit(index)
+            return
 
-    def collapse_all_history_items(self, except_widget=None):
-        """Collapse all history items except the specified one"""
         for widget in self.history_widgets:
-            if widget != except_widget and hasattr(widget, 'is_expanded'):
-                widget.is_expanded = False
-                if hasattr(widget, 'details_widget'):
-                    widget.details_widget.setVisible(False)
+            if widget != except_widget and widget.is_expanded:
+                widget.set_expanded(False)
+
+    def toggle_history_row(self, index):
+        """Expand a painted row into a full HistoryItem, or collapse it if it's already expanded"""
+        row = index.row()
+        was_expanded = row == self.expanded_row
+
+        self.collapse_all_history_items()
+
+        if was_expanded:
+            return
+
+        record = self.history_model.records[row]
+        history_item = HistoryItem(record['data'], self)
+        history_item.set_expanded(True)
+
+        self.expanded_row = row
+        self.expanded_file_name = record['file_name']
+        self.history_view.setIndexWidget(index, history_item)
+        self.history_delegate.sizeHintChanged.emit(index)
+
+    def on_history_item_toggled(self, history_item):
+        """Called after a HistoryItem expands or collapses itself"""
+        if self.virtualized and not history_item.is_expanded:
+            self.collapse_all_history_items()
 
     #region Archive History Item
 
@@ -255,8 +282,8 @@ class FilesPage(QWidget):
             # Archive the JSON file
             archive_json_data(file_name)
 
-            # Refresh the history page
-            self.show_files_page()
+            # Drop the archived item from the page
+            self.refresh_files_page()
 
     #endregion
 
@@ -265,7 +292,6 @@ class FilesPage(QWidget):
     def delete_history_item(self, data):
         """Delete a history item by removing its JSON file permanently"""
         from PySide6.QtWidgets import QMessageBox
-        import os
 
         file_name = f"{data['Meta']['File Name']}"
         # Show confirmation dialog
@@ -282,13 +308,11 @@ class FilesPage(QWidget):
 
         if result == QMessageBox.StandardButton.Yes:
             # Delete the JSON file
-            json_file_path = paths['json_data'] / f"{file_name}.json"
-            if json_file_path.exists():
-                os.remove(json_file_path)
-                print(f"Deleted: {file_name}")
+            from Utility import delete_json_data
+            delete_json_data(file_name)
 
-            # Refresh the history page
-            self.show_files_page()
+            # Drop the deleted item from the page
+            self.refresh_files_page()
 
     #endregion
 
@@ -535,8 +559,8 @@ class FilesPage(QWidget):
                 print(f"  Date Applied: {new_date_applied}")
                 print(f"  Expected Response: {new_expected_response}")
 
-                # Refresh the history page to show updated dates
-                self.show_files_page()
+                # Rebuild just this item to show the updated dates
+                self.refresh_files_page()
 
             except ValueError:
                 from PySide6.QtWidgets import QMessageBox
@@ -561,18 +585,29 @@ class FilesPage(QWidget):
             subprocess.run(['open', results_path] if sys.platform == 'darwin' else ['xdg-open', results_path])
 
     def generate_documents(self, data):
-        """Generate documents (resume and cover letter) for a history item"""
-        clear_temp()
+        """Generate documents (resume and cover letter) for a history item in the background"""
         resume_data = expand_list_to_keys(data['Resume'], "")
         cover_letter_data = data['CoverLetter']
 
-        resume_doc = write_to_docx(resume_template, resume_data)
-        cover_letter_doc = write_to_docx(cover_letter_template, cover_letter_data)
+        worker = DocumentWorker(resume_data, cover_letter_data)
+        worker.stage.connect(lambda stage: print(f"{cover_letter_data['File Name']}: {stage}..."))
+        worker.finished.connect(lambda results: self.on_documents_finished(worker, data))
+        worker.error.connect(lambda error_msg: self.on_documents_error(worker, error_msg))
 
-        save_document_temp(resume_doc, resume_data['File Name'])
-        save_document_temp(cover_letter_doc, cover_letter_data['File Name'])
+        # Keep a reference until the worker is done so it isn't garbage collected mid-run
+        self.document_workers.append(worker)
+        worker.start()
 
-        convert_temp_to_pdf()
+    def on_documents_finished(self, worker, data):
+        """Handle a history item's documents being written"""
+        self.document_workers.remove(worker)
+        print(f"Documents generated: {data['CoverLetter']['File Name']}")
+
+    def on_documents_error(self, worker, error_msg):
+        """Handle a history item's documents failing to generate"""
+        from PySide6.QtWidgets import QMessageBox
 
-        copy_temp_to_results()
+        self.document_workers.remove(worker)
+        print(f"Error: {error_msg}")
+        QMessageBox.warning(self, "Generate Documents", f"Could not generate the documents:\n{error_msg}")
 
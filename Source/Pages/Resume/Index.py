@@ -1,44 +1,99 @@
-import asyncio
 import json
-from datetime import datetime
-from PySide6.QtCore import QThread, Signal
+import threading
+from concurrent.futures import CancelledError
+from PySide6.QtCore import QThread, QTimer, Signal
 from PySide6.QtGui import QTextCursor
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox
-from Agent import create_request
-from Utility import (json_template, full_base_resume_text, resume_template, cover_letter_template,
-                      paths, save_json_obj, expand_list_to_keys, write_to_docx, clear_temp,
-                      save_document_temp, copy_temp_to_results, convert_temp_to_pdf,
-                      get_templates, play_notification_sound, get_config)
+from Agent import create_request, submit
+from Prompts import build_generation_prompt, build_rating_prompt, build_continued_generation_prompt
+from Utility import (save_generated_data, DOCUMENT_STAGES,
+                      get_templates, ensure_templates, get_resume_context,
+                      play_notification_sound, get_config, save_partial_response, continue_rating_enabled)
+from Workers import DocumentWorker
 from icecream import ic
 
 
+class ChunkRelay:
+    """on_chunk for a request that starts before anything shows it: chunks are kept until a listener takes over"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.chunks = []
+        self.listener = None
+
+    def __call__(self, text):
+        with self.lock:
+            if self.listener is None:
+                self.chunks.append(text)
+                return
+            listener = self.listener
+
+        listener(text)
+
+    def attach(self, listener):
+        """Send `listener` the chunks so far, then every later chunk"""
+        with self.lock:
+            for text in self.chunks:
+                listener(text)
+            self.chunks = []
+            self.listener = listener
+
+
 class AIWorker(QThread):
-    """Worker thread for async AI requests"""
+    """Worker thread that waits on an AI request running on the shared event loop"""
     finished = Signal(str)  # Signal to emit the response
     error = Signal(str)     # Signal to emit errors
     chunk = Signal(str)     # Signal to emit streamed response chunks
+    cancelled = Signal(str) # Signal to emit when the request was cancelled, with where the partial response was saved ("" if none)
 
-    def __init__(self, message):
+    def __init__(self, message, future=None, relay=None):
+        """
+        Args:
+            message: Message to send
+            future: A request for `message` already running on the shared loop, to wait on instead of sending it again
+            relay: ChunkRelay the running request streams into (the worker takes it over once it starts)
+        """
         super().__init__()
         self.message = message
+        self.future = future
+        self.relay = relay
+        self.cancel_requested = False
+        self.partial_chunks = []
+
+    def cancel(self):
+        """Cancel the request (the connection is closed and nothing more is streamed)"""
+        self.cancel_requested = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def on_chunk(self, text):
+        self.partial_chunks.append(text)
+        self.chunk.emit(text)
+
+    def save_partial(self, reason):
+        """Save whatever streamed in before the request stopped, returning the file path ("" if nothing did)"""
+        path = save_partial_response("".join(self.partial_chunks), reason)
+        return str(path) if path else ""
 
     def run(self):
-        """Run the async request in a separate thread"""
+        """Submit the request to the shared loop and wait for it in a separate thread"""
         try:
-            # Create a new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            if self.future is None:
+                self.future = submit(create_request(self.message, on_chunk=self.on_chunk))
+            elif self.relay is not None:
+                self.relay.attach(self.on_chunk)
 
-            # Run the async function
-            response = loop.run_until_complete(create_request(self.message, on_chunk=self.chunk.emit))
+            if self.cancel_requested:
+                self.future.cancel()
 
             # Emit success signal
-            self.finished.emit(response)
-
-            loop.close()
+            self.finished.emit(self.future.result())
+        except CancelledError:
+            self.cancelled.emit(self.save_partial("Cancelled"))
         except Exception as e:
-            # Emit error signal
-            self.error.emit(str(e))
+            # Emit error signal, keeping any partial response
+            path = self.save_partial("Timed Out" if isinstance(e, TimeoutError) else "Failed")
+            self.error.emit(f"{e}\nPartial response saved to {path}" if path else str(e))
 
 
 class ResumePage(QWidget):
@@ -141,6 +196,19 @@ class ResumePage(QWidget):
 
         main_layout.addLayout(generate_row)
 
+        # Speculative rating: rate the job once its details stop changing (see start_speculative_rating)
+        self.speculative_future = None
+        self.speculative_message = None
+        self.speculative_relay = None
+        self.speculative_timer = QTimer(self)
+        self.speculative_timer.setSingleShot(True)
+        self.speculative_timer.setInterval(int(get_config()['Settings'].get('Speculative Rating Delay', 3) * 1000))
+        self.speculative_timer.timeout.connect(self.start_speculative_rating)
+
+        self.job_description.textChanged.connect(self.on_job_details_changed)
+        self.job_title.textChanged.connect(self.on_job_details_changed)
+        self.company_name.textChanged.connect(self.on_job_details_changed)
+
     def show_stream_modal(self, title):
         """Show a non-blocking modal that displays streamed AI output as it's received"""
         from PySide6.QtWidgets import QDialog, QVBoxLayout, QTextEdit
@@ -171,6 +239,8 @@ class ResumePage(QWidget):
         """)
         layout.addWidget(text_edit)
 
+        layout.addWidget(self.create_cancel_button())
+
         self.stream_dialog = dialog
         self.stream_text_edit = text_edit
         dialog.show()
@@ -191,6 +261,7 @@ class ResumePage(QWidget):
             self.stream_dialog.close()
             self.stream_dialog = None
             self.stream_text_edit = None
+            self.cancel_request_button = None
 
     #region Progress Modal (Generate Resume)
 
@@ -257,6 +328,8 @@ class ResumePage(QWidget):
         close_button.clicked.connect(self.close_progress_modal)
         layout.addWidget(close_button)
 
+        layout.addWidget(self.create_cancel_button())
+
         self.stream_dialog = dialog
         self.stream_text_edit = text_edit
         self.stage_timeline = timeline
@@ -281,6 +354,7 @@ class ResumePage(QWidget):
 
         self.progress_status_label.setVisible(True)
         self.progress_close_button.setVisible(True)
+        self.hide_cancel_button()
 
     def close_progress_modal(self):
         """Close the progress modal (triggered by its Close button) and clear its state"""
@@ -291,14 +365,60 @@ class ResumePage(QWidget):
         self.stage_timeline = None
         self.progress_status_label = None
         self.progress_close_button = None
+        self.cancel_request_button = None
+
+    def create_cancel_button(self):
+        """Cancel button for the stream / progress modal, which cancels the request the modal is showing"""
+        cancel_button = QPushButton("Cancel Request")
+        cancel_button.setMinimumHeight(40)
+        cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: white;
+                color: #c62828;
+                font-size: 11pt;
+                font-weight: bold;
+                border: 2px solid #c62828;
+                border-radius: 6px;
+                padding: 8px 16px;
+            }
+            QPushButton:hover {
+                background-color: #ffebee;
+            }
+            QPushButton:disabled {
+                color: #9e9e9e;
+                border: 2px solid #e0e0e0;
+            }
+        """)
+        cancel_button.setToolTip("Stop the request. Whatever streamed in so far is kept.")
+        cancel_button.clicked.connect(self.cancel_ai_request)
+
+        self.cancel_request_button = cancel_button
+        return cancel_button
+
+    def cancel_ai_request(self):
+        """Cancel the request shown in the modal"""
+        worker = getattr(self, 'modal_worker', None)
+        if worker is None or not worker.isRunning():
+            return
+
+        worker.cancel()
+        if getattr(self, 'cancel_request_button', None) is not None:
+            self.cancel_request_button.setEnabled(False)
+            self.cancel_request_button.setText("Cancelling...")
+
+    def hide_cancel_button(self):
+        """Hide the Cancel button once the request is over"""
+        if getattr(self, 'cancel_request_button', None) is not None:
+            self.cancel_request_button.setVisible(False)
 
     #endregion
 
-    def start_ai_worker(self, message, on_finished, on_error, stream_title, stages=None):
+    def start_ai_worker(self, message, on_finished, on_error, stream_title, stages=None, future=None, relay=None):
         """Create and start an AIWorker, optionally showing a live-streaming modal.
 
         If `stages` is given, the modal shows a StageTimeline instead of the plain
         streaming view, and stays open with a Close button once the request finishes.
+        `future` and `relay` hand the worker a request that's already running (see AIWorker).
         """
         from Utility import get_config
 
@@ -310,42 +430,121 @@ class ResumePage(QWidget):
             else:
                 self.show_stream_modal(stream_title)
 
-        worker = AIWorker(message)
+        worker = AIWorker(message, future, relay)
+        if show_stream:
+            self.modal_worker = worker
         if show_stream and stages:
             worker.started.connect(lambda: self.stage_timeline.set_stage(1))  # Thinking
         worker.chunk.connect(self.on_stream_chunk)
         worker.finished.connect(on_finished)
         worker.error.connect(on_error)
+        worker.cancelled.connect(
+            lambda path: on_error(f"Request cancelled. Partial response saved to {path}" if path else "Request cancelled")
+        )
         worker.start()
         return worker
 
-    def on_check_rating(self):
-        """Handle the check rating button click"""
+    #region Speculative Rating
+
+    # With Settings.Speculative Rating on, the rating request starts in the background once the job
+    # details have stopped changing for Settings.Speculative Rating Delay seconds. Its response lands
+    # in the response cache, so Check Rating shows it instantly, or waits on it if it's still running.
+
+    def on_job_details_changed(self):
+        """Cancel any speculative rating for the old details and wait for the new ones to settle"""
+        self.cancel_speculative_rating()
+        self.speculative_timer.start()
+
+    def speculative_rating_delay(self):
+        """Milliseconds the job details have to stay the same before a speculative rating starts (None when it's off)"""
+        settings = get_config()['Settings']
 
-        from Utility import full_base_resume_text, match_rating_prompt, job_quality_prompt
+        # The response cache is what keeps a finished speculative rating until it's asked for
+        if not settings.get('Speculative Rating', False) or not settings.get('Response Cache', {}).get('Enabled', True):
+            return None
+
+        return int(settings.get('Speculative Rating Delay', 3) * 1000)
+
+    def build_current_rating_prompt(self):
+        """Rating message for the job details in the form"""
+        ensure_templates()
 
         job_title = self.job_title.text()
         company_name = self.company_name.text()
         job_desc = self.job_description.toPlainText()
+        resume_context = get_resume_context(job_desc)
 
-        template = {
-            'Match Rating': 'Scale from 1-10',
-            'Match Rating Description': '',
-            'Job Quality': 'Scale from 1-10',
-            'Job Quality Description': ''
-        }
+        return build_rating_prompt(resume_context, company_name, job_title, job_desc, cache_job=continue_rating_enabled())
+
+    def start_speculative_rating(self):
+        """Start rating the job in the background if the details have settled for long enough"""
+        delay = self.speculative_rating_delay()
+        if delay is None or not self.job_description.toPlainText().strip():
+            return
+
+        # The setting is read once the typing pauses rather than on every keystroke, so a changed delay
+        # applies from the next pause
+        self.speculative_timer.setInterval(delay)
+
+        rating_worker = getattr(self, 'rating_worker', None)
+        if rating_worker is not None and rating_worker.isRunning():
+            return
+
+        message = self.build_current_rating_prompt()
+        if message == self.speculative_message:
+            return
+
+        self.speculative_message = message
+        self.speculative_relay = ChunkRelay()
+        self.speculative_future = submit(create_request(message, on_chunk=self.speculative_relay))
+        self.speculative_future.add_done_callback(self.on_speculative_rating_done)
+        print("Speculative rating started")
+
+    def on_speculative_rating_done(self, future):
+        """Log how a speculative rating ended (runs on the AI event loop's thread)"""
+        if future.cancelled():
+            print("Speculative rating cancelled")
+        elif future.exception() is not None:
+            print(f"Speculative rating failed: {future.exception()}")
+        else:
+            print("Speculative rating finished")
 
-        message = f'Current Resumes : {full_base_resume_text}\n'
-        message += f"Match Rating Prompt: {match_rating_prompt}\n"
-        message += f"Job Quality Prompt: {job_quality_prompt}\n"
-        message += f"Job Title: {job_title}\nCompany: {company_name}\nJob Description: {job_desc}\n"
-        message += f"Respond in json format using this template: {json.dumps(template)}"
+    def cancel_speculative_rating(self):
+        if self.speculative_future is not None and not self.speculative_future.done():
+            self.speculative_future.cancel()
+
+        self.speculative_future = None
+        self.speculative_message = None
+
+    def take_speculative_rating(self, message):
+        """
+        The still running speculative rating for `message` and the ChunkRelay it streams into, or (None, None)
+
+        A finished one isn't needed: its response is in the response cache.
+        """
+        future = self.speculative_future
+        if message != self.speculative_message or future is None or future.done():
+            self.cancel_speculative_rating()
+            return None, None
+
+        self.speculative_future = None
+        self.speculative_message = None
+        return future, self.speculative_relay
+
+    #endregion
+
+    def on_check_rating(self):
+        """Handle the check rating button click"""
+        self.speculative_timer.stop()
+        message = self.build_current_rating_prompt()
 
         self.check_rating_button.setEnabled(False)
         self.check_rating_button.setText("Checking...")
 
+        future, relay = self.take_speculative_rating(message)
         self.rating_worker = self.start_ai_worker(
-            message, self.on_rating_response, self.on_rating_error, "Checking Rating..."
+            message, self.on_rating_response, self.on_rating_error, "Checking Rating...",
+            future=future, relay=relay
         )
 
     def on_rating_response(self, response):
@@ -358,6 +557,13 @@ class ResumePage(QWidget):
 
         data = json.loads(response)
 
+        # Kept so Generate Resume from the rating modal can continue this conversation
+        self.rating_conversation = {
+            'Job': self.current_job_details(),
+            'Message': self.rating_worker.message,
+            'Response': response,
+        }
+
         self.current_match_rating = data['Match Rating']
         self.current_match_rating_description = data['Match Rating Description']
         self.current_job_quality = data['Job Quality']
@@ -478,6 +684,9 @@ class ResumePage(QWidget):
         if dialog.exec():
             self.on_generate(with_rating=False)
 
+    def current_job_details(self):
+        return (self.company_name.text(), self.job_title.text(), self.job_description.toPlainText())
+
     def on_generate(self, with_rating = True):
         """Handle the generate button click"""
         job_title = self.job_title.text()
@@ -490,27 +699,24 @@ class ResumePage(QWidget):
 
         # Reload templates and prompts
         get_templates()
-        from Utility import resume_prompt, json_template, full_base_resume_text, match_rating_prompt, job_quality_prompt
-
-        current_date_time = datetime.now().strftime("%B %d, %Y %I:%M %p")
-
-
-        # Build the AI prompt
-        message = f"My resumes:\n{full_base_resume_text}\n"
-        message += f"Company Name: {company_name}\n Job Title: {job_title}\n Job Description: {job_desc}\n"
-        message += f"{resume_prompt}\n"
+        resume_context = get_resume_context(job_desc)
+
+        rating = None
+        if not with_rating:
+            rating = {
+                'Match Rating': self.current_match_rating,
+                'Match Rating Description': self.current_match_rating_description,
+                'Job Quality': self.current_job_quality,
+                'Job Quality Description': self.current_job_quality_description
+            }
 
-        if with_rating:
-            message += f"Match Rating: {match_rating_prompt}\n"
-            message += f"Job Quality: {job_quality_prompt}"
+        # Build the AI prompt, continuing the rating conversation when generating from its modal
+        rating_conversation = getattr(self, 'rating_conversation', None)
+        if (rating is not None and continue_rating_enabled() and rating_conversation is not None
+                and rating_conversation['Job'] == self.current_job_details()):
+            message = build_continued_generation_prompt(rating_conversation['Message'], rating_conversation['Response'])
         else:
-            json_template['Job']['Match Rating'] = self.current_match_rating
-            json_template['Job']['Match Rating Description'] = self.current_match_rating_description
-            json_template['Job']['Job Quality'] = self.current_job_quality
-            json_template['Job']['Job Quality Description'] = self.current_job_quality_description
-
-        message += f"Please respond in a parsable json format that looks like this: \n{json.dumps(json_template)}\n"
-        message += f"Also make sure to fillout the cover page. The time this request was made is {current_date_time}"
+            message = build_generation_prompt(resume_context, company_name, job_title, job_desc, rating)
 
         self.current_prompt = message
         # Store company name and save_submission flag for use in callback
@@ -518,20 +724,14 @@ class ResumePage(QWidget):
         # Create and start worker thread
         self.worker = self.start_ai_worker(
             message, self.on_ai_response, self.on_ai_error, "Generating Resume...",
-            stages=["Parsing Information", "Thinking", "Generating Response", "Writing to Documents"]
+            stages=["Parsing Information", "Thinking", "Generating Response", *DOCUMENT_STAGES]
         )
 
     def on_ai_response(self, response):
         """Handle successful AI response"""
         try:
-            from Utility import get_config
-
-            config = get_config()
-
             data = json.loads(response)
 
-            clear_temp()
-
             play_notification_sound()
 
 
@@ -546,71 +746,46 @@ class ResumePage(QWidget):
                 # Normal flow with document generation
                 self.generate_button.setText("Processing Documents...")
 
-            if getattr(self, 'stage_timeline', None) is not None:
-                self.stage_timeline.set_stage(3)  # Writing to Documents
-
-            resume_data = expand_list_to_keys(data['Resume'], "")
-            cover_letter_data = data['CoverLetter']
-
-            resume_name = resume_data['File Name']
-            cover_letter_name = cover_letter_data['File Name']
-            #region Editing Meta Data
-
-            current_date_time = datetime.now()
+            # The response is in, so there's nothing left to cancel
+            self.hide_cancel_button()
+            self.set_progress_stage(DOCUMENT_STAGES[0])
 
-            data['Meta']['Resume Path'] = str(paths['results'] / f"{resume_name}.docx")
-            data['Meta']['Cover Letter Path'] = str(paths['results'] / f"{cover_letter_name}.docx")
-            data['Meta']['Model Used'] = config['Settings']['Current Model']
-            data['Meta']['Date Created'] = current_date_time.isoformat()
-            data['Meta']['Favorite'] = False
-
-            #endregion
-
-            #region Editing Job data
-
-            data['Job']['Save Submission'] = save_submission
-            data['Job']['Application Link'] = application_link
-
-            #endregion
-
-            # clear_temp()
-
-            save_json_obj(expand_list_to_keys(data, ""), f"{data['Meta']['File Name']}")
-
-            # Only generate documents if NOT a "Save Submission"
-            if not save_submission:
-                #region Filling Documents
-
-
-                resume_doc = write_to_docx(resume_template, resume_data)
-                cover_letter_doc = write_to_docx(cover_letter_template, cover_letter_data)
-
-                save_document_temp(resume_doc, resume_name)
-                save_document_temp(cover_letter_doc, cover_letter_name)
-
-                convert_temp_to_pdf()
-
-                copy_temp_to_results()
-
-
-
-                #endregion
-
-            # Re-enable button
-            self.generate_button.setEnabled(True)
-            self.generate_button.setText("Generate Resume")
+            resume_data, cover_letter_data = save_generated_data(data, save_submission, application_link)
 
             if save_submission:
-                print("Job saved successfully (no documents generated - Save Submission mode)")
-                self.finish_progress_modal(True, "Job saved successfully! No documents were generated (Save Submission mode).")
-            else:
-                print("Resume generated successfully!")
-                self.finish_progress_modal(True, "Resume and cover letter generated successfully!")
+                self.on_documents_finished([], save_submission=True)
+                return
+
+            # Fill the templates and convert them to PDF off the GUI thread
+            self.document_worker = DocumentWorker(resume_data, cover_letter_data)
+            self.document_worker.stage.connect(self.set_progress_stage)
+            self.document_worker.finished.connect(self.on_documents_finished)
+            self.document_worker.error.connect(self.on_ai_error)
+            self.document_worker.start()
         except Exception as e:
             import traceback
             ic(type(e).__name__, str(e), response, traceback.format_exc())
             self.on_ai_error(str(e))
 
+    def set_progress_stage(self, stage):
+        """Move the progress modal's timeline to the named stage (if the modal is open)"""
+        timeline = getattr(self, 'stage_timeline', None)
+        if timeline is not None and stage in timeline.stages:
+            timeline.set_stage(timeline.stages.index(stage))
+
+    def on_documents_finished(self, results, save_submission=False):
+        """Handle the documents being written (or skipped for a Save Submission)"""
+        # Re-enable button
+        self.generate_button.setEnabled(True)
+        self.generate_button.setText("Generate Resume")
+
+        if save_submission:
+            print("Job saved successfully (no documents generated - Save Submission mode)")
+            self.finish_progress_modal(True, "Job saved successfully! No documents were generated (Save Submission mode).")
+        else:
+            print("Resume generated successfully!")
+            self.finish_progress_modal(True, "Resume and cover letter generated successfully!")
+
     def on_ai_error(self, error_msg):
         """Handle AI request errors"""
         self.finish_progress_modal(False, error_msg)
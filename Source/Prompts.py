@@ -0,0 +1,138 @@
+import json
+from datetime import datetime
+import Utility
+
+# Builds the messages sent to the model. Shared by the Resume page and the Batch page, so a single
+# job and a queued job ask for exactly the same thing.
+# Call Utility.get_templates() first so the prompts and the Json Template are current.
+#
+# A message is a list of text blocks, stable parts first: the base resumes, then the instructions,
+# then the job itself. Blocks marked for caching end a prefix that's identical across requests,
+# which Anthropic caches (cache_control) and OpenAI caches automatically since it's sent first.
+# The resumes can be picked per job (Utility.get_resume_context), so a job's rating and generation
+# requests share them even when the next job doesn't.
+#
+# A message can also be a conversation: a list of {"role", "content"} turns (see continue_conversation).
+
+RATING_KEYS = ('Match Rating', 'Match Rating Description', 'Job Quality', 'Job Quality Description')
+
+
+def prompt_block(text, cache=False):
+    """Text block of a message, optionally ending a cached prefix"""
+    block = {"type": "text", "text": text}
+    if cache:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
+
+def is_conversation(message):
+    """Whether a message is a list of turns rather than a single turn's content"""
+    return isinstance(message, list) and bool(message) and "role" in message[0]
+
+def prompt_text(message):
+    """A message as one string (a message is a string or a list of prompt blocks)"""
+    if isinstance(message, str):
+        return message
+    return "".join(block["text"] for block in message)
+
+def cached_prefix_text(message):
+    """Text of a message up to and including its last cached block ("" if nothing is cached)"""
+    # A conversation's cached prefix is in its first turn, which starts every request that continues it
+    if is_conversation(message):
+        message = message[0]["content"]
+
+    if isinstance(message, str):
+        return ""
+
+    cached = [index for index, block in enumerate(message) if "cache_control" in block]
+    return "".join(block["text"] for block in message[:cached[-1] + 1]) if cached else ""
+
+def resume_block(base_resume_text):
+    """The base resumes, the same leading block for every request so they're cached once"""
+    return prompt_block(f"My resumes:\n{base_resume_text}\n", cache=True)
+
+def build_generation_prompt(base_resume_text, company_name, job_title, job_desc, rating=None):
+    """
+    Message asking for the tailored resume and cover letter
+
+    Args:
+        base_resume_text: Text of the base resumes (see Utility.get_resume_context)
+        company_name: Company name (may be empty)
+        job_title: Job title (may be empty)
+        job_desc: Job description
+        rating: Dictionary with the RATING_KEYS from an earlier rating request, which is reused
+                instead of asking for a new rating (default: ask for one)
+
+    Returns:
+        list: The message's prompt blocks
+    """
+    # The date without the time, so asking again the same day is the same message (see ResponseCache)
+    current_date = datetime.now().strftime("%B %d, %Y")
+
+    instructions = f"{Utility.resume_prompt}\n"
+
+    if rating is None:
+        instructions += f"Match Rating: {Utility.match_rating_prompt}\n"
+        instructions += f"Job Quality: {Utility.job_quality_prompt}\n"
+
+    instructions += f"Please respond in a parsable json format that looks like this: \n{json.dumps(Utility.json_template)}\n"
+
+    job = f"Company Name: {company_name}\n Job Title: {job_title}\n Job Description: {job_desc}\n"
+
+    if rating is not None:
+        job += f"The match rating and job quality are already decided, use these values in the Job section as they are: {json.dumps(rating)}\n"
+
+    job += f"Also make sure to fillout the cover page. The date this request was made is {current_date}"
+
+    return [resume_block(base_resume_text), prompt_block(instructions, cache=True), prompt_block(job)]
+
+def build_rating_prompt(base_resume_text, company_name, job_title, job_desc, cache_job=False):
+    """
+    Message asking for the match rating and job quality of a job (answered with the RATING_KEYS)
+
+    cache_job also caches the job block, for a rating that generation may continue from (see
+    build_continued_generation_prompt), so the whole rating message is a cached prefix there.
+    """
+    template = {
+        'Match Rating': 'Scale from 1-10',
+        'Match Rating Description': '',
+        'Job Quality': 'Scale from 1-10',
+        'Job Quality Description': ''
+    }
+
+    instructions = f"Match Rating Prompt: {Utility.match_rating_prompt}\n"
+    instructions += f"Job Quality Prompt: {Utility.job_quality_prompt}\n"
+    instructions += f"Respond in json format using this template: {json.dumps(template)}\n"
+
+    job = f"Job Title: {job_title}\nCompany: {company_name}\nJob Description: {job_desc}\n"
+
+    return [resume_block(base_resume_text), prompt_block(instructions, cache=True), prompt_block(job, cache=cache_job)]
+
+def continue_conversation(message, response, next_message):
+    """Conversation of `message`, the model's `response` to it and then `next_message`"""
+    turns = message if is_conversation(message) else [{"role": "user", "content": message}]
+
+    return turns + [
+        {"role": "assistant", "content": response},
+        {"role": "user", "content": next_message},
+    ]
+
+def build_continued_generation_prompt(rating_message, rating_response):
+    """
+    Conversation asking for the tailored resume and cover letter after a rating request
+
+    Only the generation instructions are new: the resumes and the job are already in the rating
+    message, which is sent again as it was so it's read from the prompt cache, and the rating is
+    the model's own earlier answer.
+
+    Args:
+        rating_message: Message of the rating request (from build_rating_prompt with cache_job)
+        rating_response: Response text of the rating request
+    """
+    current_date = datetime.now().strftime("%B %d, %Y")
+
+    instructions = f"Now tailor my resume and write a cover letter for this job.\n{Utility.resume_prompt}\n"
+    instructions += "Use your match rating and job quality from above in the Job section as they are.\n"
+    instructions += f"Please respond in a parsable json format that looks like this: \n{json.dumps(Utility.json_template)}\n"
+    instructions += f"Also make sure to fillout the cover page. The date this request was made is {current_date}"
+
+    return continue_conversation(rating_message, rating_response, [prompt_block(instructions)])
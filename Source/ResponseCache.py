@@ -0,0 +1,154 @@
+from pathlib import Path
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Saved AI responses, keyed by a hash of everything that decides the answer: the model, the settings
+# that change its output and the exact message. Asking for the same thing again (Check Rating twice
+# on one posting, generating again after a crash) returns the saved response instead of another
+# request. Entries older than the max age are dropped, and the least recently used ones go first
+# once the cache is over its max size.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_created ON responses (created);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+connection = None
+cache_lock = threading.RLock()
+
+# Lookups since the app started
+hits = 0
+misses = 0
+
+
+def open_cache(db_path):
+    """Open (or create) the cache at `db_path`. Safe to call more than once"""
+    global connection
+
+    with cache_lock:
+        if connection is not None:
+            return connection
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(SCHEMA)
+
+        return connection
+
+def request_key(model, settings, message):
+    """
+    Key of a request
+
+    Args:
+        model: Model name
+        settings: Dictionary of the settings that change the response (thinking type, effort, ...)
+        message: The message exactly as it's sent (a string or a list of prompt blocks)
+    """
+    payload = json.dumps({'Model': model, 'Settings': settings, 'Message': message}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get(key, max_age=None):
+    """
+    The saved response for `key`, or None
+
+    Args:
+        key: Result of request_key
+        max_age: Seconds a response stays usable (default: no limit)
+    """
+    global hits
+    global misses
+
+    now = time.time()
+
+    with cache_lock:
+        row = connection.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+
+        if row is not None and max_age is not None and now - row['created'] > max_age:
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            connection.commit()
+            row = None
+
+        if row is None:
+            misses += 1
+            return None
+
+        hits += 1
+        connection.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        connection.commit()
+
+        return row['response']
+
+def put(key, model, response, max_size=None, max_age=None):
+    """
+    Save a response, then evict what's over the limits
+
+    Args:
+        key: Result of request_key
+        model: Model that gave the response
+        response: Response text
+        max_size: Most bytes of responses to keep (default: no limit)
+        max_age: Seconds a response is kept (default: no limit)
+    """
+    now = time.time()
+
+    with cache_lock:
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, response, len(response.encode("utf-8")), now, now)
+        )
+        evict(max_size, max_age)
+        connection.commit()
+
+def evict(max_size=None, max_age=None):
+    """Drop responses older than `max_age` seconds, then the least recently used ones until under `max_size` bytes"""
+    with cache_lock:
+        if max_age is not None:
+            connection.execute("DELETE FROM responses WHERE created < ?", (time.time() - max_age,))
+
+        if max_size is not None:
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            evicted = []
+
+            for row in connection.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+                if total <= max_size:
+                    break
+                evicted.append((row['key'],))
+                total -= row['size']
+
+            connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+def clear():
+    """Delete every saved response"""
+    with cache_lock:
+        connection.execute("DELETE FROM responses")
+        connection.commit()
+
+def stats():
+    """
+    Returns:
+        Dictionary with 'Entries', 'Size' (bytes), 'Hits' and 'Misses' (since the app started)
+    """
+    with cache_lock:
+        row = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    return {'Entries': row[0], 'Size': row[1], 'Hits': hits, 'Misses': misses}
+
+def stats_text():
+    """One line summary of stats()"""
+    cache_stats = stats()
+    return (f"{cache_stats['Entries']} saved responses ({cache_stats['Size'] / 1024:.0f} KB), "
+            f"{cache_stats['Hits']} hits and {cache_stats['Misses']} misses this session")
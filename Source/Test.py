@@ -1,7 +1,6 @@
 from Utility import paths, write_to_docx, get_json_datas, expand_list_to_keys, replace_keys, resume_template, cover_letter_template, save_document_result, scan_docx, save_document_temp
-from Agent import create_request
+from Agent import run_request
 from icecream import ic
-import asyncio
 import json
 
 # Example: Get text from resume template
@@ -10,7 +9,7 @@ scan_docx(resume_template, lambda s: text.append(s))
 text = "".join(text)
 
 # How to call the async create_request function in a non-async context:
-# Create and run an event loop to execute the async function
+# Submit it to Agent's shared event loop and wait for the result
 
 message = f"Give me a response in JSON format from this text. The keys are surrounded by brackets" 
 message += "\nIf it's not surrounded by brackets don't make it a key. Also come up with the values for each key and pretend you are a software engineer applying to a tech job for AI specialization."
@@ -19,8 +18,8 @@ message += "There are 32 available lines and each line can contain 85 characters
 message += "But also try to fill the text out so that it could reach close to a full page. Just not more than 1 page"
 message += f"\n{text}\n"
 
-# Method 1: Using asyncio.run() (Python 3.7+, simplest approach)
-response = asyncio.run(create_request(message))
+# Method 1: Using run_request (simplest approach)
+response = run_request(message)
 
 data = json.loads(response)
 
@@ -28,10 +27,8 @@ new_doc = write_to_docx(resume_template, data)
 
 save_document_temp(new_doc, "Mock Resume")
 
-# Method 2: Manual event loop management (used in Main.py's AIWorker)
-# This is useful when you need more control over the event loop
-# loop = asyncio.new_event_loop()
-# asyncio.set_event_loop(loop)
-# response2 = loop.run_until_complete(create_request(message))
-# loop.close()
+# Method 2: Submitting the coroutine yourself (used in the Resume page's AIWorker)
+# This is useful when you need to cancel the request or not wait on it right away
+# future = submit(create_request(message))
+# response2 = future.result()  # or future.cancel()
 # ic(response2)
\ No newline at end of file
@@ -1,12 +1,27 @@
 from pathlib import Path
 from icecream import ic
 from docx import Document
-from docx2pdf import convert
+from docx.parts.hdrftr import HeaderPart, FooterPart
+from docx.text.paragraph import Paragraph
 from pygame import mixer
+import bisect
+import copy
+import hashlib
 import json
 import shutil
+import tempfile
 import os
+import threading
+import time
+import zipfile
+import posixpath
+import re
+import xml.etree.ElementTree as ElementTree
 from datetime import datetime
+import HistoryStore
+import ResponseCache
+import Converter
+import Corpus
 
 #region Global Variables
 
@@ -17,23 +32,32 @@ paths = {
     "resources": base_dir / "Resources",
     "results": base_dir / "Results",
     "json_data" : base_dir / "Resources" / "Json Data",
-    "temp": base_dir / "Temp"
+    "partial_responses": base_dir / "Resources" / "Partial Responses",
+    "temp": base_dir / "Temp",
+    "cache": base_dir / "Cache"
 }
 
 base_resumes = []
 base_resume_texts = []
 full_base_resume_text = ""
+resume_corpus = None
 resume_prompt = ""
 match_rating_prompt = ""
 job_quality_prompt = ""
 
 
 json_template = {}
-resume_template = ""
-cover_letter_template = ""
+resume_template = paths['resources'] / "Resume Template.docx"
+cover_letter_template = paths['resources'] / "Cover Letter Template.docx"
 
 config = {}
 
+# Startup steps that already ran this process, and how long each one took (in seconds)
+startup_timings = {}
+completed_startup_steps = set()
+startup_step_locks = {}
+startup_lock = threading.Lock()
+
 #endregion
 
 #region Functions
@@ -69,22 +93,97 @@ def scan_docx(docx_path, modifier) -> Document:
 
     return doc
 
-def modify_docx(docx_path, modifier) -> Document:
+def rewrite_paragraph(paragraph, modifier):
+    """Replace a paragraph's text with modifier(text), keeping the first run's formatting"""
+    full_text = ''.join(run.text for run in paragraph.runs)
+
+    modified_text = modifier(full_text)
+    
+    applied_text = False
+    for run in paragraph.runs:
+        run.text = ""
+
+        if not applied_text:
+            applied_text = True
+            paragraph.runs[0].text = modified_text
+
+def substitute_placeholders(paragraph, replace_placeholder):
+    """
+    Replace the {Key} placeholders in a paragraph, only rewriting the runs a placeholder touches
+
+    A placeholder split across runs ("{Sum" + "mary}") is written into the run it starts in, and
+    its pieces are removed from the runs after it. Every other run keeps its text and formatting.
+
+    Args:
+        paragraph: python-docx Paragraph
+        replace_placeholder: Function that takes a PLACEHOLDER_PATTERN match and returns its text
+
+    Returns:
+        int: Number of runs that were changed
+    """
+    runs = paragraph.runs
+    texts = [run.text for run in runs]
+    full_text = ''.join(texts)
+
+    # Most paragraphs have no placeholder at all
+    if "{" not in full_text:
+        return 0
+
+    matches = list(PLACEHOLDER_PATTERN.finditer(full_text))
+    if not matches:
+        return 0
+
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+
+    pieces = [[] for _ in runs]
+
+    def copy_text(start, end):
+        # Plain text stays in whichever runs it was already in
+        for index, text in enumerate(texts):
+            run_start, run_end = starts[index], starts[index] + len(text)
+            if run_start < end and start < run_end:
+                pieces[index].append(full_text[max(start, run_start):min(end, run_end)])
+
+    position = 0
+    for match in matches:
+        copy_text(position, match.start())
+        pieces[bisect.bisect_right(starts, match.start()) - 1].append(replace_placeholder(match))
+        position = match.end()
+    copy_text(position, len(full_text))
+
+    changed = 0
+    for run, text, new_pieces in zip(runs, texts, pieces):
+        new_text = ''.join(new_pieces)
+        if new_text != text:
+            run.text = new_text
+            changed += 1
+
+    return changed
+
+def modify_docx(docx_path, modifier=None, replace_placeholder=None) -> Document:
+    """
+    Open a .docx and rewrite its body, table, header and footer paragraphs
+
+    Args:
+        docx_path: Path to the .docx
+        modifier: Function that takes a paragraph's text and returns the new text (the paragraph is
+                  flattened into its first run)
+        replace_placeholder: Instead of `modifier`, a function that takes a PLACEHOLDER_PATTERN match and
+                             returns its text. Paragraphs without placeholders are left untouched and
+                             only the runs holding a placeholder are rewritten
+    """
     doc = Document(docx_path)
 
     def process_paragraph(paragraph):
-        full_text = ''.join(run.text for run in paragraph.runs)
+        if replace_placeholder is not None:
+            substitute_placeholders(paragraph, replace_placeholder)
+        else:
+            rewrite_paragraph(paragraph, modifier)
 
-        modified_text = modifier(full_text)
-        
-        applied_text = False
-        for run in paragraph.runs:
-            run.text = ""
-
-            if not applied_text:
-                applied_text = True
-                paragraph.runs[0].text = modified_text
-        
     for paragraph in doc.paragraphs:
         process_paragraph(paragraph)
 
@@ -107,14 +206,284 @@ def modify_docx(docx_path, modifier) -> Document:
 
     return doc
 
-def get_docx_text(docx_path):
+#region Docx Xml Reader
+
+# Reads .docx text straight from the package XML, without building a python-docx object model.
+# Produces the same text sequence as scan_docx: body paragraphs, then table cells, then the
+# non-blank header and footer paragraphs of each section.
+
+W_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R_NAMESPACE = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+RELS_NAMESPACE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+W_P = W_NAMESPACE + "p"
+W_R = W_NAMESPACE + "r"
+W_T = W_NAMESPACE + "t"
+W_TBL = W_NAMESPACE + "tbl"
+W_TR = W_NAMESPACE + "tr"
+W_TC = W_NAMESPACE + "tc"
+W_SECT_PR = W_NAMESPACE + "sectPr"
+W_VAL = W_NAMESPACE + "val"
+W_TYPE = W_NAMESPACE + "type"
+
+RUN_TEXT_TAGS = {
+    W_NAMESPACE + "tab": "\t",
+    W_NAMESPACE + "ptab": "\t",
+    W_NAMESPACE + "cr": "\n",
+    W_NAMESPACE + "noBreakHyphen": "-",
+}
+
+def xml_run_text(run) -> str:
+    parts = []
+
+    for child in run:
+        if child.tag == W_T:
+            parts.append(child.text or "")
+        elif child.tag == W_NAMESPACE + "br":
+            # Only line breaks count as text, page and column breaks don't
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif child.tag in RUN_TEXT_TAGS:
+            parts.append(RUN_TEXT_TAGS[child.tag])
+
+    return "".join(parts)
+
+def xml_paragraph_text(paragraph) -> str:
+    parts = []
+
+    for child in paragraph:
+        if child.tag == W_R:
+            parts.append(xml_run_text(child))
+        elif child.tag == W_NAMESPACE + "hyperlink":
+            parts.extend(xml_run_text(run) for run in child if run.tag == W_R)
+
+    return "".join(parts)
+
+def xml_int_property(parent, property_path, default) -> int:
+    element = parent.find(property_path)
+
+    if element is None:
+        return default
+
+    return int(element.get(W_VAL, default))
+
+def xml_table_cell_texts(table) -> list:
+    """Text of every cell in a table, row by row, repeating spanned cells like python-docx's row.cells"""
+    texts = []
+    # (grid offset, content tc) of the previous row, so vertically merged cells can find their content
+    row_above = []
+
+    for tr in table.iterfind(W_TR):
+        grid_offset = xml_int_property(tr, f"{W_NAMESPACE}trPr/{W_NAMESPACE}gridBefore", 0)
+        row = []
+
+        for tc in tr.iterfind(W_TC):
+            span = xml_int_property(tc, f"{W_NAMESPACE}tcPr/{W_NAMESPACE}gridSpan", 1)
+            content_tc = tc
+
+            v_merge = tc.find(f"{W_NAMESPACE}tcPr/{W_NAMESPACE}vMerge")
+            if v_merge is not None and v_merge.get(W_VAL, "continue") == "continue":
+                content_tc = next((above for offset, above in row_above if offset == grid_offset), tc)
+
+            cell_text = "\n".join(xml_paragraph_text(p) for p in content_tc.iterfind(W_P))
+            texts.extend([cell_text] * span)
+
+            row.append((grid_offset, content_tc))
+            grid_offset += span
+
+        row_above = row
+
+    return texts
+
+def xml_part_paragraph_texts(package, part_name) -> list:
+    """Text of the top level paragraphs of a header or footer part"""
+    texts = []
+    depth = 0
+
+    with package.open(part_name) as part:
+        for event, element in ElementTree.iterparse(part, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+
+            depth -= 1
+            # Depth 1 is a direct child of the w:hdr / w:ftr root
+            if depth == 1:
+                if element.tag == W_P:
+                    texts.append(xml_paragraph_text(element))
+                element.clear()
+
+    return texts
+
+def xml_document_rels(package) -> dict:
+    targets = {}
+
+    with package.open("word/_rels/document.xml.rels") as rels:
+        for relationship in ElementTree.parse(rels).getroot().iterfind(RELS_NAMESPACE + "Relationship"):
+            target = relationship.get("Target", "")
+
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join("word", target))
+
+            targets[relationship.get("Id")] = target
+
+    return targets
+
+def xml_section_references(sect_pr) -> dict:
+    """Default header/footer relationship ids of a w:sectPr"""
+    references = {}
+
+    for kind in ("header", "footer"):
+        for reference in sect_pr.iterfind(f"{W_NAMESPACE}{kind}Reference"):
+            if reference.get(W_TYPE, "default") == "default":
+                references[kind] = reference.get(R_NAMESPACE + "id")
+
+    return references
+
+def scan_docx_xml(docx_path, modifier):
+    """Same as scan_docx, but streams the package XML instead of loading a python-docx Document"""
+    with zipfile.ZipFile(docx_path) as package:
+        table_texts = []
+        sections = []
+        depth = 0
+
+        with package.open("word/document.xml") as document:
+            for event, element in ElementTree.iterparse(document, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    continue
+
+                depth -= 1
+
+                # Depth 2 is a direct child of w:body (w:document > w:body > block)
+                if depth != 2:
+                    continue
+
+                if element.tag == W_P:
+                    modifier(xml_paragraph_text(element))
+
+                    sect_pr = element.find(f"{W_NAMESPACE}pPr/{W_SECT_PR}")
+                    if sect_pr is not None:
+                        sections.append(xml_section_references(sect_pr))
+
+                elif element.tag == W_TBL:
+                    table_texts.extend(xml_table_cell_texts(element))
+
+                elif element.tag == W_SECT_PR:
+                    sections.append(xml_section_references(element))
+
+                element.clear()
+
+        for text in table_texts:
+            modifier(text)
+
+        if not sections:
+            return
+
+        targets = xml_document_rels(package)
+        part_texts = {}
+        # Sections without their own header/footer inherit the previous section's
+        current = {}
+
+        for section in sections:
+            current.update(section)
+
+            for kind in ("header", "footer"):
+                target = targets.get(current.get(kind))
+                if target is None:
+                    continue
+
+                if target not in part_texts:
+                    part_texts[target] = xml_part_paragraph_texts(package, target)
+
+                for text in part_texts[target]:
+                    if text.strip():
+                        modifier(text)
+
+#endregion
+
+def get_docx_text_backend() -> str:
+    return get_config()['Settings'].get('Docx Text Backend', 'python-docx')
+
+def get_docx_text(docx_path, backend=None):
+    """Get the text of a .docx using the "python-docx" or "xml" backend (defaults to the configured one)"""
+    backend = backend or get_docx_text_backend()
 
     full_text = []
 
-    scan_docx(docx_path, lambda s: full_text.append(s))
+    if backend == "xml":
+        scan_docx_xml(docx_path, lambda s: full_text.append(s))
+    else:
+        scan_docx(docx_path, lambda s: full_text.append(s))
 
     return full_text
 
+def get_file_hash(file_path) -> str:
+    sha = hashlib.sha256()
+
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+def load_json_cache(name) -> dict:
+    full_path = paths['cache'] / f"{name}.json"
+
+    try:
+        with open(full_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_json_cache(name, cache):
+    ensure_path_exists(paths['cache'])
+    full_path = paths['cache'] / f"{name}.json"
+
+    with open(full_path, 'w', encoding='utf-8') as file:
+        json.dump(cache, file, indent=4, ensure_ascii=False)
+
+def get_cached_docx_text(docx_path, cache) -> tuple:
+    """Get the text of a .docx, reusing the cached extraction when the file hasn't changed.
+
+    Entries are keyed by path and validated by size + modified time, falling back to a
+    content hash so a touched-but-identical file isn't re-parsed.
+
+    Returns:
+        tuple: (text lines, whether the cache was updated)
+    """
+    key = str(Path(docx_path).resolve())
+    stat = os.stat(docx_path)
+    backend = get_docx_text_backend()
+    entry = cache.get(key)
+
+    # Text extracted by a different backend is re-extracted
+    if entry and entry.get('Backend') != backend:
+        entry = None
+
+    if entry and entry['Size'] == stat.st_size and entry['Modified'] == stat.st_mtime_ns:
+        return entry['Text'], False
+
+    file_hash = get_file_hash(docx_path)
+
+    if entry and entry['Size'] == stat.st_size and entry['Hash'] == file_hash:
+        entry['Modified'] = stat.st_mtime_ns
+        return entry['Text'], True
+
+    text = get_docx_text(docx_path, backend)
+
+    cache[key] = {
+        'Size': stat.st_size,
+        'Modified': stat.st_mtime_ns,
+        'Hash': file_hash,
+        'Backend': backend,
+        'Text': text
+    }
+
+    return text, True
+
 def get_templates():
     global paths
     global resume_template
@@ -143,19 +512,50 @@ def get_templates():
     with open(job_quality_prompt_path, 'r', encoding="utf-8") as file:
         job_quality_prompt = file.read()
 
+def get_history_store():
+    """Open the indexed history store (creating it from the JSON files on first use)"""
+    return HistoryStore.open_store(paths['cache'] / "History.db")
+
+def get_response_cache():
+    """Open the saved AI response cache (see ResponseCache)"""
+    return ResponseCache.open_cache(paths['cache'] / "Responses.db")
+
+def sync_history_store(archived=False):
+    """Pick up history JSON files that were added, edited or removed outside the app"""
+    folder = paths['json_data'] / "Archived" if archived else paths['json_data']
+    ensure_path_exists(folder)
+
+    get_history_store()
+
+    return HistoryStore.sync_folder(folder, archived)
+
+def get_history_records(archived=False, sync=True):
+    """History records newest first, as dicts with 'file_name', 'modified' and 'data'.
+
+    Pass sync=False when nothing could have changed outside the app (e.g. right after the app
+    itself archived or saved a file), to skip checking the folder.
+    """
+    if sync:
+        sync_history_store(archived)
+    else:
+        get_history_store()
+
+    return HistoryStore.get_records(archived)
+
+def search_history(query, archived=False, limit=None, ranked=True):
+    """File names of history records whose text matches `query`, best match first (see HistoryStore.search)"""
+    get_history_store()
+
+    return HistoryStore.search(query, archived, limit, ranked)
+
 def get_json_datas():
     global paths
-    json_datas = []
     ensure_path_exists(paths["json_data"])
 
-    # Only get JSON files in the json_data folder, not in subdirectories (like Archived)
-    json_paths = [p for p in paths['json_data'].glob("*.json") if p.is_file()]
-
-    for path in json_paths:
-        with open(path, 'r', encoding="utf-8") as file:
-            json_datas.append(json.load(file))
+    # Only the JSON files in the json_data folder, not in subdirectories (like Archived)
+    sync_history_store(archived=False)
 
-    return json_datas
+    return HistoryStore.get_datas(archived=False)
 
 def get_archived_datas():
     global paths
@@ -164,45 +564,34 @@ def get_archived_datas():
 
     ensure_path_exists(archived_path)
 
-    json_paths = [p for p in archived_path.glob("*.json") if p.is_file()]
-    datas = []
-    for path in json_paths:
-        with open(path, 'r', encoding='utf-8') as file:
-            datas.append(json.load(file))
-    return datas
+    sync_history_store(archived=True)
+
+    return HistoryStore.get_datas(archived=True)
 
 def archive_expired_datas():
     global paths
     global config
 
-    expired_datas = []
-    current_date = datetime.now()
-
     ensure_path_exists(paths['json_data'])
 
     # Check if we should also archive expired favorites
     archive_favorites = config.get('Settings', {}).get('Auto Archive Expired Favorite Applications', False)
 
-    json_paths = [p for p in paths['json_data'].glob("*.json") if p.is_file()]
-
-    for path in json_paths:
-        with open(path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+    sync_history_store(archived=False)
 
-            try:
-                expected_date = data['Job']['Expected Response Date']
-                date = datetime.strptime(expected_date, "%m/%d/%y")
-                is_favorite = data['Meta'].get('Favorite', False)
-
-                # Archive if expired and either not a favorite, or archiving favorites is enabled
-                if current_date > date and (not is_favorite or archive_favorites):
-                    expired_datas.append(path.stem)
-            except Exception as e:
-                print("Does not have expected response date")
+    # Expired: the expected response date has been reached and it's either not a favorite, or archiving favorites is enabled
+    expired_datas = HistoryStore.get_expired_file_names(include_favorites=archive_favorites)
 
     for file_name in expired_datas:
         archive_json_data(file_name)
 
+def index_moved_json_data(source_path, moved_path, archived):
+    """Update the history store after a JSON file moved in or out of the Archived folder"""
+    get_history_store()
+
+    HistoryStore.remove_record(Path(source_path).stem, not archived)
+    HistoryStore.upsert_file(moved_path, archived)
+
 def restore_archive_data(json_file_name):
     global paths
 
@@ -212,12 +601,14 @@ def restore_archive_data(json_file_name):
     destination_path = paths['json_data']
 
     try:
-        shutil.move(full_path, destination_path)
+        moved_path = shutil.move(full_path, destination_path)
+        index_moved_json_data(full_path, moved_path, archived=False)
         
     except Exception as e1:
         print(f"Something went wrong with moving {json_file_name}, using backup now\n{e1}")
         try:
-            shutil.move(back_up_path, destination_path)
+            moved_path = shutil.move(back_up_path, destination_path)
+            index_moved_json_data(back_up_path, moved_path, archived=False)
 
         except Exception as e2:
             print(f"Something went wrong when moving backup path\n{e2}")
@@ -232,7 +623,8 @@ def archive_json_data(json_file_name):
     ensure_path_exists(destination_path)
     try:
 
-        shutil.move(full_path, destination_path)
+        moved_path = shutil.move(full_path, destination_path)
+        index_moved_json_data(full_path, moved_path, archived=True)
 
     except Exception as e1:
 
@@ -241,13 +633,26 @@ def archive_json_data(json_file_name):
 
         try:
 
-            shutil.move(backup_path, destination_path) 
+            moved_path = shutil.move(backup_path, destination_path) 
+            index_moved_json_data(backup_path, moved_path, archived=True)
 
         except Exception as e2:
 
             print(f"Trouble moving backup path\n{e2}")
 
 
+def delete_json_data(json_file_name, archived=False):
+    """Permanently delete a history JSON file"""
+    folder = paths['json_data'] / 'Archived' if archived else paths['json_data']
+    full_path = folder / f"{json_file_name}.json"
+
+    if full_path.exists():
+        os.remove(full_path)
+        print(f"Deleted{' archived item' if archived else ''}: {json_file_name}")
+
+    get_history_store()
+    HistoryStore.remove_record(json_file_name, archived)
+
 def get_config():
     global base_dir
     global config
@@ -273,12 +678,13 @@ def save_document_result(doc: Document, name: str):
 
     doc.save(full_path)
 
-def save_document_temp(doc: Document, name: str):
+def save_document_temp(doc: Document, name: str, folder=None):
     global paths
 
-    ensure_path_exists(paths['temp'])
+    folder = Path(folder or paths['temp'])
+    ensure_path_exists(folder)
 
-    full_path = paths['temp'] / f'{name}.docx'
+    full_path = folder / f'{name}.docx'
 
     doc.save(full_path)
 
@@ -293,10 +699,10 @@ def copy_files(path_a, path_b):
         if os.path.isfile(src_path):
             shutil.copy2(src_path, dst_path)
 
-def copy_temp_to_results():
+def copy_temp_to_results(folder=None):
     global paths
 
-    copy_files(paths['temp'], paths['results'])
+    copy_files(folder or paths['temp'], paths['results'])
 
 def clear_temp():
     global paths
@@ -309,19 +715,79 @@ def clear_temp():
         except Exception as e:
             print(f"Could not remove {file.name}\n{e}")
 
-def convert_temp_to_pdf():
-    global paths
-    
-    path = paths['temp']
+def convert_temp_to_pdf(folder=None):
+    """Convert every .docx in Temp (or `folder`) to PDF with the configured converter, all files at once.
+
+    Returns:
+        list: Per-file results from Converter.convert_files
+    """
+    settings = get_config()['Settings']
+    docx_paths = [file for file in Path(folder or paths['temp']).glob("*.docx") if not file.name.startswith("~$")]
+
+    start = time.perf_counter()
+    results = Converter.convert_files(
+        docx_paths,
+        converter=settings.get('PDF Converter', 'auto'),
+        workers=settings.get('PDF Converter Workers', 2),
+        profile_root=paths['cache'] / "Converter",
+        warm=settings.get('Warm PDF Converter', True)
+    )
+    total = time.perf_counter() - start
+
+    print(f"{'-'*50}\nPDF Conversion ({results[0]['Converter'] if results else 'nothing to convert'})")
+    for result in results:
+        status = "failed" if result['Error'] else "done"
+        print(f"  {result['File']}: {status} in {result['Seconds'] * 1000:.0f} ms (batch of {result['Batch Size']})")
+    print(f"  Total: {total * 1000:.0f} ms\n{'-'*50}")
+
+    failed = [result for result in results if result['Error']]
+    if failed:
+        raise RuntimeError("PDF conversion failed\n" + "\n".join(f"{result['File']}: {result['Error']}" for result in failed))
+
+    return results
+
+# Stages render_documents goes through, in order (reported through its on_stage callback)
+DOCUMENT_STAGES = ("Writing to Documents", "Converting to PDF", "Copying to Results")
+
+def render_documents(resume_data, cover_letter_data, on_stage=None):
+    """
+    Fill the resume and cover letter templates, convert them to PDF and copy everything to Results
+
+    Safe to run off the GUI thread. Each call works in its own folder under Temp, so two jobs
+    running at once can't convert or copy each other's files.
+
+    Args:
+        resume_data: Resume data with lists already expanded to keys (see expand_list_to_keys)
+        cover_letter_data: Cover letter data
+        on_stage: Optional function called with each stage name in DOCUMENT_STAGES as it starts
+
+    Returns:
+        list: Per-file PDF conversion results (see convert_temp_to_pdf)
+    """
+    def stage(name):
+        if on_stage is not None:
+            on_stage(name)
 
-    for file in os.listdir(path):
-        if not file.lower().endswith(".docx"):
-            continue
+    ensure_path_exists(paths['temp'])
+    job_folder = Path(tempfile.mkdtemp(prefix="Job ", dir=paths['temp']))
 
-        input_path = os.path.join(path, file)
-        output_path = os.path.join(path, file.replace(".docx", ".pdf"))
-        
-        convert(input_path, output_path)
+    try:
+        stage("Writing to Documents")
+        resume_doc = write_to_docx(resume_template, resume_data)
+        cover_letter_doc = write_to_docx(cover_letter_template, cover_letter_data)
+
+        save_document_temp(resume_doc, resume_data['File Name'], job_folder)
+        save_document_temp(cover_letter_doc, cover_letter_data['File Name'], job_folder)
+
+        stage("Converting to PDF")
+        results = convert_temp_to_pdf(job_folder)
+
+        stage("Copying to Results")
+        copy_temp_to_results(job_folder)
+    finally:
+        shutil.rmtree(job_folder, ignore_errors=True)
+
+    return results
 
 def save_json_obj(obj, file_name):
     global paths
@@ -333,6 +799,66 @@ def save_json_obj(obj, file_name):
     with open(full_path, 'w', encoding='utf-8') as file:
         json.dump(obj, file, indent=4, ensure_ascii=False)
 
+    get_history_store()
+    HistoryStore.upsert_file(full_path, archived=False)
+
+def save_generated_data(data, save_submission=False, application_link=""):
+    """
+    Fill in the metadata of a generation response and save it to the history
+
+    Args:
+        data: Parsed response (with 'Meta', 'Job', 'Resume' and 'CoverLetter')
+        save_submission: Whether the job is only saved for reference (no documents)
+        application_link: Link to the job posting
+
+    Returns:
+        tuple: (resume data with lists expanded to keys, cover letter data), ready for render_documents
+    """
+    resume_data = expand_list_to_keys(data['Resume'], "")
+    cover_letter_data = data['CoverLetter']
+
+    resume_name = resume_data['File Name']
+    cover_letter_name = cover_letter_data['File Name']
+
+    #region Editing Meta Data
+
+    data['Meta']['Resume Path'] = str(paths['results'] / f"{resume_name}.docx")
+    data['Meta']['Cover Letter Path'] = str(paths['results'] / f"{cover_letter_name}.docx")
+    data['Meta']['Model Used'] = get_config()['Settings']['Current Model']
+    data['Meta']['Date Created'] = datetime.now().isoformat()
+    data['Meta']['Favorite'] = False
+
+    #endregion
+
+    #region Editing Job data
+
+    data['Job']['Save Submission'] = save_submission
+    data['Job']['Application Link'] = application_link
+
+    #endregion
+
+    save_json_obj(expand_list_to_keys(data, ""), f"{data['Meta']['File Name']}")
+
+    return resume_data, cover_letter_data
+
+def save_partial_response(text, reason):
+    """
+    Keep the part of a response that streamed in before the request was cancelled or failed
+
+    Returns:
+        Path: The saved text file, or None if nothing had streamed in
+    """
+    if not text:
+        return None
+
+    paths['partial_responses'].mkdir(parents=True, exist_ok=True)
+    full_path = paths['partial_responses'] / f"{datetime.now().strftime('%Y-%m-%d %H-%M-%S')} {reason}.txt"
+
+    with open(full_path, 'w', encoding='utf-8') as file:
+        file.write(text)
+
+    return full_path
+
 def expand_list_to_keys(obj, seperator=""):
     result = {}
 
@@ -363,34 +889,181 @@ def replace_keys(dict_obj, modifier, ignore_keys=[]):
 
     return result
 
+#region Template Filling
+
+# A placeholder is a key in braces ({Summary}, {J1Details1}); keys can't span lines or nest
+PLACEHOLDER_PATTERN = re.compile(r"\{([^{}\n]+)\}")
+
+# Keys in the generated data that name the output or are notes to the user, not document text
+TEMPLATE_IGNORED_KEYS = ("File Name", "Job Title Note")
+
+# Parsed templates and where their placeholders are, by template path. See get_template_plan
+template_plans = {}
+template_plans_lock = threading.Lock()
+
+def get_template_plan(template_path):
+    """
+    The parsed template and the paragraphs that hold placeholders, rebuilt only when the file changes
+
+    Returns:
+        dict with:
+            'Signature': (size, modified time) of the file the plan was built from
+            'Document': Parsed template, never modified (renders work on a copy)
+            'Paragraphs': Part name -> indexes (in document order) of the w:p elements with placeholders
+            'Placeholders': Every placeholder key in the template
+    """
+    template_path = Path(template_path)
+    stat = template_path.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    with template_plans_lock:
+        plan = template_plans.get(str(template_path))
+        if plan is not None and plan['Signature'] == signature:
+            return plan
+
+        doc = Document(template_path)
+        paragraphs = {}
+        placeholders = set()
+
+        for part in template_story_parts(doc):
+            indexes = []
+
+            for index, element in enumerate(part.element.iter(W_P)):
+                keys = PLACEHOLDER_PATTERN.findall(''.join(run.text for run in Paragraph(element, None).runs))
+                if keys:
+                    indexes.append(index)
+                    placeholders.update(keys)
+
+            if indexes:
+                paragraphs[str(part.partname)] = indexes
+
+        plan = {
+            'Signature': signature,
+            'Document': doc,
+            'Paragraphs': paragraphs,
+            'Placeholders': placeholders,
+        }
+        template_plans[str(template_path)] = plan
+
+        return plan
+
+def template_story_parts(doc):
+    """The document body followed by every header and footer part"""
+    parts = [doc.part]
+
+    for part in doc.part.package.iter_parts():
+        if isinstance(part, (HeaderPart, FooterPart)):
+            parts.append(part)
+
+    return parts
+
+def render_template(template_path, replace_placeholder) -> Document:
+    """Like modify_docx with `replace_placeholder`, but works on a copy of the cached template and only visits the paragraphs that hold placeholders"""
+    plan = get_template_plan(template_path)
+
+    doc = copy.deepcopy(plan['Document'])
+    parts = {str(part.partname): part for part in template_story_parts(doc)}
+
+    for partname, indexes in plan['Paragraphs'].items():
+        elements = list(parts[partname].element.iter(W_P))
+
+        for index in indexes:
+            substitute_placeholders(Paragraph(elements[index], None), replace_placeholder)
+
+    return doc
+
 def write_to_docx(template_path: str, data: object) -> Document:
-    modified_data = replace_keys(data, lambda s: "{" + s + "}")
-    
-    return modify_docx(template_path, lambda s: fill_template(s, modified_data))
+    used_keys = set()
+    unfilled_keys = set()
 
-def fill_template(template_string: str, data: object) -> str:
-    new_string = template_string
-    for key, val in data.items():
-        if not isinstance(val, str):
-            continue
-        new_string = new_string.replace(key, val)
+    doc = render_template(template_path, placeholder_replacer(data, used_keys, unfilled_keys))
+
+    report_template_keys(template_path, data, used_keys, unfilled_keys)
+
+    return doc
+
+def fill_template(template_string: str, data: object, used_keys=None, unfilled_keys=None) -> str:
+    """
+    Replace every {Key} placeholder in `template_string` with data['Key'] in a single pass
+
+    Placeholders whose key is missing from `data` (or whose value isn't text) are left as they are.
+    Filled values are never scanned for placeholders themselves.
 
-    return new_string
+    Args:
+        template_string: Text containing {Key} placeholders
+        data: Dictionary of key -> text (keys without the braces)
+        used_keys: Optional set that collects the keys that were filled
+        unfilled_keys: Optional set that collects the placeholders that couldn't be filled
+
+    Returns:
+        str: The filled text
+    """
+    if "{" not in template_string:
+        return template_string
+
+    return PLACEHOLDER_PATTERN.sub(placeholder_replacer(data, used_keys, unfilled_keys), template_string)
+
+def placeholder_replacer(data, used_keys=None, unfilled_keys=None):
+    """Function that takes a PLACEHOLDER_PATTERN match and returns its value from `data` (see fill_template)"""
+    def replace_placeholder(match):
+        key = match.group(1)
+        value = data.get(key)
+
+        if not isinstance(value, str):
+            if unfilled_keys is not None:
+                unfilled_keys.add(key)
+            return match.group(0)
+
+        if used_keys is not None:
+            used_keys.add(key)
+        return value
+
+    return replace_placeholder
+
+def report_template_keys(template_path, data, used_keys, unfilled_keys):
+    """Print the placeholders a template couldn't fill and the data keys it never used"""
+    name = Path(template_path).name
+    unused_keys = [key for key in data if key not in used_keys and key not in TEMPLATE_IGNORED_KEYS]
+
+    if unfilled_keys:
+        print(f"{name}: no value for {len(unfilled_keys)} placeholder(s): {', '.join(sorted(unfilled_keys))}")
+
+    if unused_keys:
+        print(f"{name}: {len(unused_keys)} key(s) not in the template: {', '.join(unused_keys)}")
+
+#endregion
 
 def get_resume_full_resume_text() -> str:
     global full_base_resume_text
     global base_resumes
+    global resume_corpus
 
     get_base_resumes()
 
     full_base_resume_text = ''
+    resume_corpus = None
+    base_resume_texts.clear()
+
+    cache = load_json_cache("Base Resume Text")
+    cache_changed = False
+    current_keys = set()
 
     for resume in base_resumes:
         full_base_resume_text += f"\n{'-'*50}\n{resume.name}\n {'-'*50}\n"
-        text = get_docx_text(resume)
+        text, entry_changed = get_cached_docx_text(resume, cache)
+        cache_changed = cache_changed or entry_changed
+        current_keys.add(str(resume.resolve()))
         base_resume_texts.append('\n'.join(text))
         full_base_resume_text += "\n".join(text)
 
+    # Forget resumes that were removed from the folder
+    for key in set(cache) - current_keys:
+        del cache[key]
+        cache_changed = True
+
+    if cache_changed:
+        save_json_cache("Base Resume Text", cache)
+
     return full_base_resume_text
 
 def play_sound(mp3_path: str):
@@ -404,20 +1077,104 @@ def play_notification_sound():
     play_sound(full_path)
 #endregion
 
-#region Main Script
+#region Lazy Startup
+
+def run_startup_step(name, step):
+    """Run `step` once per process, recording how long it took under `name`.
+
+    Concurrent callers of the same step wait for the first one to finish instead of running it twice.
+    """
+    with startup_lock:
+        step_lock = startup_step_locks.setdefault(name, threading.Lock())
+
+    with step_lock:
+        if name in completed_startup_steps:
+            return
+
+        start = time.perf_counter()
+        step()
+        startup_timings[name] = time.perf_counter() - start
+        completed_startup_steps.add(name)
+
+def record_startup_timing(name, seconds):
+    startup_timings[name] = seconds
+
+def ensure_templates():
+    """Load the templates and prompts if nothing has loaded them yet"""
+    run_startup_step("Templates", get_templates)
+
+def get_full_base_resume_text() -> str:
+    """Combined text of every base resume, extracted on first use"""
+    run_startup_step("Base Resume Text", get_resume_full_resume_text)
+
+    return full_base_resume_text
+
+def continue_rating_enabled() -> bool:
+    """Whether generating after a rating continues the rating conversation (Settings.Continue Rating Conversation)"""
+    return get_config()['Settings'].get('Continue Rating Conversation', False)
+
+def get_resume_corpus() -> dict:
+    """The base resumes with repeated lines removed (see Corpus.build_corpus), built on first use"""
+    global resume_corpus
+
+    run_startup_step("Base Resume Text", get_resume_full_resume_text)
+
+    if resume_corpus is None:
+        resumes = [(resume.name, text) for resume, text in zip(base_resumes, base_resume_texts)]
+        resume_corpus = Corpus.build_corpus(Corpus.newest_first(resumes))
+        print(Corpus.corpus_report(resume_corpus).splitlines()[0])
+
+    return resume_corpus
+
+def get_resume_context(job_description="") -> str:
+    """
+    The base resume text to put in prompts, per Settings.Resume Context:
+    "deduplicated" (default) sends each line once, "relevant" sends the lines that best match `job_description`
+    within Settings.Resume Context Tokens, "full" sends every resume as it is.
+    "relevant" falls back to "deduplicated" when there's no job description or nothing in it matches.
+    """
+    settings = get_config()['Settings']
+    mode = settings.get('Resume Context', 'deduplicated')
+
+    if mode == 'full':
+        return get_full_base_resume_text()
+
+    corpus = get_resume_corpus()
+
+    if mode == 'relevant' and job_description.strip():
+        token_budget = settings.get('Resume Context Tokens', 2000)
+        relevant = Corpus.select_relevant(corpus, job_description, token_budget)
+
+        if relevant is not None:
+            print(f"Resume context for this job: ~{relevant['Tokens']} tokens ({relevant['Selected']} of {len(corpus['Lines'])} lines)")
+            return relevant['Document']
+
+    return corpus['Document']
+
+def get_base_resume_texts() -> list:
+    """Text of each base resume, extracted on first use"""
+    run_startup_step("Base Resume Text", get_resume_full_resume_text)
+
+    return base_resume_texts
 
-get_base_resumes()
-get_templates()
-get_resume_full_resume_text()
+def run_deferred_startup():
+    """Run the expensive startup work. Meant to be called off the GUI thread once the main window is showing"""
+    start = time.perf_counter()
 
-# Populate base resume texts
-get_config()
+    ensure_templates()
+    get_full_base_resume_text()
+    run_startup_step("Copy Temp To Results", copy_temp_to_results)
 
-get_json_datas()
+    if get_config()['Settings'].get('Auto Archive Expired Applications', False):
+        run_startup_step("Archive Expired Applications", archive_expired_datas)
 
-copy_temp_to_results()
+    record_startup_timing("Deferred Startup", time.perf_counter() - start)
+    report_startup_timings()
 
-if(config['Settings']['Auto Archive Expired Applications']):
-    archive_expired_datas()
+def report_startup_timings():
+    print(f"{'-'*50}\nStartup Timings")
+    for name, seconds in startup_timings.items():
+        print(f"  {name}: {seconds * 1000:.1f} ms")
+    print('-'*50)
 
 #endregion
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (QPushButton, QLabel, QLineEdit, QTextEdit, QHBoxLayout, QComboBox, QCheckBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 
 def ActionBarButton(icon, tooltip, on_click, hover_color="#e3f2fd", hover_border="#2196F3", pressed_color="#bbdefb"):
     """
@@ -208,7 +208,7 @@ def LabelDescription(label_text, description_text, layout_obj, inline=False):
 
     return [label, text]
 
-def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
+def FilterBar(on_filter_changed, include_favorites=True, include_saved=True, debounce_ms=150, incremental=True):
     """
     Create a reusable filter bar with search and filter controls
 
@@ -216,6 +216,10 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
         on_filter_changed: Callback function to trigger when any filter changes
         include_favorites: Whether to include favorites checkbox (default: True)
         include_saved: Whether to include saved submissions checkbox (default: True)
+        debounce_ms: How long typing has to pause before the search runs, so a burst of keystrokes
+                     is filtered once (default: 150, 0 filters on every keystroke)
+        incremental: Whether a query that extends the previous one should only recheck the previous
+                     matches (default: True, passed back for the filter callback to use)
 
     Returns:
         Dictionary containing:
@@ -225,14 +229,36 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
             'date_filter': QComboBox for date range
             'favorites': QCheckBox for favorites filter (if included, else None)
             'saved': QCheckBox for saved submissions filter (if included, else None)
+            'cancel': Function that drops a search that's still waiting on the debounce
+            'incremental': The incremental setting
             'layout': QHBoxLayout containing all widgets
     """
     filter_row = QHBoxLayout()
     filter_row.setSpacing(10)
 
+    # Typing restarts the timer, so only the last query of a burst is filtered
+    search_timer = QTimer()
+    search_timer.setSingleShot(True)
+    search_timer.setInterval(debounce_ms)
+    search_timer.timeout.connect(on_filter_changed)
+
+    def cancel_search():
+        search_timer.stop()
+
+    def on_search_changed(*_):
+        if debounce_ms > 0:
+            search_timer.start()
+        else:
+            on_filter_changed()
+
+    def on_filter_control_changed(*_):
+        # The other filters apply right away and pick up any pending search text with them
+        cancel_search()
+        on_filter_changed()
+
     # Search bar
     search_bar = QLineEdit()
-    search_bar.setPlaceholderText("Search by position, company, or tech stack...")
+    search_bar.setPlaceholderText("Search by position, company, tech stack, description, or resume...")
     search_bar.setMinimumHeight(40)
     search_bar.setStyleSheet("""
         QLineEdit {
@@ -248,7 +274,9 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
             border: 2px solid #4CAF50;
         }
     """)
-    search_bar.textChanged.connect(on_filter_changed)
+    search_timer.setParent(search_bar)
+    search_bar.textChanged.connect(on_search_changed)
+    search_bar.returnPressed.connect(on_filter_control_changed)
     filter_row.addWidget(search_bar, stretch=3)
 
     # Min Rating dropdown
@@ -281,7 +309,7 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
             margin-right: 10px;
         }
     """)
-    min_rating_combo.currentTextChanged.connect(on_filter_changed)
+    min_rating_combo.currentTextChanged.connect(on_filter_control_changed)
     filter_row.addWidget(min_rating_combo, stretch=1)
 
     # Min Job Quality dropdown
@@ -314,7 +342,7 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
             margin-right: 10px;
         }
     """)
-    min_quality_combo.currentTextChanged.connect(on_filter_changed)
+    min_quality_combo.currentTextChanged.connect(on_filter_control_changed)
     filter_row.addWidget(min_quality_combo, stretch=1)
 
     # Date filter dropdown
@@ -347,7 +375,7 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
             margin-right: 10px;
         }
     """)
-    date_filter_combo.currentTextChanged.connect(on_filter_changed)
+    date_filter_combo.currentTextChanged.connect(on_filter_control_changed)
     filter_row.addWidget(date_filter_combo, stretch=1)
 
     # Optional favorites checkbox
@@ -376,7 +404,7 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
                 height: 20px;
             }
         """)
-        favorites_checkbox.stateChanged.connect(on_filter_changed)
+        favorites_checkbox.stateChanged.connect(on_filter_control_changed)
         filter_row.addWidget(favorites_checkbox, stretch=1)
 
     # Optional saved submissions checkbox
@@ -406,7 +434,7 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
             }
         """)
         saved_checkbox.setToolTip("Show only saved submissions (not applying)")
-        saved_checkbox.stateChanged.connect(on_filter_changed)
+        saved_checkbox.stateChanged.connect(on_filter_control_changed)
         filter_row.addWidget(saved_checkbox, stretch=1)
 
     return {
@@ -416,6 +444,8 @@ def FilterBar(on_filter_changed, include_favorites=True, include_saved=True):
         'date_filter': date_filter_combo,
         'favorites': favorites_checkbox,
         'saved': saved_checkbox,
+        'cancel': cancel_search,
+        'incremental': incremental,
         'layout': filter_row
     }
 
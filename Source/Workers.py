@@ -0,0 +1,55 @@
+from PySide6.QtCore import QThread, Signal
+from Agent import submit
+from JobQueue import JobScheduler
+from Utility import render_documents
+
+
+class DocumentWorker(QThread):
+    """Worker thread that fills the templates, converts them to PDF and copies them to Results"""
+    stage = Signal(str)     # Signal to emit each stage name (see Utility.DOCUMENT_STAGES) as it starts
+    finished = Signal(list) # Signal to emit the PDF conversion results once the documents are in Results
+    error = Signal(str)     # Signal to emit errors
+
+    def __init__(self, resume_data, cover_letter_data):
+        super().__init__()
+        self.resume_data = resume_data
+        self.cover_letter_data = cover_letter_data
+
+    def run(self):
+        """Render the documents in a separate thread"""
+        try:
+            results = render_documents(self.resume_data, self.cover_letter_data, on_stage=self.stage.emit)
+            self.finished.emit(results)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class BatchWorker(QThread):
+    """Worker thread that runs a batch of jobs through a JobScheduler"""
+    job_updated = Signal(int, dict)  # Signal to emit a job's position in the batch and a copy of it when its progress changes
+    finished = Signal(list)          # Signal to emit copies of the jobs once every one is done, failed, skipped or cancelled
+    error = Signal(str)              # Signal to emit errors that stop the whole batch
+
+    def __init__(self, jobs, process, parallelism=3, requests_per_minute=None, retries=3):
+        super().__init__()
+        self.jobs = jobs
+        self.process = process
+        self.positions = {id(job): position for position, job in enumerate(jobs)}
+        self.scheduler = JobScheduler(
+            parallelism=parallelism,
+            requests_per_minute=requests_per_minute,
+            retries=retries,
+            on_update=lambda job: self.job_updated.emit(self.positions[id(job)], dict(job))
+        )
+
+    def stop(self):
+        """Let the running jobs finish and cancel the rest"""
+        self.scheduler.stop()
+
+    def run(self):
+        """Run the batch on the shared event loop and wait for it in a separate thread"""
+        try:
+            submit(self.scheduler.run(self.jobs, self.process)).result()
+            self.finished.emit([dict(job) for job in self.jobs])
+        except Exception as e:
+            self.error.emit(str(e))